@@ -0,0 +1,133 @@
+# ----------------------------------------------------------------------
+#  Benchmark of concurrent reads & writes on a SQLite database, with the
+#  default settings (rollback journal) & with the "SQLITE_PRAGMAS" profile
+#  (WAL). Reader threads query the database while a writer thread keeps
+#  committing small transactions (like admin actions).
+#
+#  Run from the "backend" directory:
+#    python benchmarks/sqlite_concurrency.py [--readers 4] [--seconds 5]
+# ----------------------------------------------------------------------
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from sqlalchemy import create_engine, exc, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.configuration import Configuration
+from server.db_pool import get_engine_options
+from server.sqlite_profile import install_sqlite_pragmas
+
+ROWS = 10000
+
+# The default SQLite settings (of the Python "sqlite3" module)
+DEFAULT_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+
+def create_database(engine):
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE repositories (id INTEGER PRIMARY KEY, stars INTEGER, "
+                "language TEXT)"
+            )
+        )
+        conn.execute(
+            text("INSERT INTO repositories (stars, language) VALUES (:stars, :lang)"),
+            [{"stars": i % 5000, "lang": f"lang-{i % 20}"} for i in range(ROWS)],
+        )
+        conn.execute(text("CREATE TABLE logs (id INTEGER PRIMARY KEY, action TEXT)"))
+
+
+def read_loop(engine, stop, counts):
+    with engine.connect() as conn:
+        while not stop.is_set():
+            try:
+                conn.execute(
+                    text(
+                        "SELECT language, COUNT(*) FROM repositories "
+                        "WHERE stars > :stars GROUP BY language"
+                    ),
+                    {"stars": 2500},
+                ).all()
+                conn.rollback()
+                counts["reads"] += 1
+            except exc.OperationalError:
+                conn.rollback()
+                counts["read_errors"] += 1
+
+
+def write_loop(engine, stop, counts):
+    with engine.connect() as conn:
+        while not stop.is_set():
+            try:
+                conn.execute(
+                    text("UPDATE repositories SET stars = stars + 1 WHERE id = :id"),
+                    {"id": counts["writes"] % ROWS + 1},
+                )
+                conn.execute(text("INSERT INTO logs (action) VALUES ('update')"))
+                conn.commit()
+                counts["writes"] += 1
+            except exc.OperationalError:
+                conn.rollback()
+                counts["write_errors"] += 1
+
+
+def run(name, pragmas, readers, seconds, profile):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        uri = "sqlite:///" + os.path.join(tmp_dir, "bench.db")
+        engine = create_engine(uri, **get_engine_options(uri, profile))
+        install_sqlite_pragmas(engine, pragmas)
+        create_database(engine)
+
+        stop = threading.Event()
+        read_counts = [{"reads": 0, "read_errors": 0} for _ in range(readers)]
+        write_counts = {"writes": 0, "write_errors": 0}
+        threads = [
+            threading.Thread(target=read_loop, args=(engine, stop, counts))
+            for counts in read_counts
+        ]
+        threads.append(
+            threading.Thread(target=write_loop, args=(engine, stop, write_counts))
+        )
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    reads = sum(counts["reads"] for counts in read_counts)
+    read_errors = sum(counts["read_errors"] for counts in read_counts)
+    print(
+        f"{name:<8} reads {reads / seconds:9.1f}/s  writes "
+        f"{write_counts['writes'] / seconds:8.1f}/s  errors "
+        f"{read_errors + write_counts['write_errors']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    profile = {
+        "pool_size": args.readers + 1,
+        "max_overflow": 0,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+    }
+    default_pragmas = dict(DEFAULT_PRAGMAS)
+    default_pragmas["busy_timeout"] = Configuration.SQLITE_PRAGMAS["busy_timeout"]
+    run("default", default_pragmas, args.readers, args.seconds, profile)
+    run("wal", Configuration.SQLITE_PRAGMAS, args.readers, args.seconds, profile)
+
+
+if __name__ == "__main__":
+    main()
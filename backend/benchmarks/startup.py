@@ -0,0 +1,58 @@
+# ----------------------------------------------------------------------
+#  Benchmark of the cold-start time of the app: the time for a new
+#  Python process to import "server" & run "create_app()" (each run is
+#  a new process, so nothing is cached between runs).
+#
+#  Run from the "backend" directory:
+#    python benchmarks/startup.py [--runs 20] [--config testing]
+# ----------------------------------------------------------------------
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+SNIPPET = """
+import time
+start = time.perf_counter()
+from server import create_app
+imported = time.perf_counter()
+create_app("{config}")
+done = time.perf_counter()
+print(imported - start, done - start)
+"""
+
+
+def run_once(config):
+    output = subprocess.run(
+        [sys.executable, "-c", SNIPPET.format(config=config)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    import_time, total_time = map(float, output.split()[-2:])
+    return import_time, total_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--config", default="testing")
+    args = parser.parse_args()
+
+    # Warm up the filesystem cache & bytecode
+    run_once(args.config)
+    results = [run_once(args.config) for _ in range(args.runs)]
+
+    for name, times in [
+        ("import server", [r[0] for r in results]),
+        ("create_app()", [r[1] for r in results]),
+    ]:
+        print(
+            f"{name:<14} median {statistics.median(times) * 1000:7.1f} ms"
+            f"  min {min(times) * 1000:7.1f} ms  ({args.runs} runs)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -182,3 +182,8 @@ with app.app_context():
 
     # Uncomment below to commit these changes to database:
     db.session.commit()
+
+    # Count the usage of each tag & language
+    from server.counters import reconcile_counters
+
+    reconcile_counters()
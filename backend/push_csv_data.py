@@ -60,7 +60,8 @@ with app.app_context():
             ban_reason=user[5],
             last_updated=user[6],
         )
-        db.session.add(new_user)
+        # The bot account was already created by the migrations
+        db.session.merge(new_user)
 
     tag_data = read_csv("instance/tag_data.csv")
     for tag in tag_data:
@@ -129,3 +130,14 @@ with app.app_context():
 
     db.session.commit()
     print("Successfully pushed CSV data into database.")
+
+    # Logs & reports were inserted with their ids, so their ids sequences
+    # need to be moved past them
+    from server.db import sync_id_sequences
+
+    sync_id_sequences(["logs", "reports"])
+
+    # Count the usage of each tag & language
+    from server.counters import reconcile_counters
+
+    reconcile_counters()
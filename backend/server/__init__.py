@@ -2,12 +2,17 @@ import os
 from datetime import timedelta
 from flask import Flask, Blueprint
 from flask_cors import CORS
-from datetime import datetime
 
 import server.configuration as configuration
+from server.db import get_binds
+from server.db_pool import get_engine_options, init_db_pool
+from server.query_stats import init_query_stats
+from server.sqlite_profile import init_sqlite_profile
 
 
-def create_app(configName=None):
+# "test_config" overrides the values of the configuration (ie: to use other
+# databases in tests)
+def create_app(configName=None, test_config=None):
     # create and configure the app
     app = Flask(__name__, instance_relative_config=True)
 
@@ -18,6 +23,8 @@ def create_app(configName=None):
         else os.environ.get("ENVIRONMENT", configuration.ConfigurationName.DEVELOPMENT)
     )
     app.config.from_object(configuration.configuration[configName])
+    if test_config:
+        app.config.update(test_config)
 
     # NOTE: Make sure the origins matches with the frontend URL
     origins = ["https://gitinspire.vercel.app"]
@@ -28,9 +35,14 @@ def create_app(configName=None):
     app.config.update(
         SECRET_KEY=os.environ.get("SECRET_KEY", "dev"),
         JWT_SECRET_KEY=os.environ.get("JWT_SECRET_KEY", "dev"),
-        # Fix issue with unexpected server connection closure
+        # Connections closed by the database while idle are replaced when
+        # they're checked out (see "server/db_pool.py")
         #  Ref: https://stackoverflow.com/a/61739721
-        SQLALCHEMY_ENGINE_OPTIONS={"pool_pre_ping": True},
+        SQLALCHEMY_ENGINE_OPTIONS=get_engine_options(
+            app.config["SQLALCHEMY_DATABASE_URI"], app.config["DB_POOL"]
+        ),
+        # The read replica, if configured
+        SQLALCHEMY_BINDS=get_binds(app.config),
         # Have access token expire after 3 hours
         JWT_ACCESS_TOKEN_EXPIRES=timedelta(hours=3),
     )
@@ -41,16 +53,33 @@ def create_app(configName=None):
     except OSError:
         pass
 
-    # Initialize database & JWT
-    from server.db import init_db
+    # Initialize database, JWT, request identity & GitHub API client
+    from server.db import init_db, db
+    from server.migrations import check_schema, init_schema_guard
     from server.jwt import init_jwt
+    from server.identity import init_identity
+    from server.github import init_github
 
     init_db(app)
+    with app.app_context():
+        init_db_pool(app, db.engines.values())
+        init_sqlite_profile(app, db.engines.values())
+        init_query_stats(app, db.engines.values())
+    # Only checks the schema version (run "flask db upgrade" to migrate)
+    init_schema_guard(app, check_schema(app))
     init_jwt(app)
+    init_identity(app)
+    init_github(app)
+
+    # Register our CLI commands
+    from server.cli import init_cli
+
+    init_cli(app)
 
     # Register our routes
     from server.routes import (
         auth,
+        autocomplete,
         languages,
         random,
         repositories,
@@ -58,6 +87,7 @@ def create_app(configName=None):
         user,
         report,
         log,
+        metrics,
     )
 
     # Disable redirecting to URL with trailing slash when visiting URL
@@ -67,6 +97,7 @@ def create_app(configName=None):
     api = Blueprint("api", __name__, url_prefix="/api")
 
     api.register_blueprint(auth.bp)
+    api.register_blueprint(autocomplete.bp)
     api.register_blueprint(languages.bp)
     api.register_blueprint(random.bp)
     api.register_blueprint(repositories.bp)
@@ -74,27 +105,26 @@ def create_app(configName=None):
     api.register_blueprint(user.bp)
     api.register_blueprint(report.bp)
     api.register_blueprint(log.bp)
+    api.register_blueprint(metrics.bp)
 
     app.register_blueprint(api)
 
-    with app.app_context():
-        from server.db import db
-        from server.models.User import User, AccountStatusEnum
-
-        # Create a bot account if it doesn't exist
-        bot_account = User.query.filter_by(id="-1337").first()
-        if bot_account == None:
-            bot_account = User(
-                id="-1337",
-                username="GitInspire_Bot",
-                avatar_url="",
-                github_created_at=datetime.strptime(
-                    datetime.strftime(datetime.now(), "%Y-%m-%dT%H:%M:%SZ"),
-                    "%Y-%m-%dT%H:%M:%SZ",
-                ),
-                account_status=AccountStatusEnum["bot"],
-            )
-            db.session.add(bot_account)
-            db.session.commit()
-
     return app
+
+
+# Called by the production server before it serves requests (see
+# "server/wsgi.py"), but not by the CLI commands:
+#  - Refuses to start on an out of date database.
+#  - Warms the catalog caches so the first page load doesn't have to build them.
+def init_serving(app):
+    if not app.extensions["schema_is_current"]:
+        raise RuntimeError(
+            'The database schema is out of date, run "flask --app server db upgrade" before starting the server.'
+        )
+
+    from server.cache import get_catalog
+    from server.routes import languages, tags
+
+    with app.app_context():
+        get_catalog("languages", languages.build_languages_catalog)
+        get_catalog("tags", tags.build_tags_catalog)
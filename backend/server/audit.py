@@ -0,0 +1,60 @@
+from collections import Counter
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.orm import Session
+
+from server.log_stats import add_log_stats, get_stat_key
+from server.models.Log import Log
+
+# Every admin action used to run "SELECT setval(..., max(id)+1) FROM logs"
+# (an aggregate over the whole table) before adding its log, in case the ids
+# sequence fell behind after importing rows with explicit ids. Instead:
+#  - Sequences are synced once after an import (see "push_csv_data.py").
+#  - Logs are buffered on the session & inserted (in a single batched INSERT,
+#    with ids from the sequence) when the action's transaction commits, so an
+#    action & its log are saved (or rolled back) together.
+#  - The daily activity stats (see "server/log_stats.py") are incremented
+#    along with them.
+
+
+# Log an action made by "enacted_by" (saved with the current transaction)
+def log_action(session, action, type, content_id, enacted_by):
+    session.info.setdefault("audit_logs", []).append(
+        {
+            "action": action,
+            "type": type,
+            "content_id": str(content_id) if content_id != None else None,
+            "enacted_by": int(enacted_by),
+        }
+    )
+
+
+@event.listens_for(Session, "before_commit")
+def _write_audit_logs(session):
+    logs = session.info.pop("audit_logs", None)
+    if logs:
+        # The stats are counted on the day of the logs' "created_at" (set by
+        # the database), so they match the logs & "rebuild_log_stats()"
+        dialect = session.get_bind().dialect
+        if dialect.insert_executemany_returning_sort_by_parameter_order:
+            created_ats = session.scalars(
+                insert(Log).returning(Log.created_at, sort_by_parameter_order=True),
+                logs,
+            ).all()
+        else:
+            session.execute(insert(Log), logs)
+            created_ats = [session.scalar(select(func.now()))] * len(logs)
+
+        add_log_stats(
+            session,
+            Counter(
+                get_stat_key(
+                    created_at.date(), log["type"], log["action"], log["enacted_by"]
+                )
+                for log, created_at in zip(logs, created_ats)
+            ),
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_audit_logs(session):
+    session.info.pop("audit_logs", None)
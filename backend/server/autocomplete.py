@@ -0,0 +1,148 @@
+import heapq
+from bisect import bisect_left
+from flask import current_app
+from sqlalchemy import select
+
+from server.cache import get_catalog
+from server.db import db
+from server.models.User import User, AccountStatusEnum
+
+# Max number of suggestions returned for a query
+MAX_SUGGESTIONS = 25
+
+
+# A sorted list of lowercased search keys, each pointing at the item it
+# belongs to. The keys starting with a prefix are a contiguous slice of the
+# list, found with 2 binary searches.
+#  - An item can have more than 1 key (ie: a tag's name & display name).
+class PrefixIndex:
+    def __init__(self, items, get_keys, get_rank):
+        entries = sorted(
+            {
+                (key.lower(), idx)
+                for idx, item in enumerate(items)
+                for key in get_keys(item)
+            }
+        )
+        self._keys = [key for key, _ in entries]
+        self._item_idxs = [idx for _, idx in entries]
+        self._items = items
+        self._ranks = [get_rank(item) for item in items]
+
+    def __len__(self):
+        return len(self._items)
+
+    # Return the "limit" items with the highest rank that have a key starting
+    # with "prefix" (ties are broken by the order of the keys)
+    def search(self, prefix, limit):
+        prefix = prefix.lower()
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + "\uffff", lo)
+        if lo == hi or limit <= 0:
+            return []
+
+        ranks = self._ranks
+        item_idxs = self._item_idxs
+        best = heapq.nsmallest(
+            limit * 2,  # Each item can match on up to 2 keys
+            range(lo, hi),
+            key=lambda pos: (-ranks[item_idxs[pos]], pos),
+        )
+
+        results = []
+        seen = set()
+        for pos in best:
+            idx = item_idxs[pos]
+            if idx not in seen:
+                seen.add(idx)
+                results.append(self._items[idx])
+                if len(results) == limit:
+                    break
+        return results
+
+
+def build_users_catalog():
+    # Rank users by how many repositories & tags they've suggested (read from
+    # their usage counters, see "server/counters.py"). Ranks are only
+    # refreshed when the catalog expires, see "CATALOG_CACHE_MAX_AGE".
+    users = db.session.execute(
+        select(
+            User.id,
+            User.username,
+            User.avatar_url,
+            User.suggested_repo_count + User.suggested_tag_count,
+        ).where(User.account_status != AccountStatusEnum["bot"])
+    ).all()
+    return [
+        {
+            "id": id,
+            "username": username,
+            "avatar_url": avatar_url,
+            "contributions": contributions,
+        }
+        for id, username, avatar_url, contributions in users
+    ]
+
+
+def _get_tags_catalog():
+    from server.routes.tags import build_tags_catalog
+
+    return get_catalog("tags", build_tags_catalog)
+
+
+def _get_languages_catalog():
+    from server.routes.languages import build_languages_catalog
+
+    return get_catalog("languages", build_languages_catalog)
+
+
+def _get_users_catalog():
+    return get_catalog("users", build_users_catalog)
+
+
+# kind: (get catalog, get items from catalog, get item's keys, get item's rank)
+INDEX_KINDS = {
+    "tag": (
+        _get_tags_catalog,
+        lambda catalog: [
+            {
+                "name": tag["name"],
+                "display_name": tag["display_name"],
+                "type": tag["type"],
+                "repo_count": tag["repo_count"],
+            }
+            for tag in catalog["primary"] + catalog["user_gen"]
+        ],
+        lambda item: [item["name"], item["display_name"]],
+        lambda item: item["repo_count"],
+    ),
+    "language": (
+        _get_languages_catalog,
+        lambda catalog: catalog["languages"],
+        lambda item: [item["name"], item["display_name"]],
+        lambda item: item["repo_count"],
+    ),
+    "user": (
+        _get_users_catalog,
+        lambda catalog: catalog,
+        lambda item: [item["username"]],
+        lambda item: item["contributions"],
+    ),
+}
+
+
+# Get the prefix index of a kind of item. Indexes are built from the catalogs
+# (see "server/cache.py"), so they're rebuilt along with their catalog after
+# a write.
+def get_prefix_index(kind):
+    indexes = current_app.extensions.setdefault("autocomplete_indexes", {})
+    get_kind_catalog, get_items, get_keys, get_rank = INDEX_KINDS[kind]
+
+    catalog = get_kind_catalog()
+    entry = indexes.get(kind)
+    if entry != None and entry[0] is catalog:
+        return entry[1]
+
+    index = PrefixIndex(get_items(catalog), get_keys, get_rank)
+    indexes[kind] = (catalog, index)
+    return index
@@ -0,0 +1,189 @@
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Shared worker pool used to refresh cache entries in the background
+_refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+
+
+# A thread-safe in-memory cache where each entry expires after "ttl" seconds
+# and the least recently used entry is evicted once "maxsize" is reached.
+#  - With "refresh_ahead" set (ie: 0.2), a hit on an entry that is in the last
+#    20% of its lifetime schedules a background reload. Only entries that keep
+#    getting used are reloaded, so popular entries never expire.
+class TTLCache:
+    def __init__(self, maxsize=256, ttl=300, refresh_ahead=0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._loading = {}  # key -> threading.Event for in-flight loads
+        self._refreshing = set()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry == None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (ttl if ttl != None else self.ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # Return the cached value for "key", otherwise call "loader()" & cache
+    # its result. Concurrent misses on the same key share a single load.
+    # Exceptions raised by "loader()" are passed on & nothing gets cached.
+    def get_or_load(self, key, loader):
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry != None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    if self._should_refresh(key, entry[0], now):
+                        self._refreshing.add(key)
+                        _refresh_pool.submit(self._refresh, key, loader)
+                    return entry[1]
+
+                event = self._loading.get(key)
+                is_owner = event == None
+                if is_owner:
+                    event = threading.Event()
+                    self._loading[key] = event
+
+            if is_owner:
+                break
+            # Another thread is loading this key, so wait on its result (if
+            # its load failed, we'll end up loading the key ourselves)
+            event.wait()
+
+        try:
+            value = loader()
+            self.set(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            event.set()
+
+    def _should_refresh(self, key, expires_at, now):
+        if not self.refresh_ahead or key in self._refreshing:
+            return False
+        return expires_at - now < self.ttl * self.refresh_ahead
+
+    def _refresh(self, key, loader):
+        try:
+            self.set(key, loader())
+        except:
+            # Keep serving the current entry until it expires
+            print(traceback.format_exc())
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+# Get a named cache belonging to the current app (each app instance gets its
+# own caches so that they don't leak between app instances).
+def get_cache(name, maxsize=256, ttl=300, refresh_ahead=0):
+    caches = current_app.extensions.setdefault("gitinspire_caches", {})
+    if name not in caches:
+        caches[name] = TTLCache(maxsize=maxsize, ttl=ttl, refresh_ahead=refresh_ahead)
+    return caches[name]
+
+
+# Holds serialized catalogs (ie: all tags) stamped with the version of the
+# catalog they were built from. Routes that write to a catalog bump its
+# version, so the next read rebuilds it.
+#  - Versions only live in this process, so entries are also rebuilt after
+#    "max_age" seconds to pick up writes handled by other workers.
+class CatalogCache:
+    def __init__(self, max_age=60):
+        self.max_age = max_age
+        self._versions = {}
+        self._entries = {}  # name -> (version, built_at, value)
+        self._lock = threading.Lock()
+
+    def version(self, name):
+        with self._lock:
+            return self._versions.get(name, 0)
+
+    def bump(self, name):
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+
+    def get_or_build(self, name, builder):
+        now = time.monotonic()
+        with self._lock:
+            version = self._versions.get(name, 0)
+            entry = self._entries.get(name)
+            if entry != None and entry[0] == version and now - entry[1] < self.max_age:
+                return entry[2]
+
+        # Stamp the entry with the version from before it was built, so a
+        # write made while building still causes a rebuild on the next read
+        value = builder()
+        with self._lock:
+            self._entries[name] = (version, now, value)
+        return value
+
+
+def get_catalog_cache():
+    if "catalog_cache" not in current_app.extensions:
+        current_app.extensions["catalog_cache"] = CatalogCache(
+            max_age=current_app.config["CATALOG_CACHE_MAX_AGE"]
+        )
+    return current_app.extensions["catalog_cache"]
+
+
+def get_catalog(name, builder):
+    return get_catalog_cache().get_or_build(name, builder)
+
+
+# Call after writing to a catalog ("languages" or "tags")
+def bump_catalog(name):
+    get_catalog_cache().bump(name)
+
+
+# Bump a catalog's version once the current database transaction commits (so
+# that a read made before the commit can't cache the old data as current)
+def bump_catalog_on_commit(session, name):
+    session.info.setdefault("bump_catalogs", set()).add(name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_catalogs_after_commit(session):
+    for name in session.info.pop("bump_catalogs", ()):
+        bump_catalog(name)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalog_bumps(session):
+    session.info.pop("bump_catalogs", None)
@@ -0,0 +1,140 @@
+import click
+from datetime import datetime, timedelta
+from flask.cli import AppGroup
+
+# Commands are run with "flask --app server <group> <command>" in the
+# "backend" directory.
+
+tags_cli = AppGroup("tags", help="Manage tags.")
+
+
+@tags_cli.command("resume")
+@click.option("--chunk-size", type=int, help="Repositories updated per transaction.")
+def resume_tag_migrations_command(chunk_size):
+    """Finish tag renames & merges that were interrupted."""
+    from server.tag_migration import resume_tag_migrations
+
+    migrations = resume_tag_migrations(chunk_size)
+    for migration in migrations:
+        click.echo(
+            f"Finished {migration.action} of '{migration.old_name}' -> '{migration.new_name}'."
+        )
+    if len(migrations) == 0:
+        click.echo("No interrupted tag updates.")
+
+
+counters_cli = AppGroup("counters", help="Manage tag & language usage counters.")
+
+
+@counters_cli.command("reconcile")
+def reconcile_counters_command():
+    """Recount the repositories using each tag & language."""
+    from server.counters import reconcile_counters
+
+    num_fixed = reconcile_counters()
+    click.echo(f"Fixed {num_fixed} counter(s).")
+
+
+users_cli = AppGroup("users", help="Manage users.")
+
+
+@users_cli.command("refresh")
+@click.option(
+    "--max-age-days", type=int, help="Refresh users not updated in this many days."
+)
+@click.option("--limit", type=int, default=1000, help="Max number of users to check.")
+def refresh_users_command(max_age_days, limit):
+    """Refresh stale usernames & avatars from GitHub in batches."""
+    from server.user_refresh import refresh_stale_users, UserRefreshFailed
+
+    max_age = timedelta(days=max_age_days) if max_age_days != None else None
+    try:
+        summary = refresh_stale_users(max_age=max_age, limit=limit)
+    except UserRefreshFailed as err:
+        raise click.ClickException(str(err))
+    click.echo(
+        f"Checked {summary['checked']} user(s): {summary['updated']} updated, {summary['missing']} not found on GitHub."
+    )
+    if summary["rate_limited"]:
+        click.echo("Stopped early as the GitHub API limit has been reached.")
+
+
+logs_cli = AppGroup("logs", help="Manage admin logs.")
+
+
+@logs_cli.command("archive")
+@click.option(
+    "--older-than-days", type=int, help="Archive logs older than this many days."
+)
+@click.option("--chunk-size", type=int, help="Logs moved per transaction.")
+def archive_logs_command(older_than_days, chunk_size):
+    """Move old logs into compressed monthly archive files."""
+    from server.log_archive import archive_logs
+
+    cutoff = None
+    if older_than_days != None:
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    num_archived = archive_logs(cutoff=cutoff, chunk_size=chunk_size)
+    click.echo(f"Archived {num_archived} log(s).")
+
+
+@logs_cli.command("rebuild-stats")
+def rebuild_log_stats_command():
+    """Recount the daily activity stats from the logs."""
+    from server.log_stats import rebuild_log_stats
+
+    num_counted = rebuild_log_stats()
+    click.echo(f"Counted {num_counted} log(s).")
+
+
+db_cli = AppGroup("db", help="Manage the database schema.")
+
+
+@db_cli.command("upgrade")
+def upgrade_db_command():
+    """Apply the database migrations that weren't applied yet."""
+    from server.migrations import upgrade_db
+
+    applied = upgrade_db()
+    for description in applied:
+        click.echo(f"Applied: {description}")
+    click.echo(f"Applied {len(applied)} migration(s).")
+
+
+@db_cli.command("version")
+def schema_version_command():
+    """Show the version of the database schema."""
+    from server.migrations import get_schema_version, LATEST_VERSION
+
+    click.echo(f"Schema version: {get_schema_version()} (latest: {LATEST_VERSION})")
+
+
+perf_cli = AppGroup("perf", help="Measure the performance of the server.")
+
+
+@perf_cli.command("importtime")
+@click.option("--limit", type=int, default=15, help="Number of packages to list.")
+@click.option(
+    "--config",
+    "config_name",
+    default="testing",
+    help="Configuration the app is started with.",
+)
+def importtime_command(limit, config_name):
+    """List the packages that take the longest to import on startup."""
+    from server.importtime import run_importtime, parse_importtime, slowest_packages
+
+    imports = parse_importtime(run_importtime(config_name))
+    total_us = sum(self_us for _, self_us, _, _ in imports)
+    click.echo(f"Imported {len(imports)} module(s) in {total_us / 1000:.1f} ms.")
+    for package, cumulative_us in slowest_packages(imports, limit):
+        click.echo(f"{cumulative_us / 1000:8.1f} ms  {package}")
+
+
+def init_cli(app):
+    app.cli.add_command(tags_cli)
+    app.cli.add_command(counters_cli)
+    app.cli.add_command(users_cli)
+    app.cli.add_command(logs_cli)
+    app.cli.add_command(db_cli)
+    app.cli.add_command(perf_cli)
@@ -1,4 +1,5 @@
 import os
+from datetime import timedelta
 from dotenv import load_dotenv
 
 # Get the path to the directory this file is in
@@ -11,7 +12,106 @@ load_dotenv(os.path.join(BASEDIR, ".env"))
 
 
 class Configuration:
-    pass
+    # "/api/random" caches pages of GitHub search results keyed by the language
+    # filter & star bucket (TTL in seconds). Entries that are still being used
+    # are refetched in the background once they're in the last 20% of their TTL.
+    RANDOM_CACHE_TTL = 600
+    RANDOM_CACHE_SIZE = 256
+    RANDOM_CACHE_REFRESH_AHEAD = 0.2
+    # Number of buckets a star range is split into when picking a random "min"
+    RANDOM_STAR_BUCKETS = 10
+
+    # Max seconds the "/api/languages" & "/api/tags" responses are cached for
+    # (they're also rebuilt whenever this process writes to them)
+    CATALOG_CACHE_MAX_AGE = 60
+
+    # Users read with "g.user" are cached for this many seconds (updates made
+    # by other processes are only seen once the cached user expires)
+    USER_CACHE_TTL = 30
+    USER_CACHE_SIZE = 1024
+    # Max seconds before a change to a user's account status (which revokes
+    # their access tokens) made by another process is seen
+    TOKEN_REVOCATION_SYNC_INTERVAL = 10
+
+    # Max number of repositories updated per transaction when renaming or
+    # merging a tag
+    TAG_MIGRATION_CHUNK_SIZE = 1000
+
+    # GitHub GraphQL API (used to refresh users in batches), which requires
+    # a personal access token
+    GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+    GITHUB_API_TOKEN = os.environ.get("GITHUB_API_TOKEN")
+    # Users that weren't updated for this long are refreshed by the
+    # "flask users refresh" command
+    USER_REFRESH_MAX_AGE = timedelta(days=7)
+
+    # Logs older than "LOG_RETENTION" are moved to gzipped monthly archives
+    # in "LOG_ARCHIVE_DIR" (defaults to "instance/log_archive") by the
+    # "flask logs archive" command
+    LOG_RETENTION = timedelta(days=180)
+    LOG_ARCHIVE_DIR = os.environ.get("LOG_ARCHIVE_DIR")
+    LOG_ARCHIVE_CHUNK_SIZE = 1000
+
+    # Database connection pool profile (see "server/db_pool.py")
+    DB_POOL = {
+        "pool_size": 5,
+        "max_overflow": 10,
+        # Seconds to wait for a connection before failing
+        "pool_timeout": 30,
+        # Seconds before a connection is replaced
+        "pool_recycle": 1800,
+        # Seconds a connection can be idle before it's pinged on checkout
+        # (None to never ping)
+        "ping_after_idle": 60,
+    }
+
+    # Pragmas set on each connection to a SQLite database (see
+    # "server/sqlite_profile.py")
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        # Negative values are in KiB (64 MiB of page cache per connection)
+        "cache_size": -64000,
+        # Bytes of the database file read through memory-mapped I/O
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        # Milliseconds to wait for the write lock
+        "busy_timeout": 5000,
+    }
+
+    # Optional read replica of the database (see "server/db.py"). GET requests
+    # to these blueprints read from it until they write something.
+    DATABASE_REPLICA_URL = None
+    REPLICA_BLUEPRINTS = [
+        "api.autocomplete",
+        "api.languages",
+        "api.random",
+        "api.repositories",
+        "api.tags",
+        "api.users",
+    ]
+
+    # Count the SQL statements run by each request (see
+    # "server/query_stats.py"). A warning is logged when the same statement
+    # runs more than "N_PLUS_ONE_THRESHOLD" times in a request.
+    QUERY_STATS_ENABLED = True
+    QUERY_STATS_LOG_REQUESTS = False
+    N_PLUS_ONE_THRESHOLD = 10
+
+    # Apply the database migrations on startup (otherwise they're applied with
+    # "flask db upgrade" & starting the app only checks the schema version)
+    AUTO_MIGRATE = False
+
+    # Number of rows fetched at a time when exporting logs & reports
+    EXPORT_BATCH_SIZE = 1000
+
+    # Fraction of each GitHub API quota that a class of routes has to leave
+    # for the classes above it (requests are rejected once it's reached)
+    GITHUB_RATE_RESERVES = {
+        "suggest": 0,  # Suggesting repositories
+        "refresh": 0.1,  # Refreshing repositories & users
+        "random": 0.3,  # Random repository searches
+    }
 
 
 class ConfigurationName:
@@ -25,6 +125,19 @@ class DevelopmentConfiguration(Configuration):
         pass
 
     DEBUG = True
+    # Apply the database migrations on startup
+    AUTO_MIGRATE = True
+    # Log the SQL stats of every request
+    QUERY_STATS_LOG_REQUESTS = True
+
+    # A local database doesn't drop idle connections
+    DB_POOL = {
+        "pool_size": 2,
+        "max_overflow": 5,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "ping_after_idle": None,
+    }
 
     JWT_COOKIE_SECURE = False
     JWT_TOKEN_LOCATION = "cookies"
@@ -58,12 +171,26 @@ class ProductionConfiguration(Configuration):
         "PROD_DATABASE_URL", "sqlite:///" + os.path.join(BASEDIR, "gitinspire.db")
     )
 
+    DATABASE_REPLICA_URL = os.environ.get("PROD_DATABASE_REPLICA_URL")
+
+    # Each worker process has its own pool, so the total number of connections
+    # is up to "workers * (pool_size + max_overflow)". Hosted databases close
+    # idle connections, so they're recycled & pinged sooner.
+    DB_POOL = {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 3)),
+        "max_overflow": int(os.environ.get("DB_POOL_MAX_OVERFLOW", 2)),
+        "pool_timeout": 10,
+        "pool_recycle": 300,
+        "ping_after_idle": 30,
+    }
+
 
 class TestingConfiguration(Configuration):
     def __init__(self):
         pass
 
     TESTING = True
+    AUTO_MIGRATE = True
 
     JWT_COOKIE_SECURE = False
     JWT_COOKIE_CSRF_PROTECT = False
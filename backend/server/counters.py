@@ -0,0 +1,142 @@
+from collections import Counter
+from sqlalchemy import func, select, update
+
+from server.cache import bump_catalog_on_commit
+from server.db import db
+from server.models.Language import Language
+from server.models.Repository import Repository, RepoLanguage, RepoTag
+from server.models.Tag import Tag
+from server.models.User import User
+
+# The number of repositories using each tag & language is kept in their
+# "repo_count" column (& the number of repositories & tags suggested by each
+# user in their "suggested_*_count" columns) so it can be read without
+# counting the relations.
+#  - The counters must be adjusted in the same transaction as the relations
+#    they count (ie: call these before "db.session.commit()").
+#  - "reconcile_counters()" recounts everything in case they drift.
+
+
+def _adjust_counts(model, names, delta):
+    # Group names by how much their counter changes (a name can appear twice)
+    by_delta = {}
+    for name, count in Counter(names).items():
+        by_delta.setdefault(count * delta, []).append(name)
+
+    for change, names in by_delta.items():
+        if change == 0:
+            continue
+        db.session.execute(
+            update(model)
+            .where(model.name.in_(names))
+            .values(repo_count=model.repo_count + change)
+        )
+
+
+def adjust_tag_counts(names, delta):
+    _adjust_counts(Tag, names, delta)
+    bump_catalog_on_commit(db.session, "tags")
+
+
+def adjust_language_counts(names, delta):
+    _adjust_counts(Language, names, delta)
+    bump_catalog_on_commit(db.session, "languages")
+
+
+def adjust_user_counts(user_id, repos=0, tags=0):
+    db.session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(
+            suggested_repo_count=User.suggested_repo_count + repos,
+            suggested_tag_count=User.suggested_tag_count + tags,
+            # Counters changing isn't an update of the user's GitHub data
+            last_updated=User.last_updated,
+        )
+    )
+
+
+# Get the names of the tags (including the primary tag) & languages used by
+# a repository
+def get_repository_usage(repo_id):
+    tag_names = db.session.scalars(
+        select(Repository._primary_tag).where(Repository.id == repo_id)
+    ).all()
+    tag_names += db.session.scalars(
+        select(RepoTag.tag_name).where(RepoTag.repo_id == repo_id)
+    ).all()
+    lang_names = db.session.scalars(
+        select(RepoLanguage.language_name).where(RepoLanguage.repo_id == repo_id)
+    ).all()
+    return tag_names, lang_names
+
+
+# Recount the usage of every tag & language (& the contributions of every
+# user) & fix the counters that drifted.
+# Returns the number of counters that were fixed.
+def reconcile_counters():
+    tag_counts = Counter()
+    for name, count in db.session.execute(
+        select(Repository._primary_tag, func.count()).group_by(Repository._primary_tag)
+    ):
+        tag_counts[name] += count
+    for name, count in db.session.execute(
+        select(RepoTag.tag_name, func.count()).group_by(RepoTag.tag_name)
+    ):
+        tag_counts[name] += count
+
+    lang_counts = Counter()
+    for name, count in db.session.execute(
+        select(RepoLanguage.language_name, func.count()).group_by(
+            RepoLanguage.language_name
+        )
+    ):
+        lang_counts[name] += count
+
+    num_fixed = 0
+    for model, counts in [(Tag, tag_counts), (Language, lang_counts)]:
+        for name, repo_count in db.session.execute(
+            select(model.name, model.repo_count)
+        ).all():
+            if repo_count != counts[name]:
+                db.session.execute(
+                    update(model)
+                    .where(model.name == name)
+                    .values(repo_count=counts[name])
+                )
+                num_fixed += 1
+
+    repo_counts = dict(
+        db.session.execute(
+            select(Repository.suggested_by, func.count()).group_by(
+                Repository.suggested_by
+            )
+        ).all()
+    )
+    user_tag_counts = dict(
+        db.session.execute(
+            select(Tag.suggested_by, func.count()).group_by(Tag.suggested_by)
+        ).all()
+    )
+    for id, repo_count, tag_count in db.session.execute(
+        select(User.id, User.suggested_repo_count, User.suggested_tag_count)
+    ).all():
+        if (repo_count, tag_count) != (
+            repo_counts.get(id, 0),
+            user_tag_counts.get(id, 0),
+        ):
+            db.session.execute(
+                update(User)
+                .where(User.id == id)
+                .values(
+                    suggested_repo_count=repo_counts.get(id, 0),
+                    suggested_tag_count=user_tag_counts.get(id, 0),
+                    last_updated=User.last_updated,
+                )
+            )
+            num_fixed += 1
+
+    bump_catalog_on_commit(db.session, "tags")
+    bump_catalog_on_commit(db.session, "languages")
+    db.session.commit()
+    return num_fixed
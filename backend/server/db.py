@@ -1,19 +1,99 @@
+from flask import current_app, has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 import sqlalchemy as sa
 
+# The bind key of the read replica (see "DATABASE_REPLICA_URL")
+REPLICA_BIND = "replica"
+
+
+# When a read replica is configured, the queries of GET requests to the
+# blueprints in "REPLICA_BLUEPRINTS" are sent to it:
+#  - Only SELECTs are sent to the replica. Once a request writes anything
+#    (flush, INSERT, UPDATE, DELETE...), the rest of its queries go to the
+#    primary database so it reads its own writes.
+#  - Everything else (other requests, CLI commands) uses the primary database.
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind == None and self.use_replica(clause):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def use_replica(self, clause):
+        if REPLICA_BIND not in self._db.engines:
+            return False
+        if self._flushing or not getattr(clause, "is_select", False):
+            # Stick to the primary database for the rest of the request
+            self.info["use_primary"] = True
+            return False
+        return (
+            not self.info.get("use_primary")
+            and has_request_context()
+            and request.method in ["GET", "HEAD"]
+            and request.blueprint in current_app.config["REPLICA_BLUEPRINTS"]
+        )
+
+
 # Create database extension
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
-# Function to initialize database & create tables if they weren't created.
+# Function to initialize database (the tables are created by the migrations,
+# see "server/migrations.py"). "reset" recreates all the tables.
 def init_db(app, reset=False):
-    from server.models import Language, Repository, Tag, User, Log, Report
+    from server.models import (
+        Language,
+        Repository,
+        Tag,
+        User,
+        Log,
+        Report,
+        TagMigration,
+        TokenRevocation,
+        LogDailyStat,
+        SchemaVersion,
+    )
 
     db.init_app(app)
 
-    with app.app_context():
-        if reset:
-            db.drop_all()
+    # The session is shared by the requests made within the same app context
+    @app.before_request
+    def reset_session_routing():
+        db.session.info.pop("use_primary", None)
+
+    if reset:
+        from server.migrations import upgrade_db
+
+        with app.app_context():
+            db.drop_all(bind_key=None)
             db.session.commit()
+            upgrade_db()
+
+
+# Get the binds of the databases other than the primary one
+def get_binds(config):
+    from server.db_pool import get_engine_options
+
+    binds = dict(config.get("SQLALCHEMY_BINDS", {}))
+    replica_uri = config["DATABASE_REPLICA_URL"]
+    if replica_uri:
+        binds[REPLICA_BIND] = {
+            "url": replica_uri,
+            **get_engine_options(replica_uri, config["DB_POOL"]),
+        }
+    return binds
+
 
-        db.create_all()
+# Move the ids sequences of tables past their largest id (on Postgresql, rows
+# inserted with explicit ids, ie: when importing data, don't advance them)
+#   - Ref: https://stackoverflow.com/a/37972960
+def sync_id_sequences(table_names):
+    if db.engine.dialect.name != "postgresql":
+        return
+    for table_name in table_names:
+        db.session.execute(
+            sa.text(
+                f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), coalesce(max(id)+1, 1), false) FROM {table_name}"
+            )
+        )
+    db.session.commit()
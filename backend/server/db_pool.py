@@ -0,0 +1,147 @@
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# The database connection pool is configured per environment with the
+# "DB_POOL" profile (see "server/configuration.py"):
+#  - Connections used to be pinged on every checkout ("pool_pre_ping"), which
+#    is an extra round-trip per request. Instead, they're only pinged when
+#    they were idle in the pool for "ping_after_idle" seconds (long enough
+#    for the database or a proxy to have closed them).
+#  - The pool records how long checkouts wait for a connection, so the pool
+#    can be sized to the number of workers (see "/api/metrics/pool").
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.pings = 0
+        self.failed_pings = 0
+
+    def record_checkout(self, wait, timed_out=False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += 1 if timed_out else 0
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def record_ping(self, failed=False):
+        with self._lock:
+            self.pings += 1
+            self.failed_pings += 1 if failed else 0
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": (
+                    round(self.wait_total / self.checkouts * 1000, 3)
+                    if self.checkouts
+                    else 0
+                ),
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "pings": self.pings,
+                "failed_pings": self.failed_pings,
+            }
+
+
+# A QueuePool that records the time spent waiting for connections
+class InstrumentedQueuePool(QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record_checkout(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_checkout(time.perf_counter() - start)
+        return connection
+
+    # Keep the stats when the pool is replaced (ie: after a disconnect)
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+# Ping the connections that were idle for "idle_seconds" when they're checked
+# out (a failed ping makes the pool replace the connection)
+def install_ping_after_idle(engine, idle_seconds):
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at == None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+
+        stats = getattr(engine.pool, "stats", None)
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+        except Exception as err:
+            if stats:
+                stats.record_ping(failed=True)
+            raise exc.DisconnectionError() from err
+        if stats:
+            stats.record_ping()
+
+
+# Get the engine options of a pool profile (in-memory SQLite databases keep
+# the single connection they're given by Flask-SQLAlchemy)
+def get_engine_options(database_uri, profile):
+    url = make_url(database_uri)
+    if url.drivername.startswith("sqlite") and url.database in [None, "", ":memory:"]:
+        return {}
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": profile["pool_size"],
+        "max_overflow": profile["max_overflow"],
+        "pool_timeout": profile["pool_timeout"],
+        "pool_recycle": profile["pool_recycle"],
+    }
+
+
+def init_db_pool(app, engines):
+    idle_seconds = app.config["DB_POOL"]["ping_after_idle"]
+    if idle_seconds == None:
+        return
+    for engine in engines:
+        # Pools with a single static connection (in-memory SQLite) aren't pinged
+        if isinstance(engine.pool, QueuePool):
+            install_ping_after_idle(engine, idle_seconds)
+
+
+# Get the state of the pool of an engine
+def get_pool_stats(engine):
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            {
+                "size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                # Connections opened beyond "size" (negative when fewer than
+                # "size" connections were opened)
+                "overflow": pool.overflow(),
+                "max_overflow": pool._max_overflow,
+            }
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(pool.stats.as_dict())
+    return stats
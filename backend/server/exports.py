@@ -0,0 +1,55 @@
+import csv
+import io
+import zlib
+from flask import Response, current_app as app, stream_with_context
+
+from server.db import db
+
+# Exports are streamed: rows are fetched from a server-side cursor
+# ("yield_per") & written as CSV a batch at a time, so memory stays the same
+# no matter how many rows are exported.
+#  - Rows are fetched as plain tuples (not ORM objects) so that they aren't
+#    kept in the session.
+#  - When compressed, each batch is gzipped as it's written.
+
+
+# Generate the CSV of the rows of "stmt" in chunks of bytes
+def generate_csv(stmt, header, batch_size, compress=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31 -> gzip
+
+    def flush():
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    writer.writerow(header)
+    result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+    for rows in result.partitions():
+        writer.writerows(rows)
+        chunk = flush()
+        if chunk:
+            yield chunk
+    result.close()
+
+    chunk = flush()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
+# Stream the rows of "stmt" as a CSV file download named "<name>.csv" (or
+# "<name>.csv.gz" if compressed)
+def csv_response(name, stmt, header, compress=False):
+    generator = generate_csv(
+        stmt, header, app.config["EXPORT_BATCH_SIZE"], compress=compress
+    )
+    filename = f"{name}.csv.gz" if compress else f"{name}.csv"
+    return Response(
+        stream_with_context(generator),
+        mimetype="application/gzip" if compress else "text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,139 @@
+import threading
+import time
+from math import ceil
+from flask import jsonify, current_app as app
+
+# Default quotas for requests made with our OAuth app's client credentials
+#  - Ref: https://docs.github.com/en/rest/overview/resources-in-the-rest-api#rate-limiting
+DEFAULT_LIMITS = {
+    # resource: (requests per window, window length in seconds)
+    "core": (5000, 3600),
+    "search": (30, 60),
+    "graphql": (5000, 3600),
+}
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"GitHub rate limit budget exhausted, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+# A token bucket mirroring the quota of one GitHub API resource. It's drained
+# locally as requests are sent & resynced with the "X-RateLimit-*" headers of
+# every response.
+class RateLimitBucket:
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset_at = time.time() + window
+
+    # Take a token if more than "reserve" (a fraction of the limit) remains
+    # afterwards. Returns the seconds until the bucket refills if not.
+    def take(self, reserve=0):
+        now = time.time()
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.window
+
+        if self.remaining - 1 < self.limit * reserve:
+            return max(1, ceil(self.reset_at - now))
+        self.remaining -= 1
+        return 0
+
+    def sync(self, headers):
+        try:
+            self.limit = int(headers["X-RateLimit-Limit"])
+            self.remaining = int(headers["X-RateLimit-Remaining"])
+            self.reset_at = int(headers["X-RateLimit-Reset"])
+        except (KeyError, ValueError):
+            # Not a rate limited response (ie: a 5xx error)
+            pass
+
+
+# Shares the GitHub quota between routes.
+#  - Each route class keeps a fraction of a resource's quota in reserve for
+#    the route classes above it, so lower priority calls (ie: "/random") are
+#    rejected early while there's still budget left for higher priority ones
+#    (ie: suggesting a repository).
+class RateLimitGovernor:
+    def __init__(self, reserves):
+        self.reserves = reserves
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, resource):
+        if resource not in self._buckets:
+            self._buckets[resource] = RateLimitBucket(*DEFAULT_LIMITS[resource])
+        return self._buckets[resource]
+
+    # Raises "RateLimited" if the route class can't make another request
+    def acquire(self, resource, route_class):
+        with self._lock:
+            retry_after = self._bucket(resource).take(self.reserves[route_class])
+        if retry_after:
+            raise RateLimited(retry_after)
+
+    def sync(self, resource, headers):
+        with self._lock:
+            self._bucket(resource).sync(headers)
+
+    def remaining(self, resource):
+        with self._lock:
+            return self._bucket(resource).remaining
+
+
+def init_github(app):
+    app.extensions["github_governor"] = RateLimitGovernor(
+        app.config["GITHUB_RATE_RESERVES"]
+    )
+
+    @app.errorhandler(RateLimited)
+    def handle_rate_limited(err):
+        response = jsonify(
+            {"message": "GitHub API limit has been reached, try again later."}
+        )
+        response.headers["Retry-After"] = str(err.retry_after)
+        return response, 503
+
+
+def get_governor():
+    return app.extensions["github_governor"]
+
+
+def get_resource(url):
+    if url.startswith("https://api.github.com/search/"):
+        return "search"
+    if url == app.config["GITHUB_GRAPHQL_URL"]:
+        return "graphql"
+    return "core"
+
+
+# Make a request to the GitHub API with our client credentials after taking
+# budget for it from the route class (see "GITHUB_RATE_RESERVES")
+def github_request(method, url, route_class, **kwargs):
+    resource = get_resource(url)
+    governor = get_governor()
+    governor.acquire(resource, route_class)
+
+    headers = {
+        "Accept": "application/vnd.github.text-match+json",
+        "User-Agent": "gitinspire-server",
+        **kwargs.pop("headers", {}),
+    }
+    # Below does the "-u client_id:client_secret" in the CURL command
+    auth = kwargs.pop(
+        "auth", (app.config["GITHUB_CLIENT_ID"], app.config["GITHUB_CLIENT_SECRET"])
+    )
+
+    # Imported on first use as it's slow to import (see "flask perf importtime")
+    import requests
+
+    resp = requests.request(method, url, auth=auth, headers=headers, **kwargs)
+    governor.sync(resource, resp.headers)
+    return resp
+
+
+def github_get(url, route_class, **kwargs):
+    return github_request("GET", url, route_class, **kwargs)
@@ -0,0 +1,109 @@
+from flask import g, current_app as app
+from flask.ctx import _AppCtxGlobals
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from sqlalchemy.orm import make_transient_to_detached
+
+from server.cache import get_cache
+from server.db import db
+from server.models.User import User
+
+# The columns of a user that are cached
+USER_COLUMNS = User.__table__.columns.keys()
+
+# "g.user" used to be loaded before every request (decoding the JWT & running
+# a SELECT even for anonymous reads of "/api/tags"). Instead, the identity of
+# a request is only resolved the first time "g.user" is read:
+#  - The JWT is decoded at most once per request (reusing the access token
+#    decoded by "@jwt_required()" if it ran first).
+#  - The user is loaded from a small TTL cache of user rows, which is
+#    invalidated whenever a user is updated by this process (other processes
+#    see the update once their cached row expires, see "USER_CACHE_TTL").
+
+
+class AppGlobals(_AppCtxGlobals):
+    @property
+    def user(self):
+        if "_user" not in self.__dict__:
+            user_id = get_current_user_id()
+            self._user = load_user(user_id) if user_id != None else None
+        return self._user
+
+    @user.setter
+    def user(self, value):
+        self._user = value
+
+
+def init_identity(app):
+    app.app_ctx_globals_class = AppGlobals
+
+    # Forget the identity of the previous request in case the app context is
+    # shared between requests (ie: requests made within "app.app_context()")
+    @app.before_request
+    def reset_identity():
+        for attr in ["_user", "_user_id", "_user_role", "_jwt_extended_jwt"]:
+            g.pop(attr, None)
+
+
+# Get the user id from the access token of the request (None if there's no
+# valid access token)
+def get_current_user_id():
+    if "_user_id" not in g:
+        try:
+            jwt_data = g.get("_jwt_extended_jwt")
+            if not jwt_data or jwt_data.get("type") != "access":
+                verify_jwt_in_request()
+                jwt_data = get_jwt()
+            g._user_id = jwt_data[app.config["JWT_IDENTITY_CLAIM"]]
+            g._user_role = jwt_data.get("role")
+        except:
+            # No JWT, invalid JWT or didn't provide "X-CSRF-TOKEN" in request
+            g._user_id = None
+            g._user_role = None
+    return g._user_id
+
+
+# Get the account status of the user making the request from the "role" claim
+# of their access token (tokens issued without the claim fall back to the
+# user's row). Returns None if there's no valid access token.
+def get_current_role():
+    if get_current_user_id() == None:
+        return None
+    if g._user_role == None:
+        user = g.user
+        return user.account_status.name if user else None
+    return g._user_role
+
+
+# The claims to add to the access tokens of a user
+def get_role_claims(user):
+    return {"role": user.account_status.name}
+
+
+def get_user_cache():
+    return get_cache(
+        "users", maxsize=app.config["USER_CACHE_SIZE"], ttl=app.config["USER_CACHE_TTL"]
+    )
+
+
+# Get a user (attached to the current session) without querying the database
+# if their row is cached
+def load_user(user_id):
+    def load_row():
+        user = db.session.get(User, int(user_id))
+        if user == None:
+            return None
+        return {key: getattr(user, key) for key in USER_COLUMNS}
+
+    row = get_user_cache().get_or_load(int(user_id), load_row)
+    if row == None:
+        return None
+
+    # Rebuild the user as if it was loaded by the session
+    user = User(**row)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+# Call after updating a user
+def invalidate_cached_user(user_id):
+    get_user_cache().invalidate(int(user_id))
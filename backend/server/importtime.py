@@ -0,0 +1,47 @@
+import os
+import re
+import subprocess
+import sys
+
+# Each line of "python -X importtime" looks like:
+#   import time: self [us] | cumulative | imported package
+LINE_PATTERN = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+SNIPPET = 'from server import create_app; create_app("{config}")'
+
+
+# Start the app in a new process with "-X importtime" & return the lines it
+# reported (the imports of the process running this are already cached)
+def run_importtime(config_name):
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SNIPPET.format(config=config_name)],
+        cwd=backend_dir,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    return output.splitlines()
+
+
+# Parse the lines of "-X importtime" into (module, self µs, cumulative µs,
+# depth) tuples (depth 0 modules were imported directly by the app)
+def parse_importtime(lines):
+    imports = []
+    for line in lines:
+        match = LINE_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            depth = (len(indent) - 1) // 2
+            imports.append((module, int(self_us), int(cumulative_us), depth))
+    return imports
+
+
+# Get the "limit" packages that took the longest to import (by cumulative
+# time, counting each top-level package once)
+def slowest_packages(imports, limit=15):
+    packages = {}
+    for module, _, cumulative_us, _ in imports:
+        package = module.split(".")[0]
+        packages[package] = max(packages.get(package, 0), cumulative_us)
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]
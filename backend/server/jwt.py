@@ -4,6 +4,14 @@ from flask_jwt_extended import JWTManager
 jwt = JWTManager()
 
 
+# Reject access tokens carrying a role that the user no longer has
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    from server.revocations import is_token_revoked
+
+    return is_token_revoked(jwt_payload)
+
+
 def init_jwt(app):
     with app.app_context():
         jwt.init_app(app)
@@ -0,0 +1,116 @@
+import gzip
+import json
+import os
+import re
+from datetime import datetime
+from flask import current_app as app
+from sqlalchemy import delete, select
+
+from server.db import db
+from server.models.Log import Log
+from server.utils import keyset_datetime
+
+# Archive files are named after the month their logs were created in
+ARCHIVE_FILE_PATTERN = re.compile(r"^logs-(\d{4}-\d{2})\.ndjson\.gz$")
+MONTH_PATTERN = re.compile(r"^\d{4}-\d{2}$")
+
+# Logs older than "LOG_RETENTION" are moved out of the "logs" table into
+# gzipped NDJSON files (1 per month) in "LOG_ARCHIVE_DIR":
+#  - Logs are moved in chunks of "LOG_ARCHIVE_CHUNK_SIZE", oldest first. Each
+#    chunk is appended to its archive as a new gzip member (so archives are
+#    only ever appended to) & synced to disk before being deleted from the
+#    table in its own transaction.
+#  - If the job stops between the 2 steps, the next run archives the chunk
+#    again, so archives are read back without the duplicated ids.
+
+
+def get_archive_dir():
+    return app.config["LOG_ARCHIVE_DIR"] or os.path.join(
+        app.instance_path, "log_archive"
+    )
+
+
+def get_archive_path(month):
+    return os.path.join(get_archive_dir(), f"logs-{month}.ndjson.gz")
+
+
+def serialize_log(log):
+    return {
+        "id": log.id,
+        "action": log.action,
+        "type": log.type,
+        "content_id": log.content_id,
+        "enacted_by": log.enacted_by,
+        "created_at": log.created_at.isoformat(),
+    }
+
+
+# Append logs to the archive of "month" (as a single gzip member)
+def append_to_archive(month, logs):
+    os.makedirs(get_archive_dir(), exist_ok=True)
+    with open(get_archive_path(month), "ab") as f:
+        with gzip.GzipFile(fileobj=f, mode="wb") as gz:
+            for log in logs:
+                gz.write((json.dumps(serialize_log(log)) + "\n").encode())
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# Move the logs created before "cutoff" into the archives. Returns the number
+# of logs that were archived.
+def archive_logs(cutoff=None, chunk_size=None):
+    cutoff = cutoff or datetime.utcnow() - app.config["LOG_RETENTION"]
+    chunk_size = chunk_size or app.config["LOG_ARCHIVE_CHUNK_SIZE"]
+
+    # Compared like the logs are indexed (see "keyset_datetime()")
+    created_at = keyset_datetime(Log.created_at)
+    num_archived = 0
+    while True:
+        logs = db.session.scalars(
+            select(Log)
+            .where(created_at < keyset_datetime(cutoff))
+            .order_by(created_at, Log.id)
+            .limit(chunk_size)
+        ).all()
+        if len(logs) == 0:
+            break
+
+        months = {}
+        for log in logs:
+            months.setdefault(log.created_at.strftime("%Y-%m"), []).append(log)
+        for month, month_logs in months.items():
+            append_to_archive(month, month_logs)
+
+        db.session.execute(delete(Log).where(Log.id.in_([log.id for log in logs])))
+        db.session.commit()
+        num_archived += len(logs)
+    return num_archived
+
+
+# Get the months that have archived logs (newest first)
+def list_archive_months():
+    try:
+        names = os.listdir(get_archive_dir())
+    except FileNotFoundError:
+        return []
+    matches = [ARCHIVE_FILE_PATTERN.match(name) for name in names]
+    return sorted([match.group(1) for match in matches if match], reverse=True)
+
+
+# Stream the archived logs of "month" (in the order they were archived),
+# optionally only those of a "type". Yields nothing if there's no archive.
+def read_archive(month, type=None):
+    path = get_archive_path(month)
+    if not os.path.exists(path):
+        return
+
+    seen_ids = set()
+    with gzip.open(path, "rt") as f:
+        for line in f:
+            log = json.loads(line)
+            if log["id"] in seen_ids:
+                continue
+            seen_ids.add(log["id"])
+            if type and log["type"] != type:
+                continue
+            yield log
@@ -0,0 +1,119 @@
+from collections import Counter
+from datetime import timedelta
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from server.db import db
+from server.models.Log import Log
+from server.models.LogDailyStat import LogDailyStat
+from server.utils import keyset_datetime
+
+# Number of logs read at a time when rebuilding the stats
+REBUILD_BATCH_SIZE = 1000
+
+# The daily activity stats are counters in the "log_daily_stats" table:
+#  - They're incremented in the same transaction as the logs they count (see
+#    "server/audit.py"), with an "upsert" so concurrent actions don't conflict.
+#  - "rebuild_log_stats()" recounts them from the logs (ie: to fill the table
+#    for logs written before it existed).
+
+
+# Get the verb of an action (ie: "update" for "update (old -> new)")
+def get_action_verb(action):
+    return action.split(" ", 1)[0]
+
+
+# Get the key of the stat that counts a log
+def get_stat_key(day, type, action, enacted_by):
+    return (day, type, get_action_verb(action), int(enacted_by))
+
+
+def _to_rows(counts):
+    return [
+        {
+            "day": day,
+            "type": type,
+            "action": action,
+            "enacted_by": enacted_by,
+            "count": count,
+        }
+        for (day, type, action, enacted_by), count in counts.items()
+    ]
+
+
+# Add to the stats (a Counter of stat keys) in the current transaction
+def add_log_stats(session, counts):
+    table = LogDailyStat.__table__
+    rows = _to_rows(counts)
+    if len(rows) == 0:
+        return
+
+    dialect = session.get_bind().dialect.name
+    if dialect in ["postgresql", "sqlite"]:
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                table.c.day,
+                table.c.type,
+                table.c.action,
+                table.c.enacted_by,
+            ],
+            set_={"count": table.c.count + stmt.excluded["count"]},
+        )
+        session.execute(stmt, rows)
+        return
+
+    # Other databases don't have a standard "upsert"
+    for row in rows:
+        result = session.execute(
+            update(table)
+            .where(
+                table.c.day == row["day"],
+                table.c.type == row["type"],
+                table.c.action == row["action"],
+                table.c.enacted_by == row["enacted_by"],
+            )
+            .values(count=table.c.count + row["count"])
+        )
+        if result.rowcount == 0:
+            session.execute(insert(table), [row])
+
+
+# Recount the stats of the days since the oldest log in the "logs" table (the
+# stats of older days, whose logs were archived, are kept). Returns the number
+# of logs that were counted.
+#  - The logs of the oldest day may have been partly archived, so its stats
+#    are kept if it has any (they were counted as its logs were written).
+def rebuild_log_stats():
+    first_created_at = db.session.scalar(
+        select(func.min(keyset_datetime(Log.created_at)))
+    )
+    if first_created_at == None:
+        return 0
+    first_day = first_created_at.date()
+    if (
+        db.session.scalar(
+            select(LogDailyStat.day).where(LogDailyStat.day == first_day).limit(1)
+        )
+        != None
+    ):
+        first_day += timedelta(days=1)
+
+    counts = Counter()
+    result = db.session.execute(
+        select(Log.created_at, Log.type, Log.action, Log.enacted_by).execution_options(
+            yield_per=REBUILD_BATCH_SIZE
+        )
+    )
+    for created_at, type, action, enacted_by in result:
+        # Compared in Python (SQLite stores the dates in different formats)
+        if created_at.date() >= first_day:
+            counts[get_stat_key(created_at.date(), type, action, enacted_by)] += 1
+
+    db.session.execute(delete(LogDailyStat).where(LogDailyStat.day >= first_day))
+    rows = _to_rows(counts)
+    if rows:
+        db.session.execute(insert(LogDailyStat.__table__), rows)
+    db.session.commit()
+    return sum(counts.values())
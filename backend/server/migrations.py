@@ -0,0 +1,197 @@
+from datetime import datetime
+from flask import jsonify
+from sqlalchemy import func, inspect, insert, select, text
+from sqlalchemy.schema import CreateIndex, DropIndex
+
+from server.db import db
+from server.models.SchemaVersion import SchemaVersion
+
+# Creating the tables, their indexes & the bot account used to happen every
+# time the app started (reflecting every table & querying for the bot). They
+# are now versioned migrations, applied in order by "flask db upgrade":
+#  - Every applied migration is recorded in the "schema_version" table, so
+#    starting the app only reads the latest version (see "check_schema()").
+#  - Migrations must be safe to run on a database that was created before
+#    they existed (ie: check if a column exists before adding it).
+#  - To change the schema, append a migration to "MIGRATIONS" (never edit or
+#    reorder the existing ones).
+
+
+def create_tables():
+    # Only creates the tables that don't exist (along with their indexes) in
+    # the primary database (the replica's schema is replicated from it)
+    db.create_all(bind_key=None)
+
+
+# Add a column of a model to its table if it's missing
+def add_column(model, name):
+    table = model.__table__
+    existing = [column["name"] for column in inspect(db.engine).get_columns(table.name)]
+    if name in existing:
+        return
+
+    column = table.c[name]
+    ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(db.engine.dialect)}"
+    if column.server_default != None:
+        ddl += f" DEFAULT {column.server_default.arg}"
+    if not column.nullable:
+        ddl += " NOT NULL"
+    db.session.execute(text(ddl))
+
+
+# The usage counters of the tags, languages & users are model columns, which
+# "create_all()" doesn't add to existing tables (they were added by "init_db()"
+# on startup before the migrations existed)
+def add_counter_columns():
+    from server.counters import reconcile_counters
+    from server.models.Language import Language
+    from server.models.Tag import Tag
+    from server.models.User import User
+
+    add_column(Tag, "repo_count")
+    add_column(Language, "repo_count")
+    add_column(User, "suggested_repo_count")
+    add_column(User, "suggested_tag_count")
+    db.session.commit()
+    reconcile_counters()
+
+
+def create_missing_indexes():
+    # Indexes of the tables that were created before the indexes were added
+    # (ie: the indexes of the report, user & log lists). Until this runs, the
+    # lists work on existing databases but scan their tables.
+    #  - "IF NOT EXISTS" instead of "checkfirst", as SQLite doesn't reflect the
+    #    indexes on expressions
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            db.session.execute(CreateIndex(index, if_not_exists=True))
+
+
+def create_bot_account():
+    from server.models.User import User, AccountStatusEnum
+
+    if db.session.get(User, -1337) == None:
+        db.session.execute(
+            insert(User).values(
+                id=-1337,
+                username="GitInspire_Bot",
+                avatar_url="",
+                github_created_at=datetime.utcnow().replace(microsecond=0),
+                account_status=AccountStatusEnum["bot"],
+            )
+        )
+
+
+# Drop & create indexes again (ie: when the columns they're on changed)
+def recreate_indexes(table, names):
+    for index in table.indexes:
+        if index.name in names:
+            db.session.execute(DropIndex(index, if_exists=True))
+            db.session.execute(CreateIndex(index))
+
+
+def index_logs_keyset_datetime():
+    # The logs used to be indexed on "created_at", but they're sorted by
+    # "keyset_datetime(created_at)", which SQLite can't use these indexes for
+    from server.models.Log import Log
+
+    recreate_indexes(
+        Log.__table__,
+        [
+            "ix_logs_created_at_id",
+            "ix_logs_type_created_at",
+            "ix_logs_enacted_by_created_at",
+        ],
+    )
+
+
+def index_reports_keyset_datetime():
+    # Same as "index_logs_keyset_datetime()" for the reports (the ones of all
+    # types are listed by the owner)
+    from server.models.Report import Report
+
+    recreate_indexes(
+        Report.__table__,
+        [
+            "ix_reports_created_at_id",
+            "ix_reports_type_created_at",
+            "ix_reports_type_content_id",
+        ],
+    )
+
+
+# (version, description, function)
+MIGRATIONS = [
+    (1, "Create the tables", create_tables),
+    (2, "Add the usage counters", add_counter_columns),
+    (3, "Create the missing indexes", create_missing_indexes),
+    (4, "Create the bot account", create_bot_account),
+    (5, "Index the logs by their sort order", index_logs_keyset_datetime),
+    (6, "Index the reports by their sort order", index_reports_keyset_datetime),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# Get the version of the database's schema (0 if no migration was applied)
+def get_schema_version():
+    try:
+        version = db.session.scalar(select(func.max(SchemaVersion.version)))
+    except:
+        # The "schema_version" table doesn't exist
+        db.session.rollback()
+        return 0
+    return version or 0
+
+
+# Apply the migrations that weren't applied yet. Returns the descriptions of
+# the migrations that were applied.
+def upgrade_db():
+    current_version = get_schema_version()
+    if current_version == 0:
+        # The "schema_version" table is needed to record the migrations
+        SchemaVersion.__table__.create(db.engine, checkfirst=True)
+
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version <= current_version:
+            continue
+        migrate()
+        db.session.add(SchemaVersion(version=version, description=description))
+        db.session.commit()
+        applied.append(description)
+    return applied
+
+
+# Called on startup to check that the database is up to date (with a single
+# query). Out of date databases are upgraded if "AUTO_MIGRATE" is enabled.
+# Returns whether the database is up to date.
+def check_schema(app):
+    with app.app_context():
+        version = get_schema_version()
+        if version >= LATEST_VERSION:
+            return True
+        if app.config["AUTO_MIGRATE"]:
+            upgrade_db()
+            return True
+        else:
+            app.logger.warning(
+                f'The database schema is out of date (version {version}, latest is {LATEST_VERSION}), run "flask --app server db upgrade".'
+            )
+            return False
+
+
+# Requests are rejected while the database is out of date (ie: a server that
+# was started before "flask db upgrade" was run). The version is checked again
+# by each request until the database is up to date.
+def init_schema_guard(app, schema_is_current):
+    app.extensions["schema_is_current"] = schema_is_current
+
+    @app.before_request
+    def require_current_schema():
+        if app.extensions["schema_is_current"]:
+            return
+        if get_schema_version() >= LATEST_VERSION:
+            app.extensions["schema_is_current"] = True
+            return
+        response = {"message": "The database is being upgraded, try again later."}
+        return jsonify(response), 503
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Integer, String
 
 from server.db import db
 
@@ -10,6 +10,9 @@ class Language(db.Model):
     name = Column(String, primary_key=True)
     display_name = Column(String, nullable=False)
 
+    # Number of repositories using this language (see "server/counters.py")
+    repo_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     def as_dict(self):
         return {"name": self.name, "display_name": self.display_name}
 
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, DateTime, Integer, String, ForeignKey
+from sqlalchemy import Column, DateTime, Index, Integer, String, ForeignKey
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
 from server.db import db
+from server.utils import keyset_datetime
 
 
 # A class to log the actions made by Admins & the Owner in regards to the
@@ -20,6 +21,20 @@ class Log(db.Model):
 
     created_at = Column(DateTime, server_default=func.now())
 
+    __table_args__ = (
+        # Logs are listed newest first (sorted by "keyset_datetime()"),
+        # optionally filtered by type, admin or content
+        Index("ix_logs_created_at_id", keyset_datetime(created_at), id),
+        Index("ix_logs_type_created_at", type, keyset_datetime(created_at), id),
+        Index(
+            "ix_logs_enacted_by_created_at",
+            enacted_by,
+            keyset_datetime(created_at),
+            id,
+        ),
+        Index("ix_logs_content_id", "content_id"),
+    )
+
     def as_dict(self):
         return {
             "id": self.id,
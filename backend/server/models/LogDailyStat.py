@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Date, Integer, String, ForeignKey
+
+from server.db import db
+
+
+# The number of logged actions per day, type, action (its first word, ie:
+# "update" for "update (old -> new)") & admin. Kept up to date by the audit
+# log writer (see "server/audit.py") so activity can be charted without
+# counting the logs.
+class LogDailyStat(db.Model):
+    __tablename__ = "log_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    type = Column(String, primary_key=True)
+    action = Column(String, primary_key=True)
+    enacted_by = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<LogDailyStat day='{self.day}' type='{self.type}' action='{self.action}' enacted_by={self.enacted_by} count={self.count}>"
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, DateTime, Integer, String, ForeignKey
+from sqlalchemy import Column, DateTime, Index, Integer, String, ForeignKey
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
 from server.db import db
+from server.utils import keyset_datetime
 
 
 class Report(db.Model):
@@ -20,6 +21,23 @@ class Report(db.Model):
 
     created_at = Column(DateTime, server_default=func.now())
 
+    # Existing databases get these indexes from the "create_missing_indexes"
+    # & "index_reports_keyset_datetime" migrations
+    __table_args__ = (
+        # Reports are listed newest first (sorted by "keyset_datetime()"),
+        # optionally filtered by type
+        Index("ix_reports_created_at_id", keyset_datetime(created_at), id),
+        Index("ix_reports_type_created_at", type, keyset_datetime(created_at), id),
+        # Reports are grouped by the content they're about (most recently
+        # reported first)
+        Index(
+            "ix_reports_type_content_id",
+            type,
+            content_id,
+            keyset_datetime(created_at),
+        ),
+    )
+
     def as_dict(self):
         return {
             "id": self.id,
@@ -49,20 +49,17 @@ class Repository(db.Model):
             )
         ]
 
-        _p_tag = self.primary_tag.as_dict()
-        p_tag = {
-            "name": _p_tag["name"],
-            "display_name": _p_tag["display_name"],
-            "type": _p_tag["type"],
-        }
-        repo_tags = [
-            {
-                "name": item["tag"]["name"],
-                "display_name": item["tag"]["display_name"],
-                "type": item["tag"]["type"],
+        # Read the tag fields directly instead of using "Tag.as_dict()", which
+        # would also load the user who suggested each tag
+        def tag_summary(tag):
+            return {
+                "name": tag.name,
+                "display_name": tag.display_name,
+                "type": tag.type.name,
             }
-            for item in serialize_sqlalchemy_objs(self.tags)
-        ]
+
+        p_tag = tag_summary(self.primary_tag)
+        repo_tags = [tag_summary(item.tag) for item in self.tags]
 
         return {
             "id": self.id,
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from server.db import db
+
+
+# The migrations that were applied to the database (see "server/migrations.py")
+class SchemaVersion(db.Model):
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True)
+    description = Column(String, nullable=False)
+    applied_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return (
+            f"<SchemaVersion version={self.version} description='{self.description}'>"
+        )
@@ -16,6 +16,8 @@ class Tag(db.Model):
     name = Column(String, primary_key=True)
     display_name = Column(String, nullable=False)
     type = Column(Enum(TagTypeEnum), nullable=False)
+    # Number of repositories using this tag (see "server/counters.py")
+    repo_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     suggested_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     user = relationship("User", back_populates="suggested_tags")
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey
+from sqlalchemy.sql import func
+
+from server.db import db
+
+
+# Tracks the progress of renaming a tag (or merging it into another tag), as
+# the references to the old tag are rewritten in chunks. A migration that
+# didn't reach "done" (ie: the server crashed) can be resumed from where it
+# left off.
+class TagMigration(db.Model):
+    __tablename__ = "tag_migrations"
+
+    id = Column(Integer, primary_key=True)
+    action = Column(String, nullable=False)  # "rename" or "merge"
+    old_name = Column(String, nullable=False)
+    new_name = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="running")  # Or "done"
+    # Number of references to the old tag rewritten so far
+    moved = Column(Integer, nullable=False, default=0)
+
+    enacted_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    created_at = Column(DateTime, server_default=func.now())
+    last_updated = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "action": self.action,
+            "old_name": self.old_name,
+            "new_name": self.new_name,
+            "status": self.status,
+            "moved": self.moved,
+            "enacted_by": self.enacted_by,
+            "created_at": self.created_at.isoformat(),
+            "last_updated": self.last_updated.isoformat(),
+        }
+
+    def __repr__(self):
+        return f"<TagMigration action='{self.action}' old_name='{self.old_name}' new_name='{self.new_name}' status='{self.status}'>"
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey
+from sqlalchemy.sql import func
+
+from server.db import db
+
+
+# Records that the account status of a user changed, which makes the access
+# tokens carrying their previous status ("role" claim) invalid. Entries are
+# only needed until the tokens issued before the change have expired.
+class TokenRevocation(db.Model):
+    __tablename__ = "token_revocations"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    # The current role of the user (tokens with any other role are revoked)
+    role = Column(String, nullable=False)
+    revoked_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<TokenRevocation user_id={self.user_id} role='{self.role}' revoked_at='{self.revoked_at}'>"
@@ -4,7 +4,6 @@ from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
 from server.db import db
-from server.utils import serialize_sqlalchemy_objs
 
 
 # https://docs.sqlalchemy.org/en/14/core/type_basics.html#sqlalchemy.types.Enum
@@ -25,9 +24,17 @@ class User(db.Model):
     avatar_url = Column(String, nullable=False)
     github_created_at = Column(DateTime, nullable=False)
 
-    account_status = Column(Enum(AccountStatusEnum), nullable=False)
+    # Indexed to list users by status (existing databases get the index from
+    # the "create_missing_indexes" migration)
+    account_status = Column(Enum(AccountStatusEnum), nullable=False, index=True)
     ban_reason = Column(String)
 
+    # Number of repositories & tags suggested by the user (maintained counters)
+    suggested_repo_count = Column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    suggested_tag_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     last_updated = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     # Relations with other tables:
@@ -36,8 +43,8 @@ class User(db.Model):
 
     def contributions(self):
         return {
-            "suggested_tags": serialize_sqlalchemy_objs(self.suggested_tags),
-            "suggested_repos": serialize_sqlalchemy_objs(self.suggested_repos),
+            "suggested_tags": self.suggested_tag_count,
+            "suggested_repos": self.suggested_repo_count,
         }
 
     def as_dict(self):
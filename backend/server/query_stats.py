@@ -0,0 +1,165 @@
+import json
+import re
+import time
+from collections import Counter
+from flask import g, has_app_context, request
+from sqlalchemy import event
+
+# The SQL statements run by each request are counted with engine events:
+#  - The number of statements, the time spent running them & the number of
+#    commits are sent in a "Server-Timing" header (shown in the network tab of
+#    the browser's devtools).
+#  - Each request is logged as a JSON object (at the "INFO" level) if
+#    "QUERY_STATS_LOG_REQUESTS" is enabled.
+#  - Statements are grouped by "shape" (with their parameters & "IN" lists
+#    collapsed). A warning is logged when a shape runs more than
+#    "N_PLUS_ONE_THRESHOLD" times in a request, which usually is a
+#    relationship lazy loaded for each item of a list (ie: in "as_dict()").
+
+# Number of repeated statement shapes included in the request logs
+MAX_REPEATED_STATEMENTS = 5
+
+# Lists of placeholders (sqlite "?", postgres "%(name)s" & "$1") or literals
+VALUES_LIST_PATTERN = re.compile(
+    r"\(\s*(?:\?|%\(\w+\)s|\$\d+|'[^']*'|-?\d+(?:\.\d+)?)"
+    r"(?:\s*,\s*(?:\?|%\(\w+\)s|\$\d+|'[^']*'|-?\d+(?:\.\d+)?))*\s*\)"
+)
+LITERAL_PATTERN = re.compile(r"'[^']*'|\b\d+\b|%\(\w+\)s|\$\d+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+class QueryStats:
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.count = 0
+        self.duration = 0.0
+        self.commits = 0
+        self.fingerprints = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[get_fingerprint(statement)] += 1
+
+    # Get the (fingerprint, count) of the statements run more than "min_count"
+    # times (most frequent first)
+    def repeated(self, min_count=1):
+        return [
+            (fingerprint, count)
+            for fingerprint, count in self.fingerprints.most_common()
+            if count > min_count
+        ]
+
+
+# Get the shape of a statement (ie: "SELECT ... WHERE id = ?" & "... IN (?)"
+# for every value of "id")
+def get_fingerprint(statement):
+    fingerprint = WHITESPACE_PATTERN.sub(" ", statement).strip()
+    fingerprint = VALUES_LIST_PATTERN.sub("(?)", fingerprint)
+    return LITERAL_PATTERN.sub("?", fingerprint)
+
+
+# Get the stats of the current request (None outside of requests)
+def get_query_stats():
+    if not has_app_context():
+        return None
+    return g.get("query_stats")
+
+
+def install_query_stats(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        started_at = conn.info["query_started_at"].pop()
+        stats = get_query_stats()
+        if stats != None:
+            stats.record(statement, time.perf_counter() - started_at)
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(exception_context):
+        # The statement failed, so "after_cursor_execute" isn't called
+        started_at = exception_context.connection.info.get("query_started_at")
+        if started_at:
+            started_at.pop()
+
+    @event.listens_for(engine, "commit")
+    def _on_commit(conn):
+        stats = get_query_stats()
+        if stats != None:
+            stats.commits += 1
+
+
+# Format the stats as a "Server-Timing" header
+def get_server_timing(stats):
+    total = (time.perf_counter() - stats.started_at) * 1000
+    return ", ".join(
+        [
+            f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"',
+            f'commits;desc="{stats.commits} commits"',
+            f"total;dur={total:.2f}",
+        ]
+    )
+
+
+def init_query_stats(app, engines):
+    if not app.config["QUERY_STATS_ENABLED"]:
+        return
+    for engine in engines:
+        install_query_stats(engine)
+
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = QueryStats()
+
+    @app.after_request
+    def report_query_stats(response):
+        # The app context (& "g") can be shared by requests in tests
+        stats = g.pop("query_stats", None)
+        if stats == None:
+            return response
+
+        response.headers["Server-Timing"] = get_server_timing(stats)
+
+        threshold = app.config["N_PLUS_ONE_THRESHOLD"]
+        for fingerprint, count in stats.repeated(threshold):
+            app.logger.warning(
+                json.dumps(
+                    {
+                        "event": "n_plus_one",
+                        "method": request.method,
+                        "path": request.path,
+                        "endpoint": request.endpoint,
+                        "count": count,
+                        "statement": fingerprint,
+                    }
+                )
+            )
+
+        if app.config["QUERY_STATS_LOG_REQUESTS"]:
+            app.logger.info(
+                json.dumps(
+                    {
+                        "event": "request",
+                        "method": request.method,
+                        "path": request.path,
+                        "endpoint": request.endpoint,
+                        "status": response.status_code,
+                        "duration_ms": round(
+                            (time.perf_counter() - stats.started_at) * 1000, 2
+                        ),
+                        "db_queries": stats.count,
+                        "db_time_ms": round(stats.duration * 1000, 2),
+                        "db_commits": stats.commits,
+                        "repeated_statements": [
+                            {"statement": fingerprint, "count": count}
+                            for fingerprint, count in stats.repeated()[
+                                :MAX_REPEATED_STATEMENTS
+                            ]
+                        ],
+                    }
+                )
+            )
+        return response
@@ -0,0 +1,99 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app as app
+from sqlalchemy import delete, select
+
+from server.db import db
+from server.models.TokenRevocation import TokenRevocation
+
+# Access tokens carry the account status of their user in a "role" claim, so
+# permission checks don't need to load the user. When the account status of a
+# user changes (ie: they get banned), their tokens with the old role must stop
+# working:
+#  - The change is saved in the "token_revocations" table, which every worker
+#    reloads into memory at most every "TOKEN_REVOCATION_SYNC_INTERVAL" seconds.
+#  - A token is revoked if its role differs from the role of its user's entry,
+#    so tokens issued after the change (with the new role) remain valid.
+#  - Tokens issued before a change expire after "JWT_ACCESS_TOKEN_EXPIRES"
+#    (refreshed tokens get the current role, see "refresh_expiring_jwts()"), so
+#    entries older than that, plus the time for every worker to sync them, are
+#    dropped. The set only holds the changes made within that window, no
+#    matter how many users there are.
+
+
+class RevocationSet:
+    def __init__(self, sync_interval, max_age):
+        self.sync_interval = sync_interval
+        self.max_age = max_age
+        self._roles = {}  # user_id -> current role
+        self._synced_at = None
+        self._lock = threading.Lock()
+
+    def _cutoff(self):
+        return datetime.utcnow() - self.max_age
+
+    # Reload the recent revocations from the database if they're out of date
+    def sync(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            if (
+                not force
+                and self._synced_at != None
+                and now - self._synced_at < self.sync_interval
+            ):
+                return
+            self._synced_at = now
+
+        rows = db.session.execute(
+            select(TokenRevocation.user_id, TokenRevocation.role).where(
+                TokenRevocation.revoked_at > self._cutoff()
+            )
+        ).all()
+        with self._lock:
+            self._roles = dict(rows)
+
+    def is_revoked(self, user_id, role):
+        self.sync()
+        with self._lock:
+            current_role = self._roles.get(user_id)
+        return current_role != None and current_role != role
+
+    # Revoke the tokens of a user that don't have "role" (the change is saved
+    # with the current database transaction)
+    def revoke(self, user_id, role):
+        db.session.execute(
+            delete(TokenRevocation).where(
+                (TokenRevocation.user_id == user_id)
+                | (TokenRevocation.revoked_at <= self._cutoff())
+            )
+        )
+        db.session.add(
+            TokenRevocation(user_id=user_id, role=role, revoked_at=datetime.utcnow())
+        )
+        with self._lock:
+            self._roles[user_id] = role
+
+
+def get_revocations():
+    if "token_revocations" not in app.extensions:
+        app.extensions["token_revocations"] = RevocationSet(
+            sync_interval=app.config["TOKEN_REVOCATION_SYNC_INTERVAL"],
+            max_age=app.config["JWT_ACCESS_TOKEN_EXPIRES"]
+            + timedelta(seconds=app.config["TOKEN_REVOCATION_SYNC_INTERVAL"]),
+        )
+    return app.extensions["token_revocations"]
+
+
+# Call before committing a change to the account status of a user
+def revoke_user_tokens(user_id, role):
+    get_revocations().revoke(int(user_id), role)
+
+
+def is_token_revoked(jwt_data):
+    # Only access tokens carry a role (refresh tokens can only be used to get
+    # a new access token, which reads the current account status)
+    if jwt_data.get("type") != "access" or "role" not in jwt_data:
+        return False
+    user_id = int(jwt_data[app.config["JWT_IDENTITY_CLAIM"]])
+    return get_revocations().is_revoked(user_id, jwt_data["role"])
@@ -1,7 +1,6 @@
 from datetime import datetime, timedelta, timezone
 from flask import Blueprint, g, request, jsonify, current_app as app
 from functools import wraps
-import requests
 from urllib.parse import parse_qs
 from flask_jwt_extended import (
     create_access_token,
@@ -11,33 +10,41 @@ from flask_jwt_extended import (
     jwt_required,
     set_access_cookies,
     set_refresh_cookies,
-    verify_jwt_in_request,
     unset_jwt_cookies,
 )
 
 # For debugging
 import traceback
 
+from server.cache import bump_catalog
 from server.db import db
+from server.identity import (
+    get_current_role,
+    get_role_claims,
+    invalidate_cached_user,
+)
 from server.models.User import User, AccountStatusEnum
 
 
 bp = Blueprint("auth", __name__, url_prefix="/auth")
 
 
+# The permission decorators below check the "role" claim of the access token,
+# so they don't need to load the user (see "server/revocations.py")
 def not_banned():
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
             try:
-                verify_jwt_in_request()
-
-                if g.user.account_status.value > 1:
-                    return fn(*args, **kwargs)
-                else:
-                    return jsonify({"message": "Banned user is not allowed."}), 403
+                status = AccountStatusEnum[get_current_role()].value
             except:
                 return jsonify({"message": "User is not authenticated."}), 401
+            # Errors raised by the route (ie: "RateLimited") are handled by the
+            # app's error handlers
+            if status > 1:
+                return fn(*args, **kwargs)
+            else:
+                return jsonify({"message": "Banned user is not allowed."}), 403
 
         return decorator
 
@@ -51,13 +58,13 @@ def admin_required():
         @wraps(fn)
         def decorator(*args, **kwargs):
             try:
-                verify_jwt_in_request()
-                if g.user.account_status.value >= 50:
-                    return fn(*args, **kwargs)
-                else:
-                    return jsonify({"message": "Admin only."}), 403
+                status = AccountStatusEnum[get_current_role()].value
             except:
                 return jsonify({"message": "User is not authenticated."}), 401
+            if status >= 50:
+                return fn(*args, **kwargs)
+            else:
+                return jsonify({"message": "Admin only."}), 403
 
         return decorator
 
@@ -70,37 +77,19 @@ def owner_required():
         @wraps(fn)
         def decorator(*args, **kwargs):
             try:
-                verify_jwt_in_request()
-                if g.user.account_status.value == 100:
-                    return fn(*args, **kwargs)
-                else:
-                    return jsonify({"message": "Owner only."}), 403
+                status = AccountStatusEnum[get_current_role()].value
             except:
                 return jsonify({"message": "User is not authenticated."}), 401
+            if status == 100:
+                return fn(*args, **kwargs)
+            else:
+                return jsonify({"message": "Owner only."}), 403
 
         return decorator
 
     return wrapper
 
 
-# Runs before every request, regardless of route
-#  - Sets "g.user" to user data from database if JWT & CSRF tokens are
-#    valid & provided
-@bp.before_app_request
-def get_user_from_jwt():
-    try:
-        # Get user id from JWT if valid (requires "X-CSRF-TOKEN" in request headers)
-        verify_jwt_in_request()
-        user_id = get_jwt_identity()
-        # Look for user in database
-        existing_user = User.query.filter_by(id=user_id).first()
-        g.user = existing_user  # Either None or user data
-    except:
-        # No JWT token, didn't provide "X-CSRF-TOKEN" in request, or
-        # error is thrown from query for user
-        g.user = None
-
-
 # Runs after every request, regardless of route
 #  - Will refresh token 30 minutes before expiration
 #  - Ref: https://flask-jwt-extended.readthedocs.io/en/stable/refreshing_tokens/#implicit-refreshing-with-cookies
@@ -111,7 +100,14 @@ def refresh_expiring_jwts(response):
         now = datetime.now(timezone.utc)
         target_timestamp = datetime.timestamp(now + timedelta(minutes=30))
         if target_timestamp > exp_timestamp:
-            access_token = create_access_token(identity=get_jwt_identity())
+            # The role is read from the user's row (the role of the expiring
+            # token may be out of date once its revocation has expired)
+            user = g.user
+            if user == None:
+                return response
+            access_token = create_access_token(
+                identity=get_jwt_identity(), additional_claims=get_role_claims(user)
+            )
             set_access_cookies(response, access_token)
         return response
     except (RuntimeError, KeyError):
@@ -134,6 +130,9 @@ def authenicateOAuth():
         #     of characters for invalid code length
         if len(code) < 10:
             raise Exception("Invalid code")
+        # Imported on first use as it's slow to import
+        import requests
+
         # Get access token (ie: Returns "access_token=blahblahblahblah")
         acs_tk_resp = requests.post(
             "https://github.com/login/oauth/access_token",
@@ -174,6 +173,8 @@ def authenicateOAuth():
             )
             db.session.add(existing_user)
             db.session.commit()
+            bump_catalog("users")
+            invalidate_cached_user(user_id)
     except:
         # Randomly fails to log in sometimes
         print(traceback.format_exc())
@@ -181,7 +182,9 @@ def authenicateOAuth():
 
     # Generate JWT we'll be sending to the user
     #  Ref: https://flask-jwt-extended.readthedocs.io/en/3.0.0_release/tokens_in_cookies/
-    jwt_access_token = create_access_token(identity=user_id)
+    jwt_access_token = create_access_token(
+        identity=user_id, additional_claims=get_role_claims(existing_user)
+    )
     jwt_refresh_token = create_refresh_token(identity=user_id)
 
     # Pass serialized user data in response
@@ -197,10 +200,13 @@ def authenicateOAuth():
 def refresh_token():
     # Create the new access token
     current_user_id = get_jwt_identity()
-    access_token = create_access_token(identity=current_user_id)
     user_data = User.query.filter_by(id=current_user_id).first()
     if user_data == None:
         return jsonify({"message": "User not found."}), 500
+    # The new token carries the current account status of the user
+    access_token = create_access_token(
+        identity=current_user_id, additional_claims=get_role_claims(user_data)
+    )
     # Set the JWT access cookie in the response
     resp = jsonify({"refresh": True, "userData": user_data.as_dict()})
     set_access_cookies(resp, access_token)
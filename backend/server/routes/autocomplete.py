@@ -0,0 +1,23 @@
+from flask import Blueprint, jsonify, request
+
+from server.autocomplete import INDEX_KINDS, MAX_SUGGESTIONS, get_prefix_index
+
+bp = Blueprint("autocomplete", __name__, url_prefix="/autocomplete")
+
+
+@bp.route("/")
+def autocomplete():
+    kind = request.args.get("kind", default="", type=str)
+    query = request.args.get("q", default="", type=str).strip()
+    limit = request.args.get("limit", default=10, type=int)
+
+    if kind not in INDEX_KINDS:
+        return jsonify({"message": "Invalid kind."}), 400
+    if query == "":
+        return jsonify({"message": "Query can't be empty."}), 400
+    if limit <= 0 or limit > MAX_SUGGESTIONS:
+        response = {"message": f"Limit must be between 1 and {MAX_SUGGESTIONS}."}
+        return jsonify(response), 400
+
+    results = get_prefix_index(kind).search(query, limit)
+    return jsonify({"results": results}), 200
@@ -1,17 +1,23 @@
 from flask import Blueprint, jsonify
 
+from server.cache import get_catalog
 from server.models.Language import Language
-from server.utils import serialize_sqlalchemy_objs
 
 bp = Blueprint("languages", __name__, url_prefix="/languages")
 
 
-@bp.route("/")
-def get_languages():
+def build_languages_catalog():
     languages = Language.query.all()
 
-    response = {
+    return {
         "message": "Successfully obtained all languages.",
-        "languages": serialize_sqlalchemy_objs(languages),
+        # Include the number of repositories using each language (maintained counter)
+        "languages": [
+            {**lang.as_dict(), "repo_count": lang.repo_count} for lang in languages
+        ],
     }
-    return jsonify(response), 200
+
+
+@bp.route("/")
+def get_languages():
+    return jsonify(get_catalog("languages", build_languages_catalog)), 200
@@ -1,41 +1,251 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
 from math import ceil
+import json
 import traceback
 
+from server.db import db
 from server.utils import (
     serialize_sqlalchemy_objs,
+    parse_date_param,
+    decode_cursor,
+    get_keyset_page,
+    keyset_filter,
+    keyset_datetime,
+    cursor_datetime,
 )
 from server.routes.auth import admin_required
+from server.exports import csv_response
+from server.log_archive import list_archive_months, read_archive, MONTH_PATTERN
 from server.models.Log import Log
+from server.models.LogDailyStat import LogDailyStat
+from server.models.User import User
 
 bp = Blueprint("logs", __name__, url_prefix="/logs")
 
+# Max number of logs returned per page
+MAX_LOGS_PAGE_SIZE = 100
+# The fields the log stats can be grouped by
+STATS_FIELDS = ["day", "type", "action", "enacted_by"]
 
+
+# Filter the logs with the query string parameters (raises ValueError if a
+# parameter is invalid)
+#  - "type", "action" (prefix), "enacted_by", "content_id" & a "from"/"to"
+#    range on the creation date
+def filter_logs(query):
+    log_type = request.args.get("type", default="", type=str).strip()
+    action = request.args.get("action", default="", type=str).strip()
+    enacted_by = request.args.get("enacted_by", default="", type=str).strip()
+    content_id = request.args.get("content_id", default="", type=str).strip()
+    from_date = parse_date_param("from")
+    to_date = parse_date_param("to")
+
+    if log_type:
+        query = query.filter(Log.type == log_type)
+    if action:
+        query = query.filter(Log.action.startswith(action, autoescape=True))
+    if enacted_by:
+        query = query.filter(Log.enacted_by == int(enacted_by))
+    if content_id:
+        query = query.filter(Log.content_id == content_id)
+    # Compared like they're sorted, to use the indexes (see "keyset_datetime()")
+    if from_date:
+        query = query.filter(
+            keyset_datetime(Log.created_at) >= keyset_datetime(from_date)
+        )
+    if to_date:
+        query = query.filter(
+            keyset_datetime(Log.created_at) <= keyset_datetime(to_date)
+        )
+    return query
+
+
+# Route to get the logs (newest first)
+#  - Pages are fetched with a cursor: "next_cursor" is passed as the "cursor"
+#    parameter to get the next page (every page is as fast as the first)
+#  - Passing "page" instead uses numbered pages (slower the further the page
+#    is, as the previous pages are counted & skipped)
 @bp.route("/")
 @admin_required()
 def filtered_repositories():
     # Extracting values from query string
     limit = request.args.get("limit", default=25, type=int)
-    if limit != None and limit <= 0:
-        limit = 25
-    page = request.args.get("page", default=1, type=int)
-    if page != None and page < 1:
-        page = 1
+    page = request.args.get("page", default=None, type=int)
+    cursor = request.args.get("cursor", default=None, type=str)
 
+    if page == None and (limit <= 0 or limit > MAX_LOGS_PAGE_SIZE):
+        response = {"message": f"Limit must be between 1 and {MAX_LOGS_PAGE_SIZE}."}
+        return jsonify(response), 400
     try:
-        # Create query & get results
-        query = Log.query.order_by(Log.created_at.desc())
-        numEntries = query.count()
-        results = query.offset((page - 1) * limit).limit(limit).all()
+        # Load the admins along with the logs
+        query = filter_logs(Log.query.options(joinedload(Log.user)))
+    except ValueError:
+        return jsonify({"message": "Invalid filters."}), 400
+    try:
+        after = None
+        if cursor:
+            created_at, id = decode_cursor(cursor, [str, int])
+            after = (cursor_datetime(created_at), id)
+    except ValueError:
+        return jsonify({"message": "Invalid cursor."}), 400
+
+    try:
+        created_at = keyset_datetime(Log.created_at)
+        query = query.order_by(created_at.desc(), Log.id.desc())
+        if page != None:
+            return get_numbered_page(query, page, limit)
+
+        if after:
+            query = query.filter(
+                keyset_filter([created_at, Log.id], after, descending=True)
+            )
+        results, next_cursor = get_keyset_page(
+            query, limit, lambda log: [log.created_at.isoformat(), log.id]
+        )
 
         response = {
             "message": "Found results.",
-            "currPage": page if numEntries != 0 else 0,
-            "numPages": ceil(numEntries / limit),
             "logs": serialize_sqlalchemy_objs(results),
+            "next_cursor": next_cursor,
         }
         return jsonify(response), 200
     except:
         print(traceback.format_exc())
         response = {"message": "Something went wrong with finding logs in our databse."}
         return jsonify(response), 500
+
+
+def get_numbered_page(query, page, limit):
+    if limit <= 0:
+        limit = 25
+    if page < 1:
+        page = 1
+
+    numEntries = query.order_by(None).count()
+    results = query.offset((page - 1) * limit).limit(limit).all()
+
+    response = {
+        "message": "Found results.",
+        "currPage": page if numEntries != 0 else 0,
+        "numPages": ceil(numEntries / limit),
+        "logs": serialize_sqlalchemy_objs(results),
+    }
+    return jsonify(response), 200
+
+
+# Route to export the logs (oldest first) as a CSV file
+#  - Filters: see "filter_logs()"
+#  - Passing "compress=gzip" gzips the file
+@bp.route("/export")
+@admin_required()
+def export_logs():
+    compress = request.args.get("compress", default="", type=str).strip()
+
+    if compress not in ["", "gzip"]:
+        return jsonify({"message": "Invalid compression."}), 400
+    try:
+        stmt = filter_logs(
+            select(
+                Log.id,
+                Log.created_at,
+                Log.action,
+                Log.type,
+                Log.content_id,
+                Log.enacted_by,
+                User.username,
+            ).join(Log.user)
+        ).order_by(keyset_datetime(Log.created_at), Log.id)
+    except ValueError:
+        return jsonify({"message": "Invalid filters."}), 400
+
+    header = [
+        "id",
+        "created_at",
+        "action",
+        "type",
+        "content_id",
+        "enacted_by",
+        "enacted_by_username",
+    ]
+    return csv_response("logs", stmt, header, compress=compress == "gzip")
+
+
+# Route to get the number of logged actions (read from the daily stats, see
+# "server/log_stats.py")
+#  - "group_by": Comma-separated list of "day", "type", "action" & "enacted_by"
+#    (defaults to "day")
+#  - Filters: "type", "enacted_by" & a "from"/"to" range of days
+@bp.route("/stats")
+@admin_required()
+def get_log_stats():
+    group_by = request.args.get("group_by", default="day", type=str).strip()
+    log_type = request.args.get("type", default="", type=str).strip()
+    enacted_by = request.args.get("enacted_by", default="", type=str).strip()
+
+    group_by = [field.strip() for field in group_by.split(",") if field.strip()]
+    if len(group_by) == 0 or any(field not in STATS_FIELDS for field in group_by):
+        response = {
+            "message": f"Stats can only be grouped by {', '.join(STATS_FIELDS)}."
+        }
+        return jsonify(response), 400
+    try:
+        from_date = parse_date_param("from")
+        to_date = parse_date_param("to")
+        enacted_by = int(enacted_by) if enacted_by else None
+    except ValueError:
+        return jsonify({"message": "Invalid filters."}), 400
+
+    columns = [getattr(LogDailyStat, field) for field in group_by]
+    query = select(*columns, func.sum(LogDailyStat.count)).group_by(*columns)
+    if log_type:
+        query = query.where(LogDailyStat.type == log_type)
+    if enacted_by != None:
+        query = query.where(LogDailyStat.enacted_by == enacted_by)
+    if from_date:
+        query = query.where(LogDailyStat.day >= from_date.date())
+    if to_date:
+        query = query.where(LogDailyStat.day <= to_date.date())
+
+    stats = []
+    for row in db.session.execute(query.order_by(*columns)):
+        stat = dict(zip(group_by, row[:-1]))
+        if "day" in stat:
+            stat["day"] = stat["day"].isoformat()
+        stat["count"] = row[-1]
+        stats.append(stat)
+
+    response = {"message": "Successfully obtained log stats.", "stats": stats}
+    return jsonify(response), 200
+
+
+# Route to list the months that have archived logs (logs older than
+# "LOG_RETENTION" are moved out of the database, see "server/log_archive.py")
+@bp.route("/archive")
+@admin_required()
+def get_archive_months():
+    response = {
+        "message": "Successfully obtained archived months.",
+        "months": list_archive_months(),
+    }
+    return jsonify(response), 200
+
+
+# Route to stream the archived logs of a month (formatted "YYYY-MM") as
+# newline-delimited JSON
+@bp.route("/archive/<month>")
+@admin_required()
+def get_archived_logs(month):
+    log_type = request.args.get("type", default="", type=str).strip()
+
+    if not MONTH_PATTERN.match(month):
+        return jsonify({"message": "Invalid month."}), 400
+    if month not in list_archive_months():
+        return jsonify({"message": "No logs were archived for this month."}), 404
+
+    def generate():
+        for log in read_archive(month, type=log_type or None):
+            yield json.dumps(log) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
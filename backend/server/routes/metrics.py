@@ -0,0 +1,22 @@
+from flask import Blueprint, jsonify
+
+from server.db import db
+from server.db_pool import get_pool_stats
+from server.routes.auth import admin_required
+
+bp = Blueprint("metrics", __name__, url_prefix="/metrics")
+
+
+# Route to get the state of the database connection pools of this worker
+# process (each worker has its own pools)
+@bp.route("/pool")
+@admin_required()
+def get_pool_metrics():
+    response = {
+        "message": "Successfully obtained pool metrics.",
+        "pools": {
+            bind_key or "default": get_pool_stats(engine)
+            for bind_key, engine in db.engines.items()
+        },
+    }
+    return jsonify(response), 200
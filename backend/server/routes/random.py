@@ -1,12 +1,188 @@
 from flask import Blueprint, request, jsonify, current_app as app
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload, joinedload
 from urllib.parse import quote
-import requests
+from math import ceil
 import random
+import traceback
 
+from server.cache import get_cache
+from server.db import db
+from server.github import github_get, RateLimited
+from server.models.Repository import Repository, RepoLanguage
 from server.utils import normalizeStr
 
 bp = Blueprint("random", __name__, url_prefix="/random")
 
+# Number of results we request per GitHub search (the max allowed by GitHub)
+SEARCH_PAGE_SIZE = 100
+# Max number of random repositories returned (a GitHub search page)
+MAX_RANDOM_LIMIT = SEARCH_PAGE_SIZE
+# Sampling our own repositories (see "sample_local_repositories()")
+SAMPLE_PIVOTS_PER_QUERY = 100
+SAMPLE_MAX_DRAWS = 3
+
+
+class SearchFailed(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"GitHub search failed with status {status_code}")
+        self.status_code = status_code
+
+
+# Runs a GitHub repository search & returns the found items
+def search_repositories(query):
+    request_url = f"https://api.github.com/search/repositories?q={query}&per_page={SEARCH_PAGE_SIZE}&sort=stars&order=asc"
+    resp = github_get(request_url, "random")
+    if resp.status_code != 200:
+        raise SearchFailed(resp.status_code)
+    return resp.json()["items"]
+
+
+# Get a random sample of repositories from a (cached) GitHub search
+def sample_github_repositories(filtered_lang, minStars, maxStars, limit, raw=False):
+    langQuery = (
+        ""
+        if len(filtered_lang) == 0
+        else "+{}".format(
+            "+".join([f'language:"{quote(lang)}"' for lang in filtered_lang])
+        )
+    )
+    # Get query string for "stars" filter
+    #  - Create a random "min" value to reduce the chance of getting the
+    #    same results from the GitHub API route
+    #  - The "min" value is snapped onto one of a fixed number of buckets in
+    #    the star range so the number of distinct searches (& cache entries)
+    #    stays bounded no matter how many requests we get
+    upper = max(maxStars if maxStars != None else 10000, minStars)
+    numBuckets = app.config["RANDOM_STAR_BUCKETS"]
+    bucketSize = max(1, ceil((upper - minStars) / numBuckets))
+    randMin = min(minStars + bucketSize * random.randrange(numBuckets), upper)
+    starsQuery = (
+        f"stars:>={randMin}" if maxStars == None else f"stars:{randMin}..{maxStars}"
+    )
+
+    cache = get_cache(
+        "random",
+        maxsize=app.config["RANDOM_CACHE_SIZE"],
+        ttl=app.config["RANDOM_CACHE_TTL"],
+        refresh_ahead=app.config["RANDOM_CACHE_REFRESH_AHEAD"],
+    )
+    cache_key = (tuple(filtered_lang), randMin, maxStars, raw)
+
+    # Background refreshes of the cache run outside of this request, so they
+    # need their own app context
+    app_obj = app._get_current_object()
+
+    def load_results():
+        with app_obj.app_context():
+            items = search_repositories(f"{starsQuery}{langQuery}")
+        # Only keep what we return so cached entries stay small
+        return items if raw else [project_item(item) for item in items]
+
+    pool = cache.get_or_load(cache_key, load_results)
+    # Return a random sample of the cached results
+    return random.sample(pool, min(max(limit, 0), len(pool)))
+
+
+# Get a random sample of repositories from our own database.
+#  - "ORDER BY RANDOM()" has to read & sort every matching row, so instead each
+#    repository of the sample is the first matching one at or after its own
+#    random id in the range of matching ids (a lookup in the primary key index,
+#    made "SAMPLE_PIVOTS_PER_QUERY" at a time). Repositories after large gaps in
+#    the ids are picked more often.
+#  - Pivots that land on an already picked repository are redrawn (up to
+#    "SAMPLE_MAX_DRAWS" times the size of the sample), then the sample is
+#    filled with the next matching repositories.
+def sample_local_repositories(langs, minStars, maxStars, limit):
+    query = Repository.query.filter(Repository.stars >= minStars)
+    if maxStars != None:
+        query = query.filter(Repository.stars <= maxStars)
+    if langs:
+        query = query.filter(
+            Repository.languages.any(RepoLanguage.language_name.in_(langs))
+        )
+
+    minId, maxId, count = query.with_entities(
+        func.min(Repository.id), func.max(Repository.id), func.count()
+    ).one()
+    if count == 0 or limit <= 0:
+        return []
+
+    ids_query = query.with_entities(Repository.id).order_by(Repository.id)
+    if count <= limit:
+        ids = set(id for (id,) in ids_query)
+    else:
+        ids = set()
+        draws_left = limit * SAMPLE_MAX_DRAWS
+        while len(ids) < limit and draws_left > 0:
+            num_pivots = min(limit - len(ids), SAMPLE_PIVOTS_PER_QUERY, draws_left)
+            draws_left -= num_pivots
+            pivots = [random.randint(minId, maxId) for _ in range(num_pivots)]
+            ids.update(
+                db.session.execute(
+                    select(
+                        *[
+                            ids_query.filter(Repository.id >= pivot)
+                            .limit(1)
+                            .scalar_subquery()
+                            for pivot in pivots
+                        ]
+                    )
+                ).one()
+            )
+        if len(ids) < limit:
+            ids.update(
+                id
+                for (id,) in ids_query.filter(Repository.id.not_in(ids)).limit(
+                    limit - len(ids)
+                )
+            )
+
+    results = (
+        query.options(
+            selectinload(Repository.languages).joinedload(RepoLanguage.language)
+        )
+        .filter(Repository.id.in_(ids))
+        .all()
+    )
+    random.shuffle(results)
+    return [local_item(repo) for repo in results]
+
+
+# Reduce a GitHub search result item (which is several KB of nested owner,
+# license & URL fields) to the fields that we display
+def project_item(item):
+    owner = item.get("owner") or {}
+    return {
+        "id": item["id"],
+        "full_name": item["full_name"],
+        "owner": {
+            "login": owner.get("login"),
+            "avatar_url": owner.get("avatar_url"),
+        },
+        "description": item.get("description"),
+        "stargazers_count": item["stargazers_count"],
+        "language": item.get("language"),
+        "html_url": item["html_url"],
+    }
+
+
+# Format a repository from our database like a projected GitHub search item
+def local_item(repo):
+    primary_lang = next(
+        (lang.language for lang in repo.languages if lang.is_primary), None
+    )
+    return {
+        "id": repo.id,
+        "full_name": f"{repo.author}/{repo.repo_name}",
+        # We don't store the avatar of repository owners
+        "owner": {"login": repo.author, "avatar_url": None},
+        "description": repo.description,
+        "stargazers_count": repo.stars,
+        "language": primary_lang.display_name if primary_lang else None,
+        "html_url": repo.repo_link,
+    }
+
 
 @bp.route("/")
 def get_random_repository():
@@ -15,7 +191,19 @@ def get_random_repository():
     langs = request.args.get("languages", default="", type=str)
     minStars = request.args.get("minStars", default=0, type=int)
     maxStars = request.args.get("maxStars", default=None, type=int)
+    # Where to find repositories ("github" or our own database with "local")
+    source = request.args.get("source", default="github", type=str)
+    # Results from GitHub are reduced to the fields we display unless the
+    # unmodified search result items are requested with "format=raw"
+    format = request.args.get("format", default="compact", type=str)
 
+    if limit <= 0 or limit > MAX_RANDOM_LIMIT:
+        response = {"message": f"Limit must be between 1 and {MAX_RANDOM_LIMIT}."}
+        return jsonify(response), 400
+    if source not in ["github", "local"]:
+        return jsonify({"message": "Invalid source."}), 400
+    if format not in ["compact", "raw"]:
+        return jsonify({"message": "Invalid format."}), 400
     if minStars < 0 or (maxStars != None and minStars >= maxStars):
         return jsonify({"message": "Invalid values for star parameters."}), 400
 
@@ -25,39 +213,32 @@ def get_random_repository():
     ]
     if len(filtered_lang) > 3:
         return jsonify({"message": "Too many languages."}), 400
+    # Sort languages so the same set always maps to the same cache entry
+    filtered_lang = sorted(set(filtered_lang))
 
-    langQuery = (
-        ""
-        if len(filtered_lang) == 0
-        else "+{}".format("+".join([f'language:"{quote(lang)}"' for lang in filtered_lang]))
-    )
-    # Get query string for "stars" filter
-    #  - Create a random "min" value to reduce the chance of getting the
-    #    same results from the GitHub API route
-    randMin = random.randint(minStars, maxStars if maxStars != None else 10000)
-    starsQuery = (
-        f"stars:>={randMin}" if maxStars == None else f"stars:{randMin}..{maxStars}"
-    )
+    if source == "github":
+        try:
+            results = sample_github_repositories(
+                filtered_lang, minStars, maxStars, limit, raw=(format == "raw")
+            )
+            return jsonify({"results": results, "source": "github"}), 200
+        except SearchFailed as err:
+            # Keep discovery working with our own repositories when we're rate
+            # limited (403) or GitHub rejected the search (422)
+            if err.status_code not in [403, 422]:
+                response = {"message": "Something went wrong with your request."}
+                return jsonify(response), 503
+        except RateLimited:
+            # Searches have used up their share of the GitHub API budget
+            pass
+        except:
+            print(traceback.format_exc())
+            response = {"message": "Something went wrong with your request."}
+            return jsonify(response), 500
 
     try:
-        # Will fetch up to 100 results for this "page" (allows pagination)
-        request_url = f"https://api.github.com/search/repositories?q={starsQuery}{langQuery}&per_page={limit}&sort=stars&order=asc"
-        print(request_url)
-        resp = requests.get(
-            request_url,
-            # Below does the "-u client_id:client_secret" in the CURL command
-            auth=(app.config["GITHUB_CLIENT_ID"], app.config["GITHUB_CLIENT_SECRET"]),
-            headers={
-                "Accept": "application/vnd.github.text-match+json",
-                "User-Agent": "gitinspire-server",
-            },
-        )
-        data = resp.json()
-
-        if resp.status_code == 200:
-            # Return up to 100 results to save on rate limit
-            return jsonify({"results": data["items"]}), 200
-        else:
-            return jsonify({"message": "Something went wrong with your request."}), 503
+        results = sample_local_repositories(filtered_lang, minStars, maxStars, limit)
+        return jsonify({"results": results, "source": "local"}), 200
     except:
+        print(traceback.format_exc())
         return jsonify({"message": "Something went wrong with your request."}), 500
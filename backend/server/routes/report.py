@@ -1,33 +1,283 @@
 from flask import Blueprint, g, jsonify, request
 from flask_jwt_extended import jwt_required
-from sqlalchemy import delete, text
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.orm import joinedload
 import traceback
 
+from server.audit import log_action
 from server.db import db
+from server.exports import csv_response
 from server.models.Report import Report
-from server.utils import serialize_sqlalchemy_objs
+from server.models.User import User
+from server.utils import (
+    serialize_sqlalchemy_objs,
+    parse_date_param,
+    decode_cursor,
+    get_keyset_page,
+    keyset_filter,
+    keyset_datetime,
+    cursor_datetime,
+    likely,
+)
 from server.routes.auth import not_banned, admin_required
 
 bp = Blueprint("report", __name__, url_prefix="/report")
 
+# Max number of reports (or groups of reports) returned per page
+MAX_REPORTS_PAGE_SIZE = 100
+# Number of reasons returned for each group of reports
+LATEST_REASONS_PER_GROUP = 3
+# The types of reports that admins can handle (the owner handles all of them)
+ADMIN_REPORT_TYPES = ["repository", "user", "tag"]
 
+
+# Filter the reports the user can see with the query string parameters
+# (raises ValueError if the date range is invalid)
+#  - "type", "content_id" & a "from"/"to" range on the creation date
+def filter_reports(query):
+    user = g.user.as_dict()
+
+    report_type = request.args.get("type", default="", type=str).strip()
+    content_id = request.args.get("content_id", default="", type=str).strip()
+    from_date = parse_date_param("from")
+    to_date = parse_date_param("to")
+
+    # Owner should have access to all reports, admins should have access to
+    # some reports
+    if user["account_status"] != "owner":
+        query = query.filter(likely(Report.type.in_(ADMIN_REPORT_TYPES)))
+    if report_type:
+        query = query.filter(Report.type == report_type)
+    if content_id:
+        query = query.filter(Report.content_id == content_id)
+    # Compared like they're sorted, to use the indexes (see "keyset_datetime()")
+    if from_date:
+        query = query.filter(
+            keyset_datetime(Report.created_at) >= keyset_datetime(from_date)
+        )
+    if to_date:
+        query = query.filter(
+            keyset_datetime(Report.created_at) <= keyset_datetime(to_date)
+        )
+    return query
+
+
+# Route to get a page of reports (newest first)
+#  - Filters: see "filter_reports()"
+#  - "next_cursor" is passed as the "cursor" parameter to get the next page
 @bp.route("/")
 @admin_required()
 def get_all_reports():
-    user = g.user.as_dict()
+    limit = request.args.get("limit", default=50, type=int)
+    cursor = request.args.get("cursor", default=None, type=str)
 
-    reports = []
-    if user["account_status"] == "owner":
-        # Owner should have access to all reports
-        reports = Report.query.all()
-    elif user["account_status"] == "admin":
-        # Admins should have access to some reports
-        allowed_reports = ["repository", "user", "tag"]
-        reports = Report.query.filter(Report.type.in_(allowed_reports)).all()
+    if limit <= 0 or limit > MAX_REPORTS_PAGE_SIZE:
+        response = {"message": f"Limit must be between 1 and {MAX_REPORTS_PAGE_SIZE}."}
+        return jsonify(response), 400
+    try:
+        # Load the reporters along with the reports
+        query = filter_reports(Report.query.options(joinedload(Report.user)))
+    except ValueError:
+        return jsonify({"message": "Invalid date range."}), 400
+    try:
+        after = None
+        if cursor:
+            created_at, id = decode_cursor(cursor, [str, int])
+            after = (cursor_datetime(created_at), id)
+    except ValueError:
+        return jsonify({"message": "Invalid cursor."}), 400
+
+    created_at = keyset_datetime(Report.created_at)
+    if after:
+        query = query.filter(
+            keyset_filter([created_at, Report.id], after, descending=True)
+        )
+
+    reports, next_cursor = get_keyset_page(
+        query.order_by(created_at.desc(), Report.id.desc()),
+        limit,
+        lambda report: [report.created_at.isoformat(), report.id],
+    )
 
     response = {
         "message": "Successfully obtained all reports.",
         "reports": serialize_sqlalchemy_objs(reports),
+        "next_cursor": next_cursor,
+    }
+    return jsonify(response), 200
+
+
+# Route to export the reports (oldest first) as a CSV file
+#  - Filters: see "filter_reports()"
+#  - Passing "compress=gzip" gzips the file
+@bp.route("/export")
+@admin_required()
+def export_reports():
+    compress = request.args.get("compress", default="", type=str).strip()
+
+    if compress not in ["", "gzip"]:
+        return jsonify({"message": "Invalid compression."}), 400
+    try:
+        stmt = filter_reports(
+            select(
+                Report.id,
+                Report.created_at,
+                Report.type,
+                Report.content_id,
+                Report.reason,
+                Report.maintain_link,
+                Report.info,
+                Report.reported_by,
+                User.username,
+            ).join(Report.user)
+        ).order_by(keyset_datetime(Report.created_at), Report.id)
+    except ValueError:
+        return jsonify({"message": "Invalid date range."}), 400
+
+    header = [
+        "id",
+        "created_at",
+        "type",
+        "content_id",
+        "reason",
+        "maintain_link",
+        "info",
+        "reported_by",
+        "reported_by_username",
+    ]
+    return csv_response("reports", stmt, header, compress=compress == "gzip")
+
+
+# Route to get the reports grouped by the content they're about (most
+# recently reported first), with the number of reports & their latest reasons
+@bp.route("/groups")
+@admin_required()
+def get_report_groups():
+    user = g.user.as_dict()
+
+    limit = request.args.get("limit", default=50, type=int)
+    report_type = request.args.get("type", default="", type=str).strip()
+    cursor = request.args.get("cursor", default=None, type=str)
+
+    if limit <= 0 or limit > MAX_REPORTS_PAGE_SIZE:
+        response = {"message": f"Limit must be between 1 and {MAX_REPORTS_PAGE_SIZE}."}
+        return jsonify(response), 400
+    try:
+        after = None
+        if cursor:
+            latest_at, type, content_id = decode_cursor(cursor, [str, str, str])
+            after = (cursor_datetime(latest_at), type, content_id)
+    except ValueError:
+        return jsonify({"message": "Invalid cursor."}), 400
+
+    latest_at = func.max(keyset_datetime(Report.created_at))
+    query = db.session.query(
+        Report.type, Report.content_id, func.count().label("count"), latest_at
+    ).group_by(Report.type, Report.content_id)
+    if user["account_status"] != "owner":
+        query = query.filter(Report.type.in_(ADMIN_REPORT_TYPES))
+    if report_type:
+        query = query.filter(Report.type == report_type)
+    if after:
+        query = query.having(
+            keyset_filter(
+                [latest_at, Report.type, Report.content_id], after, descending=True
+            )
+        )
+
+    groups, next_cursor = get_keyset_page(
+        query.order_by(latest_at.desc(), Report.type.desc(), Report.content_id.desc()),
+        limit,
+        lambda group: [group[3].isoformat(), group.type, group.content_id],
+    )
+
+    # Get the latest reasons of each group of the page in a single query
+    reasons = {}
+    if groups:
+        rank = (
+            func.row_number()
+            .over(
+                partition_by=(Report.type, Report.content_id),
+                order_by=(
+                    keyset_datetime(Report.created_at).desc(),
+                    Report.id.desc(),
+                ),
+            )
+            .label("rank")
+        )
+        ranked = (
+            select(Report.type, Report.content_id, Report.reason, rank)
+            .where(
+                tuple_(Report.type, Report.content_id).in_(
+                    [(group.type, group.content_id) for group in groups]
+                )
+            )
+            .subquery()
+        )
+        for type, content_id, reason, _ in db.session.execute(
+            select(ranked).where(ranked.c.rank <= LATEST_REASONS_PER_GROUP)
+        ):
+            reasons.setdefault((type, content_id), []).append(reason)
+
+    response = {
+        "message": "Successfully obtained report groups.",
+        "groups": [
+            {
+                "type": group.type,
+                "content_id": group.content_id,
+                "count": group.count,
+                "latest_reported_at": group[3].isoformat(),
+                "latest_reasons": reasons.get((group.type, group.content_id), []),
+            }
+            for group in groups
+        ],
+        "next_cursor": next_cursor,
+    }
+    return jsonify(response), 200
+
+
+# Route to resolve or dismiss all the reports about a piece of content at once
+@bp.route("/groups", methods=["DELETE"])
+@admin_required()
+def handle_report_group():
+    user = g.user.as_dict()
+
+    action = request.args.get("action", default="", type=str).strip()
+    report_type = request.args.get("type", default="", type=str).strip()
+    content_id = request.args.get("content_id", default="", type=str).strip()
+
+    if not action in ["resolve", "dismiss"]:
+        return jsonify({"message": "Invalid action on report."}), 400
+    if report_type == "":
+        return jsonify({"message": "A report type must be provided."}), 400
+    if user["account_status"] != "owner" and report_type not in ADMIN_REPORT_TYPES:
+        response = {"message": "You don't have permission to handle these reports."}
+        return jsonify(response), 403
+
+    try:
+        result = db.session.execute(
+            delete(Report).where(
+                Report.type == report_type, Report.content_id == content_id
+            )
+        )
+        # Log the action on the content the reports were about
+        if result.rowcount > 0:
+            log_action(
+                db.session,
+                action=f"{action} {result.rowcount} report(s)",
+                type=report_type,
+                content_id=content_id,
+                enacted_by=user["id"],
+            )
+        db.session.commit()
+    except:
+        print(traceback.format_exc())
+        response = {"message": "Something went wrong with handling the reports."}
+        return jsonify(response), 500
+
+    response = {
+        "message": f"{result.rowcount} report(s) have been {action}.",
+        "count": result.rowcount,
     }
     return jsonify(response), 200
 
@@ -80,16 +330,6 @@ def create_report():
     report.reported_by = user["id"]
 
     try:
-        try:
-            # Make sure ids sequence value is correct (help prevent creating record w/ duplicate id for Postgresql Database)
-            db.session.execute(
-                text(
-                    "SELECT setval(pg_get_serial_sequence('reports', 'id'), coalesce(max(id)+1, 1), false) FROM reports"
-                )
-            )
-            db.session.commit()
-        except:
-            pass
         # Add the Report to the database and commit the transaction.
         db.session.add(report)
         db.session.commit()
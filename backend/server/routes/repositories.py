@@ -1,10 +1,8 @@
-from flask import Blueprint, g, jsonify, request, current_app as app
+from flask import Blueprint, g, jsonify, request
 from flask_jwt_extended import jwt_required
-from sqlalchemy import delete, update, text
-import requests
+from sqlalchemy import delete, update
 from math import ceil
 import traceback
-import validators
 
 from server.utils import (
     isXDayOld,
@@ -14,10 +12,18 @@ from server.utils import (
     serialize_sqlalchemy_objs,
 )
 from server.routes.auth import not_banned, admin_required
+from server.audit import log_action
+from server.cache import bump_catalog
+from server.counters import (
+    adjust_tag_counts,
+    adjust_language_counts,
+    adjust_user_counts,
+    get_repository_usage,
+)
 from server.db import db
+from server.github import github_get
 from server.models.Language import Language
 from server.models.Tag import Tag
-from server.models.Log import Log
 from server.models.Repository import Repository, RepoLanguage, RepoTag
 
 bp = Blueprint("repositories", __name__, url_prefix="/repositories")
@@ -175,13 +181,8 @@ def create_repository():
         return jsonify({"message": "Something went wrong with validating tags."}), 500
 
     # Find repository information from GitHub
-    repo_dt_resp = requests.get(
-        f"https://api.github.com/repos/{author}/{repo_name}",
-        auth=(app.config["GITHUB_CLIENT_ID"], app.config["GITHUB_CLIENT_SECRET"]),
-        headers={
-            "Accept": "application/vnd.github.text-match+json",
-            "User-Agent": "gitinspire-server",
-        },
+    repo_dt_resp = github_get(
+        f"https://api.github.com/repos/{author}/{repo_name}", "suggest"
     )
     repo_data = repo_dt_resp.json()
     if not repo_dt_resp.ok:
@@ -197,25 +198,22 @@ def create_repository():
         return jsonify(response), 200
 
     # Get languages
-    repo_lang_dt_resp = requests.get(
-        repo_data["languages_url"],
-        auth=(app.config["GITHUB_CLIENT_ID"], app.config["GITHUB_CLIENT_SECRET"]),
-        headers={
-            "Accept": "application/vnd.github.text-match+json",
-            "User-Agent": "gitinspire-server",
-        },
-    )
+    repo_lang_dt_resp = github_get(repo_data["languages_url"], "suggest")
     repo_lang_data = repo_lang_dt_resp.json()
     if not repo_lang_dt_resp.ok:
         return jsonify({"message": "Failed to find repository languages."}), 500
 
     # Add languages to database if they don't exist
     sorted_langs = filterLangs(repo_lang_data)
+    added_langs = False
     for lg in sorted_langs:
         if Language.query.filter_by(name=normalizeStr(lg)).first() == None:
             new_lang = Language(name=normalizeStr(lg), display_name=lg)
             db.session.add(new_lang)
+            added_langs = True
     db.session.commit()
+    if added_langs:
+        bump_catalog("languages")
 
     try:
         # Add repository to our database
@@ -229,6 +227,8 @@ def create_repository():
             suggested_by=user["id"],
         )
         db.session.add(new_repo)
+        adjust_tag_counts([primary_tag["value"]], 1)
+        adjust_user_counts(user["id"], repos=1)
         db.session.commit()
     except:
         print(traceback.format_exc())
@@ -249,6 +249,8 @@ def create_repository():
             for tg in tags:
                 new_tag_rel = RepoTag(repo_id=repo_data["id"], tag_name=tg["value"])
                 db.session.add(new_tag_rel)
+        adjust_tag_counts([tg["value"] for tg in tags], 1)
+        adjust_language_counts([normalizeStr(lg) for lg in sorted_langs], 1)
         # Save changes
         db.session.commit()
     except:
@@ -280,13 +282,8 @@ def refresh_repository(repoId):
         return jsonify(response), 200
 
     # Call GitHub API since repository data can be refreshed
-    repo_data_resp = requests.get(
-        f"https://api.github.com/repositories/{repoId}",
-        auth=(app.config["GITHUB_CLIENT_ID"], app.config["GITHUB_CLIENT_SECRET"]),
-        headers={
-            "Accept": "application/vnd.github.text-match+json",
-            "User-Agent": "gitinspire-server",
-        },
+    repo_data_resp = github_get(
+        f"https://api.github.com/repositories/{repoId}", "refresh"
     )
 
     # Handle case where rate limit was hit, validation failed, endpoint has been spammed
@@ -299,27 +296,21 @@ def refresh_repository(repoId):
     # Handle case where repository is no longer accessible via the API
     if repo_data_resp.status_code == 404:
         # Delete all SQL objects containing a relation with specified "repoId"
+        tag_names, lang_names = get_repository_usage(repoId)
         db.session.execute(delete(RepoLanguage).where(RepoLanguage.repo_id == repoId))
         db.session.execute(delete(RepoTag).where(RepoTag.repo_id == repoId))
         db.session.execute(delete(Repository).where(Repository.id == repoId))
-        db.session.commit()
-
+        adjust_tag_counts(tag_names, -1)
+        adjust_language_counts(lang_names, -1)
+        adjust_user_counts(existing_repo.suggested_by, repos=-1)
         # Log the automatic deletion
-        log = Log(
-            action=f"delete (auto)",
+        log_action(
+            db.session,
+            action="delete (auto)",
             type="repository",
             content_id=repoId,
-            enacted_by="-1337",  # Bot user id
+            enacted_by=-1337,  # Bot user id
         )
-        try:
-            db.session.execute(
-                text(
-                    "SELECT setval(pg_get_serial_sequence('logs', 'id'), coalesce(max(id)+1, 1), false) FROM logs"
-                )
-            )
-        except:
-            pass
-        db.session.add(log)
         db.session.commit()
 
         response = {
@@ -362,30 +353,29 @@ def refresh_repository(repoId):
         return jsonify(response), 500
 
     # Updating languages if that has changed
-    updt_langs_resp = requests.get(
-        updt_repo_data["languages_url"],
-        auth=(app.config["GITHUB_CLIENT_ID"], app.config["GITHUB_CLIENT_SECRET"]),
-        headers={
-            "Accept": "application/vnd.github.text-match+json",
-            "User-Agent": "gitinspire-server",
-        },
-    )
+    updt_langs_resp = github_get(updt_repo_data["languages_url"], "refresh")
     updt_langs = updt_langs_resp.json()
     if not updt_langs_resp.ok:
         return jsonify({"message": "Failed to find repository languages."}), 500
 
     sorted_langs = filterLangs(updt_langs)
     # Add languages to database if they don't exist
+    added_langs = False
     for lg in sorted_langs:
         if Language.query.filter_by(name=normalizeStr(lg)).first() == None:
             new_lang = Language(name=normalizeStr(lg), display_name=lg)
             db.session.add(new_lang)
+            added_langs = True
     db.session.commit()
+    if added_langs:
+        bump_catalog("languages")
 
     try:
         # Delete previous language relations
+        _, old_lang_names = get_repository_usage(repoId)
         del_stmt = delete(RepoLanguage).where(RepoLanguage.repo_id == repoId)
         db.session.execute(del_stmt)
+        adjust_language_counts(old_lang_names, -1)
         db.session.commit()
 
         # Add the updated langauge relations with repository
@@ -397,6 +387,7 @@ def refresh_repository(repoId):
                     is_primary=(idx == 0),
                 )
                 db.session.add(new_lang_rel)
+        adjust_language_counts([normalizeStr(lg) for lg in sorted_langs], 1)
         db.session.commit()
     except:
         print(traceback.format_exc())
@@ -430,6 +421,9 @@ def update_repository(repoId):
         return jsonify(response), 400
 
     try:
+        # Imported on first use as it's slow to import
+        import validators
+
         if maintain_link != "" and not validators.url(maintain_link, public=True):
             response = {
                 "message": "Maintain URL is not in a valid format (valid is: https://.*)."
@@ -465,17 +459,22 @@ def update_repository(repoId):
         )
 
         # Update primary tag
+        old_primary_tag = existing_repo._primary_tag
         update_stmt = (
             update(Repository)
             .filter_by(id=repoId)
             .values(_primary_tag=primary_tag["value"], maintain_link=maintain_link)
         )
         db.session.execute(update_stmt)
+        adjust_tag_counts([old_primary_tag], -1)
+        adjust_tag_counts([primary_tag["value"]], 1)
         db.session.commit()
 
         # Update tags
+        old_tag_names = [repoTag.tag_name for repoTag in existing_repo.tags]
         delete_stmt = delete(RepoTag).where(RepoTag.repo_id == repoId)
         db.session.execute(delete_stmt)
+        adjust_tag_counts(old_tag_names, -1)
         db.session.commit()
 
         # Add the updated tags relations with repository
@@ -486,24 +485,15 @@ def update_repository(repoId):
                     tag_name=normalizeStr(tag["value"]),
                 )
                 db.session.add(new_tag_rel)
-        db.session.commit()
-
+        adjust_tag_counts([normalizeStr(tag["value"]) for tag in tags], 1)
         # Log the update action
-        log = Log(
+        log_action(
+            db.session,
             action=action_msg,
             type="repository",
             content_id=repoId,
             enacted_by=user["id"],
         )
-        try:
-            db.session.execute(
-                text(
-                    "SELECT setval(pg_get_serial_sequence('logs', 'id'), coalesce(max(id)+1, 1), false) FROM logs"
-                )
-            )
-        except:
-            pass
-        db.session.add(log)
         db.session.commit()
 
         response = {
@@ -530,30 +520,24 @@ def delete_repository(repoId):
 
     # Proceed with delete process
     try:
+        tag_names, lang_names = get_repository_usage(repoId)
         delete_stmt1 = delete(RepoTag).where(RepoTag.repo_id == repoId)
         delete_stmt2 = delete(RepoLanguage).where(RepoLanguage.repo_id == repoId)
         delete_stmt3 = delete(Repository).where(Repository.id == repoId)
         db.session.execute(delete_stmt1)
         db.session.execute(delete_stmt2)
         db.session.execute(delete_stmt3)
-        db.session.commit()
-
+        adjust_tag_counts(tag_names, -1)
+        adjust_language_counts(lang_names, -1)
+        adjust_user_counts(existing_repo.suggested_by, repos=-1)
         # Log the delete action
-        log = Log(
+        log_action(
+            db.session,
             action="delete",
             type="repository",
             content_id=repoId,
             enacted_by=user["id"],
         )
-        try:
-            db.session.execute(
-                text(
-                    "SELECT setval(pg_get_serial_sequence('logs', 'id'), coalesce(max(id)+1, 1), false) FROM logs"
-                )
-            )
-        except:
-            pass
-        db.session.add(log)
         db.session.commit()
 
         response = {"message": "Successfully delete old repository."}
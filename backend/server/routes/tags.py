@@ -1,29 +1,44 @@
 from flask import Blueprint, g, jsonify, request
 from flask_jwt_extended import jwt_required
-from sqlalchemy import update, delete, text
+from sqlalchemy import update, delete
+from sqlalchemy.orm import joinedload
 import traceback
 
+from server.audit import log_action
+from server.cache import get_catalog, bump_catalog
+from server.counters import adjust_tag_counts, adjust_user_counts
 from server.db import db
 from server.models.Tag import Tag, TagTypeEnum
 from server.models.Repository import Repository, RepoTag
-from server.models.Log import Log
-from server.utils import serialize_sqlalchemy_objs, isXMonthOld, normalizeStr
+from server.utils import isXMonthOld, normalizeStr
 from server.routes.auth import not_banned, admin_required
+from server.tag_migration import (
+    get_running_migration,
+    start_tag_migration,
+    run_tag_migration,
+)
 
 bp = Blueprint("tags", __name__, url_prefix="/tags")
 
 
-@bp.route("/")
-def get_tags():
-    primary_tags = Tag.query.filter_by(type="primary").all()
-    user_gen_tags = Tag.query.filter_by(type="user_gen").all()
+def build_tags_catalog():
+    # Load the tags along with the users who suggested them in a single query
+    tags = Tag.query.options(joinedload(Tag.user)).all()
+
+    # Include the number of repositories using each tag (maintained counter)
+    def serialize(tag):
+        return {**tag.as_dict(), "repo_count": tag.repo_count}
 
-    response = {
+    return {
         "message": "Successfully obtained all tags.",
-        "primary": serialize_sqlalchemy_objs(primary_tags),
-        "user_gen": serialize_sqlalchemy_objs(user_gen_tags),
+        "primary": [serialize(tag) for tag in tags if tag.type.name == "primary"],
+        "user_gen": [serialize(tag) for tag in tags if tag.type.name == "user_gen"],
     }
-    return jsonify(response), 200
+
+
+@bp.route("/")
+def get_tags():
+    return jsonify(get_catalog("tags", build_tags_catalog)), 200
 
 
 @bp.route("/", methods=["POST"])
@@ -75,7 +90,9 @@ def create_tag():
     try:
         # Add the Tag to the database and commit the transaction.
         db.session.add(tag)
+        adjust_user_counts(tag.suggested_by, tags=1)
         db.session.commit()
+        bump_catalog("tags")
 
         response = {"message": "Successfully create tag.", "tag": tag.as_dict()}
         return jsonify(response), 200
@@ -120,70 +137,51 @@ def update_tag():
         }
         return jsonify(response), 401
 
-    # Checks to see if tag exists with new name
-    existing_tag = Tag.query.filter_by(name=normalizeStr(new_displayName)).first()
-    if existing_tag != None:
+    new_tagName = normalizeStr(new_displayName)
+    # Whether to merge the tag into an existing tag with the new name
+    merge = request.json.get("merge", False) == True
+
+    # Resume the previous update of this tag if it got interrupted
+    migration = get_running_migration(old_tag.name)
+    if migration != None and migration.new_name != new_tagName:
         response = {
-            "message": "New tag name already exists.",
-            "tag": existing_tag.as_dict(),
+            "message": "Tag is already being updated to another name.",
+            "tag": old_tag.as_dict(),
         }
         return jsonify(response), 400
 
-    try:
-        # Now guaranteed a new tag name
-        new_tag = Tag(
-            display_name=new_displayName,
-            name=normalizeStr(new_displayName),
-            type=old_tag.type.name,
-            suggested_by=old_tag.user.id,
-        )
-        db.session.add(new_tag)
-        db.session.commit()
-
-        # Update all entries that used the old tag
-        update_stmt = None
-        if old_tag.type.name == "user_gen":
-            update_stmt = (
-                update(RepoTag)
-                .where(RepoTag.tag_name == old_tag.name)
-                .values(tag_name=new_tag.name)
-            )
-        elif old_tag.type.name == "primary":
-            update_stmt = (
-                update(Repository)
-                .where(Repository._primary_tag == old_tag.name)
-                .values(_primary_tag=new_tag.name)
-            )
-        db.session.execute(update_stmt)
-        db.session.commit()
-
-        # Delete old tag
-        delete_stmt = delete(Tag).where(Tag.name == old_tag.name)
-        db.session.execute(delete_stmt)
-        db.session.commit()
+    if migration == None:
+        # Checks to see if tag exists with new name
+        existing_tag = Tag.query.filter_by(name=new_tagName).first()
+        if existing_tag != None and not merge:
+            response = {
+                "message": "New tag name already exists.",
+                "tag": existing_tag.as_dict(),
+            }
+            return jsonify(response), 400
+        if existing_tag == None and merge:
+            response = {"message": "Tag to merge into doesn't exist."}
+            return jsonify(response), 400
+        if existing_tag != None and existing_tag.type != old_tag.type:
+            response = {
+                "message": "Can't merge tags of different types.",
+                "tag": existing_tag.as_dict(),
+            }
+            return jsonify(response), 400
 
-        # Log the update action
-        log = Log(
-            action=f"update ({old_tag.name} -> {new_tag.name})",
-            type="tag",
-            content_id=new_tag.name,
-            enacted_by=user["id"],
-        )
-        try:
-            # Make sure ids sequence value is correct (help prevent creating record w/ duplicate id for Postgresql Database)
-            #   - Ref: https://stackoverflow.com/a/37972960
-            db.session.execute(
-                text(
-                    "SELECT setval(pg_get_serial_sequence('logs', 'id'), coalesce(max(id)+1, 1), false) FROM logs"
-                )
-            )
-        except:
-            pass
-        db.session.add(log)
-        db.session.commit()
+    try:
+        if migration == None:
+            migration = start_tag_migration(old_tag, new_displayName, user["id"], merge)
+        # Rewrites the references to the old tag in chunks & logs the action
+        new_tag = run_tag_migration(migration)
+        bump_catalog("tags")
 
         response = {
-            "message": "Successfully updated tag.",
+            "message": (
+                "Successfully merged tag."
+                if migration.action == "merge"
+                else "Successfully updated tag."
+            ),
             "tag": new_tag.as_dict(),
         }
         return jsonify(response), 200
@@ -242,7 +240,8 @@ def delete_tag():
                 .where(Repository._primary_tag == old_tag.name)
                 .values(_primary_tag=rplc_tag.name)
             )
-            db.session.execute(update_stmt)
+            result = db.session.execute(update_stmt)
+            adjust_tag_counts([rplc_tag.name], result.rowcount)
             db.session.commit()
 
         # Delete old user-gen tags references
@@ -253,28 +252,17 @@ def delete_tag():
         # Delete old tag
         delete_stmt = delete(Tag).where(Tag.name == old_tag.name)
         db.session.execute(delete_stmt)
-        db.session.commit()
-
+        adjust_user_counts(old_tag.suggested_by, tags=-1)
         # Log the update action
-        log = Log(
+        log_action(
+            db.session,
             action=actionMsg,
             type="tag",
             content_id=contentId,
             enacted_by=user["id"],
         )
-        try:
-            # Make sure ids sequence value is correct (help prevent creating record w/ duplicate id for Postgresql Database)
-            #   - Ref: https://stackoverflow.com/a/37972960
-            # SQLAlchemy 2.0 requires using "text()" inside an "execute()"
-            db.session.execute(
-                text(
-                    "SELECT setval(pg_get_serial_sequence('logs', 'id'), coalesce(max(id)+1, 1), false) FROM logs"
-                )
-            )
-        except:
-            pass
-        db.session.add(log)
         db.session.commit()
+        bump_catalog("tags")
 
         response = {"message": "Successfully delete old tag."}
         return jsonify(response), 200
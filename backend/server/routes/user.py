@@ -1,16 +1,31 @@
-from flask import Blueprint, g, jsonify, request, current_app as app
-from sqlalchemy import update, text
-import requests
+from flask import Blueprint, g, jsonify, request
+from sqlalchemy import update
+from sqlalchemy.orm import joinedload, selectinload
 import traceback
 
 from server.routes.auth import admin_required
-from server.utils import isXDayOld, serialize_sqlalchemy_objs
+from server.utils import (
+    isXDayOld,
+    serialize_sqlalchemy_objs,
+    decode_cursor,
+    get_keyset_page,
+)
+from server.audit import log_action
+from server.cache import bump_catalog
 from server.db import db
+from server.github import github_get
+from server.identity import invalidate_cached_user
+from server.revocations import revoke_user_tokens
 from server.models.User import User, AccountStatusEnum
-from server.models.Log import Log
+from server.models.Repository import Repository, RepoLanguage, RepoTag
+from server.models.Tag import Tag
 
 bp = Blueprint("users", __name__, url_prefix="/users")
 
+# Max number of contributions & users returned per page
+MAX_CONTRIBUTIONS_PAGE_SIZE = 100
+MAX_USERS_PAGE_SIZE = 100
+
 
 # Route to get general information on the user
 @bp.route("/<int:userId>")
@@ -42,6 +57,58 @@ def get_user(userId):
         return jsonify(response), 200
 
 
+# Route to get a page of the repositories or tags suggested by a user
+#  - Pages are ordered by repository id or tag name, & "next_cursor" is
+#    passed as the "cursor" parameter to get the following page
+@bp.route("/<int:userId>/contributions")
+def get_user_contributions(userId):
+    type = request.args.get("type", default="repositories", type=str)
+    limit = request.args.get("limit", default=20, type=int)
+    cursor = request.args.get("cursor", default=None, type=str)
+
+    if type not in ["repositories", "tags"]:
+        return jsonify({"message": "Invalid contribution type."}), 400
+    if limit <= 0 or limit > MAX_CONTRIBUTIONS_PAGE_SIZE:
+        response = {
+            "message": f"Limit must be between 1 and {MAX_CONTRIBUTIONS_PAGE_SIZE}."
+        }
+        return jsonify(response), 400
+    try:
+        # The cursor holds a repository id or a tag name
+        cursor_types = [int] if type == "repositories" else [str]
+        after = decode_cursor(cursor, cursor_types)[0] if cursor else None
+    except ValueError:
+        return jsonify({"message": "Invalid cursor."}), 400
+
+    if type == "repositories":
+        sort_key = Repository.id
+        # Load the relations of the whole page in a few queries
+        query = Repository.query.filter_by(suggested_by=userId).options(
+            selectinload(Repository.languages).joinedload(RepoLanguage.language),
+            selectinload(Repository.tags).joinedload(RepoTag.tag),
+            joinedload(Repository.primary_tag),
+            joinedload(Repository.user),
+        )
+    else:
+        sort_key = Tag.name
+        query = Tag.query.filter_by(suggested_by=userId).options(joinedload(Tag.user))
+
+    if after != None:
+        query = query.filter(sort_key > after)
+    results, next_cursor = get_keyset_page(
+        query.order_by(sort_key),
+        limit,
+        lambda item: [item.id if type == "repositories" else item.name],
+    )
+
+    response = {
+        "message": "Obtained user contributions.",
+        "contributions": serialize_sqlalchemy_objs(results),
+        "next_cursor": next_cursor,
+    }
+    return jsonify(response), 200
+
+
 # Route to refresh user info from GitHub API
 @bp.route("/<int:userId>/refresh")
 def refresh_user(userId):
@@ -59,14 +126,7 @@ def refresh_user(userId):
         return jsonify(response), 200
 
     # Call GitHub API since user data can be refreshed
-    user_data_resp = requests.get(
-        f"https://api.github.com/user/{userId}",
-        auth=(app.config["GITHUB_CLIENT_ID"], app.config["GITHUB_CLIENT_SECRET"]),
-        headers={
-            "Accept": "application/vnd.github.text-match+json",
-            "User-Agent": "gitinspire-server",
-        },
-    )
+    user_data_resp = github_get(f"https://api.github.com/user/{userId}", "refresh")
 
     # Handle case where rate limit was hit, validation failed, endpoint has been spammed
     if user_data_resp.status_code in [403, 422]:
@@ -110,6 +170,10 @@ def refresh_user(userId):
         update_stmt = update(User).filter_by(id=userId).values(**update_dict)
         db.session.execute(update_stmt)
         db.session.commit()
+        # Tags include the user who suggested them
+        bump_catalog("tags")
+        bump_catalog("users")
+        invalidate_cached_user(userId)
     except:
         print(traceback.format_exc())
         response = {"message": "Something went wrong with refreshing user data."}
@@ -122,16 +186,49 @@ def refresh_user(userId):
     return jsonify(response), 200
 
 
-# Route to get all banned users
+# Get a page of the users with an account status (ordered by id)
+def get_users_page(account_status, message):
+    limit = request.args.get("limit", default=50, type=int)
+    cursor = request.args.get("cursor", default=None, type=str)
+
+    if account_status not in AccountStatusEnum.__members__:
+        return jsonify({"message": "Invalid account status."}), 400
+    if limit <= 0 or limit > MAX_USERS_PAGE_SIZE:
+        response = {"message": f"Limit must be between 1 and {MAX_USERS_PAGE_SIZE}."}
+        return jsonify(response), 400
+    try:
+        after = decode_cursor(cursor, [int])[0] if cursor else None
+    except ValueError:
+        return jsonify({"message": "Invalid cursor."}), 400
+
+    query = User.query.filter_by(account_status=AccountStatusEnum[account_status])
+    if after != None:
+        query = query.filter(User.id > after)
+    users, next_cursor = get_keyset_page(
+        query.order_by(User.id), limit, lambda user: [user.id]
+    )
+
+    response = {
+        "message": message,
+        "users": serialize_sqlalchemy_objs(users),
+        "next_cursor": next_cursor,
+    }
+    return jsonify(response), 200
+
+
+# Route to get a page of users by account status (ie: "?status=admin")
+@bp.route("/")
+@admin_required()
+def get_users():
+    account_status = request.args.get("status", default="banned", type=str)
+    return get_users_page(account_status, "Obtained users.")
+
+
+# Route to get a page of banned users
 @bp.route("/banned", methods=["GET"])
 @admin_required()
 def get_banned_users():
-    banned_users = User.query.filter_by(account_status="banned").all()
-    if banned_users != None:
-        banned_users = serialize_sqlalchemy_objs(banned_users)
-    else:
-        banned_users = []
-    return jsonify({"message": "Obtained banned users.", "users": banned_users})
+    return get_users_page("banned", "Obtained banned users.")
 
 
 # Route to update account
@@ -198,25 +295,21 @@ def update_user(userId):
             )
         )
         db.session.execute(update_stmt)
-        db.session.commit()
-
+        # Revoke the access tokens carrying the user's previous account status
+        if account_status != upd_user_dict["account_status"]:
+            revoke_user_tokens(userId, account_status)
         # Log the update action
-        log = Log(
+        log_action(
+            db.session,
             action=action_msg,
             type="user",
             content_id=userId,
             enacted_by=user["id"],
         )
-        try:
-            db.session.execute(
-                text(
-                    "SELECT setval(pg_get_serial_sequence('logs', 'id'), coalesce(max(id)+1, 1), false) FROM logs"
-                )
-            )
-        except:
-            pass
-        db.session.add(log)
         db.session.commit()
+        # Tags include the user who suggested them
+        bump_catalog("tags")
+        invalidate_cached_user(userId)
 
         response = {
             "message": "Successfully updated user.",
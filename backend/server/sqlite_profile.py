@@ -0,0 +1,39 @@
+from sqlalchemy import event
+
+# SQLite databases (the default of the "development" & "production"
+# configurations) used the default rollback journal, where a write locks the
+# whole database: readers waited for every admin action to commit. The
+# "SQLITE_PRAGMAS" profile (see "server/configuration.py") is applied to each
+# new connection:
+#  - "journal_mode=WAL" lets readers keep reading the last committed data
+#    while a write is in progress (a single writer at a time is still allowed).
+#  - "synchronous=NORMAL" only syncs the WAL on checkpoints instead of on every
+#    commit (safe from corruption in WAL mode, but the last commits can be
+#    lost if the machine loses power).
+#  - "busy_timeout" makes writers wait for the lock instead of failing with
+#    "database is locked".
+#
+# Compare the profiles with "python benchmarks/sqlite_concurrency.py".
+
+
+def is_sqlite(engine):
+    return engine.dialect.name == "sqlite"
+
+
+# Run "PRAGMA <name> = <value>" on each new connection of the engine
+def install_sqlite_pragmas(engine, pragmas):
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
+def init_sqlite_profile(app, engines):
+    pragmas = app.config["SQLITE_PRAGMAS"]
+    if not pragmas:
+        return
+    for engine in engines:
+        if is_sqlite(engine):
+            install_sqlite_pragmas(engine, pragmas)
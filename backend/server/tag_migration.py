@@ -0,0 +1,140 @@
+from flask import current_app as app
+from sqlalchemy import delete, select, update
+
+from server.audit import log_action
+from server.counters import adjust_tag_counts, adjust_user_counts
+from server.db import db
+from server.models.Repository import Repository, RepoTag
+from server.models.Tag import Tag
+from server.models.TagMigration import TagMigration
+from server.utils import normalizeStr
+
+# Renaming or merging a tag used to rewrite every reference to it in a single
+# UPDATE, which for a tag used by many repositories was one long transaction
+# holding locks on all of those rows. Instead, references are rewritten in
+# chunks (each in its own transaction) & the progress is saved in a
+# "TagMigration" entry so that an interrupted migration can be resumed.
+
+
+# Get the unfinished migration of a tag if there's one
+def get_running_migration(old_name):
+    return TagMigration.query.filter_by(old_name=old_name, status="running").first()
+
+
+# Create the migration of "old_tag" to the tag named "new_displayName".
+#  - "rename": Creates the new tag
+#  - "merge": The new tag already exists & "old_tag" gets merged into it
+def start_tag_migration(old_tag, new_displayName, enacted_by, merge=False):
+    new_name = normalizeStr(new_displayName)
+    if not merge:
+        db.session.add(
+            Tag(
+                display_name=new_displayName,
+                name=new_name,
+                type=old_tag.type.name,
+                suggested_by=old_tag.user.id,
+            )
+        )
+        adjust_user_counts(old_tag.user.id, tags=1)
+
+    migration = TagMigration(
+        action="merge" if merge else "rename",
+        old_name=old_tag.name,
+        new_name=new_name,
+        moved=0,
+        enacted_by=enacted_by,
+    )
+    db.session.add(migration)
+    db.session.commit()
+    return migration
+
+
+# Rewrite the next chunk of references to the old tag. Returns the number of
+# references that were rewritten (0 once there's none left).
+def migrate_chunk(migration, tag_type, chunk_size):
+    if tag_type == "primary":
+        repo_ids = db.session.scalars(
+            select(Repository.id)
+            .where(Repository._primary_tag == migration.old_name)
+            .order_by(Repository.id)
+            .limit(chunk_size)
+        ).all()
+        if repo_ids:
+            db.session.execute(
+                update(Repository)
+                .where(Repository.id.in_(repo_ids))
+                .values(_primary_tag=migration.new_name)
+            )
+            adjust_tag_counts([migration.new_name], len(repo_ids))
+    else:
+        repo_ids = db.session.scalars(
+            select(RepoTag.repo_id)
+            .where(RepoTag.tag_name == migration.old_name)
+            .order_by(RepoTag.repo_id)
+            .limit(chunk_size)
+        ).all()
+        if repo_ids:
+            # When merging, repositories that already have the new tag would
+            # end up with the same tag twice, so we drop their old tag instead
+            db.session.execute(
+                delete(RepoTag).where(
+                    RepoTag.tag_name == migration.old_name,
+                    RepoTag.repo_id.in_(
+                        select(RepoTag.repo_id).where(
+                            RepoTag.tag_name == migration.new_name,
+                            RepoTag.repo_id.in_(repo_ids),
+                        )
+                    ),
+                )
+            )
+            result = db.session.execute(
+                update(RepoTag)
+                .where(
+                    RepoTag.tag_name == migration.old_name,
+                    RepoTag.repo_id.in_(repo_ids),
+                )
+                .values(tag_name=migration.new_name)
+            )
+            adjust_tag_counts([migration.new_name], result.rowcount)
+
+    adjust_tag_counts([migration.old_name], -len(repo_ids))
+    migration.moved += len(repo_ids)
+    db.session.commit()
+    return len(repo_ids)
+
+
+# Run (or resume) a migration until all references are rewritten, then
+# delete the old tag & log the action. Returns the new tag.
+def run_tag_migration(migration, chunk_size=None):
+    chunk_size = chunk_size or app.config["TAG_MIGRATION_CHUNK_SIZE"]
+
+    old_tag = Tag.query.filter_by(name=migration.old_name).first()
+    if old_tag != None:
+        tag_type = old_tag.type.name
+        while migrate_chunk(migration, tag_type, chunk_size) > 0:
+            pass
+
+    # Delete old tag, log the action & mark the migration as done together
+    if old_tag != None:
+        adjust_user_counts(old_tag.suggested_by, tags=-1)
+    db.session.execute(delete(Tag).where(Tag.name == migration.old_name))
+    action = "update" if migration.action == "rename" else "merge"
+    log_action(
+        db.session,
+        action=f"{action} ({migration.old_name} -> {migration.new_name})",
+        type="tag",
+        content_id=migration.new_name,
+        enacted_by=migration.enacted_by,
+    )
+    migration.status = "done"
+    db.session.commit()
+
+    return Tag.query.filter_by(name=migration.new_name).first()
+
+
+# Resume all unfinished migrations (ie: after a crash)
+def resume_tag_migrations(chunk_size=None):
+    migrations = TagMigration.query.filter_by(status="running").all()
+    for migration in migrations:
+        run_tag_migration(migration, chunk_size)
+    return migrations
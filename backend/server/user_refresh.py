@@ -0,0 +1,160 @@
+from base64 import b64encode
+from datetime import datetime
+from flask import current_app as app
+from sqlalchemy import and_, or_, select, update
+
+from server.cache import bump_catalog
+from server.db import db
+from server.github import github_request, RateLimited
+from server.identity import invalidate_cached_user
+from server.models.User import User, AccountStatusEnum
+
+# Max number of ids GitHub accepts in a single "nodes" lookup
+NODES_PER_QUERY = 100
+
+USERS_QUERY = """
+query($ids: [ID!]!) {
+  nodes(ids: $ids) {
+    ... on User {
+      databaseId
+      login
+      avatarUrl
+    }
+  }
+}
+"""
+
+# Usernames & avatars are copied into the responses of repositories & tags,
+# so they go stale if users are only refreshed when their profile is visited.
+# This job refreshes the users that weren't updated in "USER_REFRESH_MAX_AGE"
+# by looking up to 100 of them per GitHub GraphQL request.
+#  - GraphQL requests are POSTs, so they can't be made conditional (ETags).
+#    Instead, only the users whose data changed are rewritten & the others
+#    just have their "last_updated" touched, both in bulk.
+
+
+# Get the global node id of a user from their database id (GitHub's legacy
+# node ids are the base64 of "04:User{id}")
+def get_user_node_id(user_id):
+    return b64encode(f"04:User{user_id}".encode()).decode()
+
+
+class UserRefreshFailed(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"GitHub user lookup failed with status {status_code}")
+        self.status_code = status_code
+
+
+# Look up the GitHub data of users. Returns a dictionary of the found users by
+# id (users that no longer exist on GitHub aren't included).
+def fetch_github_users(user_ids):
+    resp = github_request(
+        "POST",
+        app.config["GITHUB_GRAPHQL_URL"],
+        "refresh",
+        json={
+            "query": USERS_QUERY,
+            "variables": {"ids": [get_user_node_id(id) for id in user_ids]},
+        },
+        # GraphQL requests must be authenticated with a token
+        headers={"Authorization": f"bearer {app.config['GITHUB_API_TOKEN']}"},
+        auth=None,
+    )
+    if resp.status_code != 200:
+        raise UserRefreshFailed(resp.status_code)
+
+    # Deleted users are returned as "null" (along with a "NOT_FOUND" error)
+    nodes = (resp.json().get("data") or {}).get("nodes") or []
+    return {node["databaseId"]: node for node in nodes if node}
+
+
+# Get the users last updated before "cutoff", in order of "last_updated"
+# starting after the "after" user (if provided)
+def get_stale_users(cutoff, limit, after=None):
+    query = select(User.id, User.username, User.avatar_url, User.last_updated).where(
+        User.account_status != AccountStatusEnum["bot"],
+        User.last_updated < cutoff,
+    )
+    if after != None:
+        query = query.where(
+            or_(
+                User.last_updated > after.last_updated,
+                and_(User.last_updated == after.last_updated, User.id > after.id),
+            )
+        )
+    return db.session.execute(
+        query.order_by(User.last_updated, User.id).limit(limit)
+    ).all()
+
+
+# Refresh a batch of users & save the changes. Returns the number of users
+# that changed & the number of users that weren't found.
+def refresh_user_batch(users):
+    found = fetch_github_users([user.id for user in users])
+
+    now = datetime.utcnow()
+    changed = []
+    unchanged_ids = []
+    for user in users:
+        node = found.get(user.id)
+        if node == None:
+            # Keep users that were deleted from GitHub as they are
+            continue
+        if (node["login"], node["avatarUrl"]) != (user.username, user.avatar_url):
+            changed.append(
+                {
+                    "id": user.id,
+                    "username": node["login"],
+                    "avatar_url": node["avatarUrl"],
+                    "last_updated": now,
+                }
+            )
+        else:
+            unchanged_ids.append(user.id)
+
+    if changed:
+        # Bulk UPDATE by primary key (a single executemany)
+        db.session.execute(update(User), changed)
+    if unchanged_ids:
+        db.session.execute(
+            update(User).where(User.id.in_(unchanged_ids)).values(last_updated=now)
+        )
+    db.session.commit()
+
+    for user in changed:
+        invalidate_cached_user(user["id"])
+    if changed:
+        # Tags include the user who suggested them
+        bump_catalog("tags")
+        bump_catalog("users")
+
+    return len(changed), len(users) - len(found)
+
+
+# Refresh up to "limit" stale users, stopping early if the "refresh" routes'
+# share of the GraphQL quota runs out. Returns a summary of the run.
+def refresh_stale_users(max_age=None, limit=1000, batch_size=NODES_PER_QUERY):
+    cutoff = datetime.utcnow() - (max_age or app.config["USER_REFRESH_MAX_AGE"])
+    batch_size = min(batch_size, NODES_PER_QUERY)
+
+    summary = {"checked": 0, "updated": 0, "missing": 0, "rate_limited": False}
+    after = None
+    while summary["checked"] < limit:
+        # Refreshed users are no longer stale, but users that weren't found
+        # are, so we continue after the last user of the previous batch
+        users = get_stale_users(
+            cutoff, min(batch_size, limit - summary["checked"]), after
+        )
+        if len(users) == 0:
+            break
+        after = users[-1]
+
+        try:
+            num_updated, num_missing = refresh_user_batch(users)
+        except RateLimited:
+            summary["rate_limited"] = True
+            break
+        summary["checked"] += len(users)
+        summary["updated"] += num_updated
+        summary["missing"] += num_missing
+    return summary
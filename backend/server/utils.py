@@ -1,4 +1,10 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from datetime import date, datetime, timedelta
+import json
+from flask import request
+from sqlalchemy import Boolean, DateTime, and_, func, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 
 # Used to serialize the lists that may occur via relations in a SQLAlchemy object.
 def serialize_sqlalchemy_objs(sqlalchemy_objs):
@@ -37,3 +43,102 @@ def filterLangs(langDict):
     sortedLang = sorted(langDict.items(), key=lambda x: x[1], reverse=True)
     # 1st index in array is the primary language
     return [x[0] for x in sortedLang]
+
+
+# Parse an optional ISO 8601 date/datetime query parameter (raises ValueError
+# if invalid)
+def parse_date_param(name):
+    value = request.args.get(name, default="", type=str).strip()
+    return datetime.fromisoformat(value) if value else None
+
+
+# Encode the sort key values of the last item of a page into an opaque cursor
+# (for keyset pagination, where the next page starts after that item)
+def encode_cursor(values):
+    return urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+# Decode a cursor created by "encode_cursor()" (raises ValueError if invalid)
+#  - "types" are the types of the values the cursor must hold (ie: "[str, int]"
+#    for a date & an id), as a cursor can be any JSON list
+def decode_cursor(cursor, types):
+    try:
+        values = json.loads(urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor.")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Invalid cursor.")
+    # "type()" as booleans are ints
+    if any(type(value) != value_type for value, value_type in zip(values, types)):
+        raise ValueError("Invalid cursor.")
+    return values
+
+
+# Filter for the rows that come after the row with the given values of the
+# sort columns (ie: "created_at" & "id"), to get the next page of a keyset
+# paginated query
+#  - The first column is also bounded on its own: SQLite doesn't seek indexes
+#    on expressions (ie: "keyset_datetime()") with a row value comparison.
+def keyset_filter(columns, values, descending=False):
+    if descending:
+        return and_(columns[0] <= values[0], tuple_(*columns) < tuple_(*values))
+    return and_(columns[0] >= values[0], tuple_(*columns) > tuple_(*values))
+
+
+# Get a page of "limit" rows of a keyset paginated query (filtered with
+# "keyset_filter()" & sorted), along with the cursor of the next page (None on
+# the last page). "get_cursor_values" gets the sort key values of a row.
+def get_keyset_page(query, limit, get_cursor_values):
+    # Fetch an extra row to know if there's a next page
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(get_cursor_values(rows[-1]))
+
+
+# A datetime column (or value) in the form it's sorted & compared in by keyset
+# pagination. SQLite stores datetimes as text in different formats (the ones
+# set by "func.now()" have no microseconds, the ones set in Python always do),
+# so the same datetime wouldn't compare as equal: they're compared to the
+# second instead (ties are broken by the next sort column).
+#  - The tables are indexed on this expression (ie: "datetime(created_at)" on
+#    SQLite), so filters & sorts on a datetime column must use it to use the
+#    indexes.
+class keyset_datetime(FunctionElement):
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(keyset_datetime)
+def _compile_keyset_datetime(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(keyset_datetime, "sqlite")
+def _compile_keyset_datetime_sqlite(element, compiler, **kw):
+    return compiler.process(func.datetime(*element.clauses), **kw)
+
+
+# Get a datetime from a cursor (in ISO 8601) in the form of "keyset_datetime()"
+# (raises ValueError if invalid)
+def cursor_datetime(value):
+    return keyset_datetime(datetime.fromisoformat(value))
+
+
+# A filter that's true for most rows (ie: the types of reports admins can
+# see), so SQLite reads the rows in order from the index of the sort columns
+# instead of searching an index for the filter & sorting the rows
+class likely(FunctionElement):
+    type = Boolean()
+    inherit_cache = True
+
+
+@compiles(likely)
+def _compile_likely(element, compiler, **kw):
+    return f"({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(likely, "sqlite")
+def _compile_likely_sqlite(element, compiler, **kw):
+    return compiler.process(func.likely(*element.clauses), **kw)
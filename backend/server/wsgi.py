@@ -0,0 +1,5 @@
+# Entry point of the production server: gunicorn "server.wsgi:app"
+from server import create_app, init_serving
+
+app = create_app()
+init_serving(app)
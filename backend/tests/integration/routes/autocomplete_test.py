@@ -0,0 +1,93 @@
+import collections
+
+from tests import testBase
+
+
+class Autocomplete_Route_Test(testBase.TestBase):
+    def test_autocomplete(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "request_url", "expected_names"]
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Tags ranked by usage",
+                request_url="/api/autocomplete?kind=tag&q=r",
+                expected_names=["resource"],
+            ),
+            TestCase(
+                test_name="Tags matched by display name",
+                request_url="/api/autocomplete?kind=tag&q=machine l",
+                expected_names=["machine_learning"],
+            ),
+            TestCase(
+                test_name="Languages matched case-insensitively",
+                request_url="/api/autocomplete?kind=language&q=RUBY",
+                expected_names=["ruby_on_rails"],
+            ),
+            TestCase(
+                test_name="Users ranked by contributions",
+                request_url="/api/autocomplete?kind=user&q=o",
+                expected_names=["oldUser", "owner-user"],
+            ),
+            TestCase(
+                test_name="Number of results is limited",
+                request_url="/api/autocomplete?kind=user&q=o&limit=1",
+                expected_names=["oldUser"],
+            ),
+            TestCase(
+                test_name="No matches",
+                request_url="/api/autocomplete?kind=tag&q=zzz",
+                expected_names=[],
+            ),
+        ]
+
+        for test_case in test_cases:
+            with self.subTest(msg=test_case.test_name):
+                response = self.webtest_app.get(test_case.request_url).json
+                actual_names = [
+                    item.get("name", item.get("username"))
+                    for item in response["results"]
+                ]
+                self.assertEqual(actual_names, test_case.expected_names)
+
+    def test_autocomplete_bad_request(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "request_url", "expected_message"]
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Invalid kind",
+                request_url="/api/autocomplete?kind=repo&q=a",
+                expected_message="Invalid kind.",
+            ),
+            TestCase(
+                test_name="Empty query",
+                request_url="/api/autocomplete?kind=tag&q=",
+                expected_message="Query can't be empty.",
+            ),
+            TestCase(
+                test_name="Limit too large",
+                request_url="/api/autocomplete?kind=tag&q=a&limit=100",
+                expected_message="Limit must be between 1 and 25.",
+            ),
+        ]
+
+        for test_case in test_cases:
+            with self.subTest(msg=test_case.test_name):
+                response = self.webtest_app.get(test_case.request_url, status=400)
+                self.assertEqual(response.json["message"], test_case.expected_message)
+
+    def test_autocomplete_after_write(self):
+        with self.app.app_context():
+            self.webtest_app.get("/api/autocomplete?kind=tag&q=back")
+
+            self.webtest_app.authorization = ("Bearer", self.user_exp_token)
+            self.webtest_app.post_json(
+                "/api/tags", {"display_name": "Backend", "type": "user_gen"}
+            )
+
+            # New tags can be found right after they're created
+            response = self.webtest_app.get("/api/autocomplete?kind=tag&q=back").json
+            self.assertEqual([tag["name"] for tag in response["results"]], ["backend"])
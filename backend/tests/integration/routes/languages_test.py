@@ -40,3 +40,20 @@ class Languages_Route_Test(testBase.TestBase):
                     self.assertEqual(len(res_data), len(test_case.expected_languages))
                     # Assert the response only includes the expected Language names
                     self.assert_response(res_data, test_case.expected_languages)
+
+    def test_get_languages_cached(self):
+        with self.app.app_context():
+            from server.db import db
+            from server.cache import bump_catalog
+
+            self.webtest_app.get("/api/languages")
+            db.session.add(Language(name="go", display_name="Go"))
+            db.session.commit()
+
+            # Cached response is used until the catalog's version is bumped
+            response = self.webtest_app.get("/api/languages").json
+            self.assertEqual(len(response["languages"]), 4)
+
+            bump_catalog("languages")
+            response = self.webtest_app.get("/api/languages").json
+            self.assertEqual(len(response["languages"]), 5)
@@ -1,7 +1,17 @@
+import collections
+import csv
+import gzip
+import io
+import json
+import tempfile
+import webtest
 from datetime import datetime
 
 from tests import testBase
+from server.audit import log_action
 from server.db import db
+from server.log_archive import archive_logs
+from server.log_stats import rebuild_log_stats
 from server.models.Log import Log
 
 
@@ -49,3 +59,301 @@ class Repository_Route_Test(testBase.TestBase):
             self.assert_response_strict(
                 response["logs"], [log_2.as_dict(), log_1.as_dict()]
             )
+
+    def test_get_archived_logs(self):
+        with tempfile.TemporaryDirectory() as archive_dir:
+            self.app.config["LOG_ARCHIVE_DIR"] = archive_dir
+            with self.app.app_context():
+                for type in ["user", "tag"]:
+                    db.session.add(
+                        Log(
+                            action="delete",
+                            type=type,
+                            content_id="1",
+                            enacted_by=0,
+                            created_at=datetime(2022, 1, 1),
+                        )
+                    )
+                db.session.commit()
+                archive_logs(cutoff=datetime(2023, 1, 1))
+
+                self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+
+                response = self.webtest_app.get("/api/logs/archive").json
+                self.assertEqual(response["months"], ["2022-01"])
+
+                response = self.webtest_app.get("/api/logs/archive/2022-01?type=tag")
+                self.assertEqual(response.content_type, "application/x-ndjson")
+                logs = [json.loads(line) for line in response.text.splitlines()]
+                self.assertEqual([log["id"] for log in logs], [2])
+
+                # Months without archives & invalid months
+                for month, error_code in [("2022-02", "404"), ("..", "400")]:
+                    with self.assertRaises(webtest.AppError) as exception:
+                        self.webtest_app.get(f"/api/logs/archive/{month}")
+                    self.assertTrue(error_code in str(exception.exception))
+
+    def add_logs(self):
+        logs = [
+            ("delete", "repository", "394012075", 83375816, "2023-01-01T10:00:00"),
+            ("update (a -> b)", "tag", "b", 3, "2023-01-02T10:00:00"),
+            ("update (c -> d)", "tag", "d", 83375816, "2023-01-03T10:00:00"),
+            ("ban", "user", "1", 3, "2023-01-04T10:00:00"),
+            ("delete", "repository", "10270250", 3, "2023-01-04T10:00:00"),
+        ]
+        for action, type, content_id, enacted_by, created_at in logs:
+            db.session.add(
+                Log(
+                    action=action,
+                    type=type,
+                    content_id=content_id,
+                    enacted_by=enacted_by,
+                    created_at=datetime.fromisoformat(created_at),
+                )
+            )
+        db.session.commit()
+
+    def test_get_logs_filtered(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "query", "expected_ids"]
+        )
+
+        test_cases = [
+            TestCase(test_name="No filters", query="", expected_ids=[5, 4, 3, 2, 1]),
+            TestCase(
+                test_name="Filter by type", query="?type=tag", expected_ids=[3, 2]
+            ),
+            TestCase(
+                test_name="Filter by action prefix",
+                query="?action=update%20(a",
+                expected_ids=[2],
+            ),
+            TestCase(
+                test_name="Filter by admin",
+                query="?enacted_by=83375816",
+                expected_ids=[3, 1],
+            ),
+            TestCase(
+                test_name="Filter by content",
+                query="?content_id=394012075",
+                expected_ids=[1],
+            ),
+            TestCase(
+                test_name="Filter by date range",
+                query="?from=2023-01-02&to=2023-01-03T12:00:00",
+                expected_ids=[3, 2],
+            ),
+        ]
+
+        with self.app.app_context():
+            self.add_logs()
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+
+            for test_case in test_cases:
+                with self.subTest(msg=test_case.test_name):
+                    response = self.webtest_app.get(f"/api/logs{test_case.query}").json
+                    self.assertEqual(
+                        [log["id"] for log in response["logs"]],
+                        test_case.expected_ids,
+                    )
+                    self.assertEqual(response["next_cursor"], None)
+
+    def test_get_logs_paginated(self):
+        with self.app.app_context():
+            self.add_logs()
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+
+            # Walk through the logs 2 at a time (logs 4 & 5 have the same date)
+            ids = []
+            cursor = ""
+            while True:
+                response = self.webtest_app.get(f"/api/logs?limit=2{cursor}").json
+                ids += [log["id"] for log in response["logs"]]
+                self.assertTrue(
+                    response["logs"][0]["enacted_by"]["id"] in [3, 83375816]
+                )
+                if response["next_cursor"] == None:
+                    break
+                cursor = f"&cursor={response['next_cursor']}"
+
+            self.assertEqual(ids, [5, 4, 3, 2, 1])
+
+    def test_get_logs_paginated_same_second(self):
+        with self.app.app_context():
+            # Logs written in a single commit get the same "now()" timestamp
+            for id in range(5):
+                log_action(db.session, "delete", "repository", id, 83375816)
+            db.session.commit()
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+
+            # Walk through the logs 2 at a time (each page must make progress)
+            ids = []
+            cursor = ""
+            for _ in range(5):
+                response = self.webtest_app.get(f"/api/logs?limit=2{cursor}").json
+                ids += [log["id"] for log in response["logs"]]
+                if response["next_cursor"] == None:
+                    break
+                cursor = f"&cursor={response['next_cursor']}"
+
+            self.assertEqual(ids, [5, 4, 3, 2, 1])
+
+    def test_get_logs_query_plans(self):
+        TestCase = collections.namedtuple("TestCase", ["name", "query", "plan"])
+        # The logs are read in order from an index (without sorting them) &
+        # pages after the first start from the cursor
+        tests = [
+            TestCase("First page", "", "SCAN logs USING INDEX ix_logs_created_at_id"),
+            TestCase(
+                "Next page",
+                "&cursor={cursor}",
+                "SEARCH logs USING INDEX ix_logs_created_at_id (<expr><?)",
+            ),
+            TestCase(
+                "Next page of a type",
+                "&type=repository&cursor={cursor}",
+                "SEARCH logs USING INDEX ix_logs_type_created_at (type=? AND <expr><?)",
+            ),
+            TestCase(
+                "Next page of an admin",
+                "&enacted_by=83375816&cursor={cursor}",
+                "SEARCH logs USING INDEX ix_logs_enacted_by_created_at (enacted_by=? AND <expr><?)",
+            ),
+            TestCase(
+                "Date range",
+                "&from=2022-01-01&to=2022-02-01",
+                "SEARCH logs USING INDEX ix_logs_created_at_id (<expr>>? AND <expr><?)",
+            ),
+        ]
+
+        with self.app.app_context():
+            for id in range(5):
+                log_action(db.session, "delete", "repository", id, 83375816)
+            db.session.commit()
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+            cursor = self.webtest_app.get("/api/logs?limit=2").json["next_cursor"]
+
+            for test in tests:
+                with self.subTest(test.name):
+                    plan = self.get_query_plan(
+                        "/api/logs?limit=2" + test.query.format(cursor=cursor), "logs"
+                    )
+                    self.assertTrue(plan.startswith(test.plan), plan)
+                    self.assertFalse("TEMP B-TREE" in plan, plan)
+
+    def test_get_logs_bad_request(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "query", "expected_message"]
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Limit too large",
+                query="?limit=101",
+                expected_message="Limit must be between 1 and 100.",
+            ),
+            TestCase(
+                test_name="Invalid admin id",
+                query="?enacted_by=abc",
+                expected_message="Invalid filters.",
+            ),
+            TestCase(
+                test_name="Invalid date",
+                query="?from=yesterday",
+                expected_message="Invalid filters.",
+            ),
+            TestCase(
+                test_name="Invalid cursor",
+                query="?cursor=abc",
+                expected_message="Invalid cursor.",
+            ),
+        ]
+
+        with self.app.app_context():
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+
+            for test_case in test_cases:
+                with self.subTest(msg=test_case.test_name):
+                    with self.assertRaises(webtest.AppError) as exception:
+                        self.webtest_app.get(f"/api/logs{test_case.query}")
+
+                    response_code, response_body = str(exception.exception).split("\n")
+                    self.assertTrue("400" in response_code)
+                    self.assertTrue(test_case.expected_message in response_body)
+
+    def test_export_logs(self):
+        with self.app.app_context():
+            self.add_logs()
+            self.app.config["EXPORT_BATCH_SIZE"] = 2
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+
+            response = self.webtest_app.get("/api/logs/export?type=repository")
+            self.assertEqual(response.content_type, "text/csv")
+            self.assertTrue(
+                'filename="logs.csv"' in response.headers["Content-Disposition"]
+            )
+            rows = list(csv.reader(io.StringIO(response.text)))
+            self.assertEqual(rows[0][0], "id")
+            self.assertEqual(
+                [(row[0], row[6]) for row in rows[1:]],
+                [("1", "cyanChill"), ("5", "owner-user")],
+            )
+
+            # Compressed exports have the same rows
+            response = self.webtest_app.get("/api/logs/export?compress=gzip")
+            self.assertEqual(response.content_type, "application/gzip")
+            rows = list(
+                csv.reader(io.StringIO(gzip.decompress(response.body).decode()))
+            )
+            self.assertEqual([row[0] for row in rows[1:]], ["1", "2", "3", "4", "5"])
+
+    def test_get_log_stats(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "query", "expected_stats"]
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Actions per day",
+                query="",
+                expected_stats=[
+                    {"day": "2023-01-01", "count": 1},
+                    {"day": "2023-01-02", "count": 1},
+                    {"day": "2023-01-03", "count": 1},
+                    {"day": "2023-01-04", "count": 2},
+                ],
+            ),
+            TestCase(
+                test_name="Actions per type & verb",
+                query="?group_by=type,action",
+                expected_stats=[
+                    {"type": "repository", "action": "delete", "count": 2},
+                    {"type": "tag", "action": "update", "count": 2},
+                    {"type": "user", "action": "ban", "count": 1},
+                ],
+            ),
+            TestCase(
+                test_name="Actions per admin within days",
+                query="?group_by=enacted_by&from=2023-01-02&to=2023-01-03",
+                expected_stats=[
+                    {"enacted_by": 3, "count": 1},
+                    {"enacted_by": 83375816, "count": 1},
+                ],
+            ),
+        ]
+
+        with self.app.app_context():
+            self.add_logs()
+            rebuild_log_stats()
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+
+            for test_case in test_cases:
+                with self.subTest(msg=test_case.test_name):
+                    response = self.webtest_app.get(
+                        f"/api/logs/stats{test_case.query}"
+                    ).json
+                    self.assertEqual(response["stats"], test_case.expected_stats)
+
+            with self.assertRaises(webtest.AppError) as exception:
+                self.webtest_app.get("/api/logs/stats?group_by=content_id")
+            self.assertTrue("400" in str(exception.exception))
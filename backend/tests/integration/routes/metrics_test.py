@@ -0,0 +1,20 @@
+import webtest
+
+from tests import testBase
+
+
+class Metrics_Route_Test(testBase.TestBase):
+    def test_get_pool_metrics(self):
+        with self.app.app_context():
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+            response = self.webtest_app.get("/api/metrics/pool").json
+            self.assertEqual(response["message"], "Successfully obtained pool metrics.")
+            # The in-memory test database uses a single static connection
+            self.assertEqual(response["pools"], {"default": {"pool": "StaticPool"}})
+
+    def test_get_pool_metrics_not_admin(self):
+        with self.app.app_context():
+            self.webtest_app.authorization = ("Bearer", self.user_exp_token)
+            with self.assertRaises(webtest.AppError) as exception:
+                self.webtest_app.get("/api/metrics/pool")
+            self.assertTrue("403" in str(exception.exception))
@@ -1,7 +1,31 @@
 import collections
+import random
 import webtest
+from unittest.mock import patch
 
 from tests import testBase
+from server.db import db
+from server.models.Repository import Repository
+from server.routes.random import SearchFailed
+
+
+def gen_search_item(id):
+    return {
+        "id": id,
+        "name": f"repo-{id}",
+        "full_name": f"owner/repo-{id}",
+        "owner": {
+            "login": "owner",
+            "avatar_url": "https://avatars.githubusercontent.com/u/1?v=4",
+            "url": "https://api.github.com/users/owner",
+        },
+        "html_url": f"https://github.com/owner/repo-{id}",
+        "description": "A repository.",
+        "stargazers_count": 50,
+        "language": "CSS",
+        "license": {"key": "mit", "name": "MIT License"},
+        "topics": ["css"],
+    }
 
 
 class Random_Route_Test(testBase.TestBase):
@@ -58,6 +82,18 @@ class Random_Route_Test(testBase.TestBase):
                 expected_error_code="400",
                 expected_error_message="Too many languages.",
             ),
+            TestCase(
+                test_name="Limit too large",
+                request_url="/api/random?source=local&limit=1000000",
+                expected_error_code="400",
+                expected_error_message="Limit must be between 1 and 100.",
+            ),
+            TestCase(
+                test_name="Limit too small",
+                request_url="/api/random?source=local&limit=0",
+                expected_error_code="400",
+                expected_error_message="Limit must be between 1 and 100.",
+            ),
         ]
 
         with self.app.app_context():
@@ -71,3 +107,137 @@ class Random_Route_Test(testBase.TestBase):
                     response_code, response_body = str(exception.exception).split("\n")
                     self.assertTrue(test_case.expected_error_code in response_code)
                     self.assertTrue(test_case.expected_error_message in response_body)
+
+    def test_get_random_repository_cached(self):
+        items = [gen_search_item(idx) for idx in range(100)]
+
+        with patch(
+            "server.routes.random.search_repositories", return_value=items
+        ) as search:
+            for _ in range(50):
+                response = self.webtest_app.get(
+                    "/api/random?minStars=10&maxStars=100&languages=css,javascript&limit=5"
+                ).json
+                self.assertEqual(len(response["results"]), 5)
+
+            # Requests are served from cached searches, so at most one search
+            # is made per star bucket
+            self.assertLessEqual(
+                search.call_count, self.app.config["RANDOM_STAR_BUCKETS"]
+            )
+
+    def test_get_random_repository_local(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "request_url", "expected_ids"]
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Sample all local repositories",
+                request_url="/api/random?source=local",
+                expected_ids=[394012075, 10270250, 0],
+            ),
+            TestCase(
+                test_name="Sample local repositories with language filter",
+                request_url="/api/random?source=local&languages=css,java",
+                expected_ids=[394012075],
+            ),
+            TestCase(
+                test_name="Sample local repositories with star filter",
+                request_url="/api/random?source=local&minStars=100",
+                expected_ids=[10270250],
+            ),
+            TestCase(
+                test_name="Sample local repositories with no matches",
+                request_url="/api/random?source=local&languages=html",
+                expected_ids=[],
+            ),
+        ]
+
+        for test_case in test_cases:
+            with self.subTest(msg=test_case.test_name):
+                response = self.webtest_app.get(test_case.request_url).json
+                self.assertEqual(response["source"], "local")
+                self.assertCountEqual(
+                    [item["id"] for item in response["results"]],
+                    test_case.expected_ids,
+                )
+
+    def test_get_random_repository_local_spread(self):
+        with self.app.app_context():
+            for id in range(1, 101):
+                db.session.add(
+                    Repository(
+                        id=id,
+                        author="owner",
+                        repo_name=f"repo-{id}",
+                        description="",
+                        stars=7,
+                        _primary_tag="project_idea",
+                        suggested_by="0",
+                    )
+                )
+            db.session.commit()
+
+        random.seed(0)
+        response = self.webtest_app.get(
+            "/api/random?source=local&minStars=7&maxStars=8&limit=10"
+        ).json
+        ids = sorted(item["id"] for item in response["results"])
+
+        # The sample isn't a single block of consecutive ids
+        self.assertEqual(len(set(ids)), 10)
+        self.assertNotEqual(ids, list(range(ids[0], ids[0] + 10)))
+        self.assertGreater(ids[-1] - ids[0], 20)
+
+    def test_get_random_repository_rate_limited(self):
+        with patch(
+            "server.routes.random.search_repositories",
+            side_effect=SearchFailed(403),
+        ):
+            response = self.webtest_app.get("/api/random?languages=css").json
+
+        # Falls back to sampling our own repositories
+        self.assertEqual(response["source"], "local")
+        self.assertEqual(
+            [item["full_name"] for item in response["results"]],
+            ["cyanChill/google-homepage"],
+        )
+
+    def test_get_random_repository_format(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "request_url", "expected_keys"]
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Search results are reduced to the displayed fields",
+                request_url="/api/random?limit=1",
+                expected_keys=[
+                    "id",
+                    "full_name",
+                    "owner",
+                    "description",
+                    "stargazers_count",
+                    "language",
+                    "html_url",
+                ],
+            ),
+            TestCase(
+                test_name="Unmodified search results with raw format",
+                request_url="/api/random?limit=1&format=raw",
+                expected_keys=gen_search_item(0).keys(),
+            ),
+        ]
+
+        for test_case in test_cases:
+            with self.subTest(msg=test_case.test_name):
+                with patch(
+                    "server.routes.random.search_repositories",
+                    return_value=[gen_search_item(0)],
+                ):
+                    response = self.webtest_app.get(test_case.request_url).json
+
+                self.assertCountEqual(
+                    response["results"][0].keys(), test_case.expected_keys
+                )
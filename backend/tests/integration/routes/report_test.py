@@ -1,8 +1,13 @@
 import collections
+import csv
+import gzip
+import io
 import webtest
+from datetime import datetime
 
 from tests import testBase
 from server.db import db
+from server.models.Log import Log
 from server.models.Report import Report
 
 
@@ -40,6 +45,204 @@ class Tags_Route_Test(testBase.TestBase):
                     response = self.webtest_app.get("/api/report").json
                     self.assert_response(response, test_case.expected_response)
 
+    def add_reports(self):
+        reports = [
+            ("repository", "394012075", "2023-01-01T10:00:00"),
+            ("repository", "10270250", "2023-01-02T10:00:00"),
+            ("user", "1", "2023-01-03T10:00:00"),
+            ("bug", "", "2023-01-04T10:00:00"),
+            ("repository", "394012075", "2023-01-05T10:00:00"),
+        ]
+        for type, content_id, created_at in reports:
+            db.session.add(
+                Report(
+                    type=type,
+                    content_id=content_id,
+                    reason="other",
+                    info="Test report.",
+                    reported_by=0,
+                    created_at=datetime.fromisoformat(created_at),
+                )
+            )
+        db.session.commit()
+
+    def test_get_reports_filtered(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "token", "query", "expected_ids"]
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Admins get the reports they can handle, newest first",
+                token=self.user_admin_token,
+                query="",
+                expected_ids=[5, 3, 2, 1],
+            ),
+            TestCase(
+                test_name="Owner gets all reports",
+                token=self.user_owner_token,
+                query="",
+                expected_ids=[5, 4, 3, 2, 1],
+            ),
+            TestCase(
+                test_name="Filter by type & content id",
+                token=self.user_admin_token,
+                query="type=repository&content_id=394012075",
+                expected_ids=[5, 1],
+            ),
+            TestCase(
+                test_name="Filter by date range",
+                token=self.user_owner_token,
+                query="from=2023-01-02&to=2023-01-04T23:59:59",
+                expected_ids=[4, 3, 2],
+            ),
+        ]
+
+        with self.app.app_context():
+            self.add_reports()
+
+            for test_case in test_cases:
+                with self.subTest(msg=test_case.test_name):
+                    self.webtest_app.authorization = ("Bearer", test_case.token)
+
+                    # Collect the reports of every page
+                    actual_ids = []
+                    cursor = ""
+                    while cursor != None:
+                        response = self.webtest_app.get(
+                            f"/api/report?limit=2&{test_case.query}&cursor={cursor}"
+                        ).json
+                        actual_ids += [rpt["id"] for rpt in response["reports"]]
+                        cursor = response["next_cursor"]
+
+                    self.assertEqual(actual_ids, test_case.expected_ids)
+
+    def test_get_reports_paginated_same_second(self):
+        with self.app.app_context():
+            # Reports created in the same second by the database's "now()"
+            for _ in range(5):
+                db.session.add(
+                    Report(
+                        type="repository",
+                        content_id="394012075",
+                        reason="other",
+                        info="Test report.",
+                        reported_by=0,
+                    )
+                )
+            db.session.commit()
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+
+            # Collect the reports of every page (each page must make progress)
+            actual_ids = []
+            cursor = ""
+            for _ in range(5):
+                response = self.webtest_app.get(
+                    f"/api/report?limit=2&cursor={cursor}"
+                ).json
+                actual_ids += [rpt["id"] for rpt in response["reports"]]
+                cursor = response["next_cursor"]
+                if cursor == None:
+                    break
+
+            self.assertEqual(actual_ids, [5, 4, 3, 2, 1])
+
+    def test_get_reports_query_plans(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["name", "token", "query", "plan"]
+        )
+        # The reports are read in order from an index (without sorting them) &
+        # pages after the first start from the cursor
+        tests = [
+            TestCase(
+                "Admin's first page",
+                "admin",
+                "",
+                "SCAN reports USING INDEX ix_reports_created_at_id",
+            ),
+            TestCase(
+                "Admin's next page",
+                "admin",
+                "&cursor={cursor}",
+                "SEARCH reports USING INDEX ix_reports_created_at_id (<expr><?)",
+            ),
+            TestCase(
+                "Owner's next page",
+                "owner",
+                "&cursor={cursor}",
+                "SEARCH reports USING INDEX ix_reports_created_at_id (<expr><?)",
+            ),
+            TestCase(
+                "Next page of a type",
+                "admin",
+                "&type=user&cursor={cursor}",
+                "SEARCH reports USING INDEX ix_reports_type_created_at (type=? AND <expr><?)",
+            ),
+            TestCase(
+                "Date range",
+                "owner",
+                "&from=2022-01-01&to=2022-02-01",
+                "SEARCH reports USING INDEX ix_reports_created_at_id (<expr>>? AND <expr><?)",
+            ),
+        ]
+
+        with self.app.app_context():
+            for content_id in ["1", "2", "3", "4", "5"]:
+                db.session.add(
+                    Report(
+                        type="user",
+                        content_id=content_id,
+                        reason="other",
+                        info="Test report.",
+                        reported_by=0,
+                    )
+                )
+            db.session.commit()
+            tokens = {"admin": self.user_admin_token, "owner": self.user_owner_token}
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+            cursor = self.webtest_app.get("/api/report?limit=2").json["next_cursor"]
+
+            for test in tests:
+                with self.subTest(test.name):
+                    self.webtest_app.authorization = ("Bearer", tokens[test.token])
+                    plan = self.get_query_plan(
+                        "/api/report?limit=2" + test.query.format(cursor=cursor),
+                        "reports",
+                    )
+                    self.assertTrue(plan.startswith(test.plan), plan)
+                    self.assertFalse("TEMP B-TREE" in plan, plan)
+
+    def test_get_reports_filtered_bad_request(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "query", "expected_message"]
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Invalid limit",
+                query="limit=500",
+                expected_message="Limit must be between 1 and 100.",
+            ),
+            TestCase(
+                test_name="Invalid date",
+                query="from=yesterday",
+                expected_message="Invalid date range.",
+            ),
+            TestCase(
+                test_name="Invalid cursor",
+                query="cursor=abc",
+                expected_message="Invalid cursor.",
+            ),
+        ]
+
+        self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+        for test_case in test_cases:
+            with self.subTest(msg=test_case.test_name):
+                response = self.webtest_app.get(
+                    f"/api/report?{test_case.query}", status=400
+                )
+                self.assertEqual(response.json["message"], test_case.expected_message)
+
     def test_get_all_reports_bad_request(self):
         TestCase = collections.namedtuple(
             "TestCase", ["test_name", "expected_error_code", "expected_error_message"]
@@ -270,3 +473,251 @@ class Tags_Route_Test(testBase.TestBase):
             response_code, response_body = str(exception.exception).split("\n")
             self.assertTrue("400" in response_code)
             self.assertTrue("Invalid action on report." in response_body)
+
+    def test_get_report_groups(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "token", "query", "expected_groups"]
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Admins get the groups they can handle, latest first",
+                token=self.user_admin_token,
+                query="",
+                expected_groups=[
+                    ("repository", "394012075", 2),
+                    ("user", "1", 1),
+                    ("repository", "10270250", 1),
+                ],
+            ),
+            TestCase(
+                test_name="Owner gets all groups",
+                token=self.user_owner_token,
+                query="",
+                expected_groups=[
+                    ("repository", "394012075", 2),
+                    ("bug", "", 1),
+                    ("user", "1", 1),
+                    ("repository", "10270250", 1),
+                ],
+            ),
+            TestCase(
+                test_name="Filter groups by type",
+                token=self.user_admin_token,
+                query="?type=repository",
+                expected_groups=[
+                    ("repository", "394012075", 2),
+                    ("repository", "10270250", 1),
+                ],
+            ),
+        ]
+
+        with self.app.app_context():
+            self.add_reports()
+
+            for test_case in test_cases:
+                self.webtest_app.authorization = ("Bearer", test_case.token)
+
+                with self.subTest(msg=test_case.test_name):
+                    response = self.webtest_app.get(
+                        f"/api/report/groups{test_case.query}"
+                    ).json
+                    self.assertEqual(
+                        [
+                            (group["type"], group["content_id"], group["count"])
+                            for group in response["groups"]
+                        ],
+                        test_case.expected_groups,
+                    )
+                    self.assertEqual(
+                        response["groups"][0]["latest_reasons"], ["other", "other"]
+                    )
+                    self.assertEqual(response["next_cursor"], None)
+
+    def test_get_report_groups_paginated(self):
+        with self.app.app_context():
+            self.add_reports()
+            self.webtest_app.authorization = ("Bearer", self.user_owner_token)
+
+            # Walk through the groups 1 at a time
+            groups = []
+            cursor = ""
+            while True:
+                response = self.webtest_app.get(
+                    f"/api/report/groups?limit=1{cursor}"
+                ).json
+                groups += [group["content_id"] for group in response["groups"]]
+                if response["next_cursor"] == None:
+                    break
+                cursor = f"&cursor={response['next_cursor']}"
+
+            self.assertEqual(groups, ["394012075", "", "1", "10270250"])
+
+    def test_get_report_groups_paginated_same_second(self):
+        with self.app.app_context():
+            # Groups whose latest reports were created in the same second by
+            # the database's "now()"
+            for content_id in ["1", "2", "3", "4", "5"]:
+                db.session.add(
+                    Report(
+                        type="user",
+                        content_id=content_id,
+                        reason="other",
+                        info="Test report.",
+                        reported_by=0,
+                    )
+                )
+            db.session.commit()
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+
+            # Walk through the groups 2 at a time (each page must make progress)
+            groups = []
+            cursor = ""
+            for _ in range(5):
+                response = self.webtest_app.get(
+                    f"/api/report/groups?limit=2{cursor}"
+                ).json
+                groups += [group["content_id"] for group in response["groups"]]
+                if response["next_cursor"] == None:
+                    break
+                cursor = f"&cursor={response['next_cursor']}"
+
+            self.assertEqual(groups, ["5", "4", "3", "2", "1"])
+
+    def test_get_report_groups_query_plans(self):
+        TestCase = collections.namedtuple("TestCase", ["name", "query"])
+        tests = [
+            TestCase("First page", ""),
+            TestCase("Next page", "&cursor={cursor}"),
+            TestCase("Next page of a type", "&type=user&cursor={cursor}"),
+        ]
+
+        with self.app.app_context():
+            for content_id in ["1", "2", "3", "4", "5"]:
+                db.session.add(
+                    Report(
+                        type="user",
+                        content_id=content_id,
+                        reason="other",
+                        info="Test report.",
+                        reported_by=0,
+                    )
+                )
+            db.session.commit()
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+            cursor = self.webtest_app.get("/api/report/groups?limit=2").json[
+                "next_cursor"
+            ]
+
+            for test in tests:
+                with self.subTest(test.name):
+                    plan = self.get_query_plan(
+                        "/api/report/groups?limit=2" + test.query.format(cursor=cursor),
+                        "reports",
+                    )
+                    # The reports are grouped (& their latest date is read)
+                    # from the index, only the groups are sorted by their
+                    # latest report
+                    self.assertTrue(
+                        plan.startswith(
+                            "SEARCH reports USING INDEX ix_reports_type_content_id"
+                        ),
+                        plan,
+                    )
+                    self.assertFalse("TEMP B-TREE FOR GROUP BY" in plan, plan)
+
+    def test_handle_report_group(self):
+        with self.app.app_context():
+            self.add_reports()
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+
+            # All reports about the repository are resolved at once
+            response = self.webtest_app.delete(
+                "/api/report/groups?action=resolve&type=repository&content_id=394012075"
+            ).json
+            self.assertEqual(response["message"], "2 report(s) have been resolve.")
+            self.assertEqual(response["count"], 2)
+            self.assertEqual(
+                sorted(report.id for report in Report.query.all()), [2, 3, 4]
+            )
+            # The action is logged once for the group
+            logs = Log.query.all()
+            self.assertEqual(
+                [(log.action, log.type, log.content_id) for log in logs],
+                [("resolve 2 report(s)", "repository", "394012075")],
+            )
+            self.assertEqual(logs[0].enacted_by, 83375816)
+
+            # Handling a group that no longer exists should return an ok response
+            response = self.webtest_app.delete(
+                "/api/report/groups?action=dismiss&type=repository&content_id=394012075"
+            ).json
+            self.assertEqual(response["count"], 0)
+            self.assertEqual(Log.query.count(), 1)
+
+    def test_handle_report_group_bad_request(self):
+        TestCase = collections.namedtuple(
+            "TestCase",
+            ["test_name", "query", "expected_error_code", "expected_error_message"],
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Invalid action",
+                query="?type=repository&content_id=394012075",
+                expected_error_code="400",
+                expected_error_message="Invalid action on report.",
+            ),
+            TestCase(
+                test_name="Missing type",
+                query="?action=dismiss&content_id=394012075",
+                expected_error_code="400",
+                expected_error_message="A report type must be provided.",
+            ),
+            TestCase(
+                test_name="Admins can't handle bug reports",
+                query="?action=dismiss&type=bug",
+                expected_error_code="403",
+                expected_error_message="permission to handle these reports.",
+            ),
+        ]
+
+        with self.app.app_context():
+            self.add_reports()
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+
+            for test_case in test_cases:
+                with self.subTest(msg=test_case.test_name):
+                    with self.assertRaises(webtest.AppError) as exception:
+                        self.webtest_app.delete(f"/api/report/groups{test_case.query}")
+
+                    response_code, response_body = str(exception.exception).split("\n")
+                    self.assertTrue(test_case.expected_error_code in response_code)
+                    self.assertTrue(test_case.expected_error_message in response_body)
+
+            # The bug report is still there
+            self.assertEqual(Report.query.filter_by(type="bug").count(), 1)
+
+    def test_export_reports(self):
+        with self.app.app_context():
+            self.add_reports()
+
+            # Admins only export the reports they can handle
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+            response = self.webtest_app.get("/api/report/export?from=2023-01-02")
+            self.assertEqual(response.content_type, "text/csv")
+            rows = list(csv.reader(io.StringIO(response.text)))
+            self.assertEqual(rows[0][:3], ["id", "created_at", "type"])
+            self.assertEqual([row[0] for row in rows[1:]], ["2", "3", "5"])
+            self.assertEqual(rows[1][-1], "oldUser")
+
+            self.webtest_app.authorization = ("Bearer", self.user_owner_token)
+            response = self.webtest_app.get("/api/report/export?compress=gzip")
+            rows = list(
+                csv.reader(io.StringIO(gzip.decompress(response.body).decode()))
+            )
+            self.assertEqual([row[0] for row in rows[1:]], ["1", "2", "3", "4", "5"])
+
+            with self.assertRaises(webtest.AppError) as exception:
+                self.webtest_app.get("/api/report/export?compress=zip")
+            self.assertTrue("Invalid compression." in str(exception.exception))
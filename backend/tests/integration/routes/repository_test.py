@@ -1,10 +1,13 @@
 import collections
 import pytest
+import time
 import webtest
 from datetime import datetime
+from unittest.mock import patch
 
 from tests import testBase
 from server.db import db
+from server.github import get_governor
 from server.models.Repository import Repository, RepoLanguage, RepoTag
 from server.models.Log import Log
 
@@ -112,6 +115,58 @@ class Repository_Route_Test(testBase.TestBase):
                     self.assertEqual(repo["suggested_by"]["id"], 0)
                     self.assertEqual(len(repo["tags"]), 1)
 
+    def test_rate_limited_routes(self):
+        TestCase = collections.namedtuple("TestCase", ["test_name", "request"])
+
+        test_cases = [
+            TestCase(
+                test_name="Creating a repository",
+                request=lambda: self.webtest_app.post_json(
+                    "/api/repositories",
+                    {
+                        "author": "cyanChill",
+                        "repo_name": "Battleship",
+                        "primary_tag": {
+                            "label": "Project Idea",
+                            "value": "project_idea",
+                        },
+                    },
+                    status=503,
+                ),
+            ),
+            TestCase(
+                test_name="Refreshing a repository",
+                request=lambda: self.webtest_app.get(
+                    "/api/repositories/394012075/refresh", status=503
+                ),
+            ),
+        ]
+
+        with self.app.app_context():
+            # Empty the GitHub API budget
+            get_governor().sync(
+                "core",
+                {
+                    "X-RateLimit-Limit": "5000",
+                    "X-RateLimit-Remaining": "0",
+                    "X-RateLimit-Reset": str(int(time.time()) + 60),
+                },
+            )
+            self.webtest_app.authorization = ("Bearer", self.user_exp_token)
+
+            for test_case in test_cases:
+                with self.subTest(msg=test_case.test_name):
+                    with patch("requests.request") as github_request:
+                        response = test_case.request()
+
+                    # The request isn't sent & the client is told when to retry
+                    github_request.assert_not_called()
+                    self.assertTrue(int(response.headers["Retry-After"]) > 0)
+                    self.assertEqual(
+                        response.json["message"],
+                        "GitHub API limit has been reached, try again later.",
+                    )
+
     def test_create_repository_bad_request(self):
         TestCase = collections.namedtuple(
             "TestCase",
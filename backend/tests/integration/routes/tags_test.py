@@ -6,6 +6,9 @@ from tests import testBase
 from server.models.User import User
 from server.models.Repository import Repository, RepoTag
 from server.models.Tag import Tag
+from server.models.TagMigration import TagMigration
+from server.models.Log import Log
+from server.tag_migration import start_tag_migration, migrate_chunk
 
 
 class Tags_Route_Test(testBase.TestBase):
@@ -92,6 +95,19 @@ class Tags_Route_Test(testBase.TestBase):
                     self.assertEqual(tag["suggested_by"]["id"], user.as_dict()["id"])
                     self.assertEqual(tag["type"], "user_gen")
 
+    def test_get_tags_after_write(self):
+        with self.app.app_context():
+            self.webtest_app.get("/api/tags")
+
+            # Creating a tag invalidates the cached tags
+            self.webtest_app.authorization = ("Bearer", self.user_exp_token)
+            self.webtest_app.post_json(
+                "/api/tags", {"display_name": "Full Stack", "type": "user_gen"}
+            )
+
+            response = self.webtest_app.get("/api/tags").json
+            self.assertIn("full_stack", [tag["name"] for tag in response["user_gen"]])
+
     def test_create_tag_bad_request(self):
         TestCase = collections.namedtuple(
             "TestCase",
@@ -184,6 +200,79 @@ class Tags_Route_Test(testBase.TestBase):
             ).all()
             self.assertEqual(len(updated_repos), 2)
 
+    def test_merge_tag(self):
+        with self.app.app_context():
+            from server.db import db
+
+            # Repository 394012075 ends up with both tags before the merge
+            db.session.add(RepoTag(repo_id=394012075, tag_name="machine_learning"))
+            db.session.add(RepoTag(repo_id=10270250, tag_name="machine_learning"))
+            db.session.commit()
+            self.app.config["TAG_MIGRATION_CHUNK_SIZE"] = 1
+
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+            response = self.webtest_app.patch_json(
+                "/api/tags",
+                {
+                    "oldName": "machine_learning",
+                    "newDisplayName": "Frontend",
+                    "merge": True,
+                },
+            ).json
+            self.assertEqual(response["message"], "Successfully merged tag.")
+            self.assertEqual(response["tag"]["name"], "frontend")
+
+            merged_repoTags = RepoTag.query.filter_by(tag_name="frontend").all()
+            self.assertCountEqual(
+                [repoTag.repo_id for repoTag in merged_repoTags],
+                [394012075, 10270250, 0],
+            )
+            self.assertEqual(Tag.query.filter_by(name="machine_learning").first(), None)
+            # A single log entry is written for the whole merge
+            logs = Log.query.filter_by(type="tag").all()
+            self.assertEqual(
+                [log.action for log in logs], ["merge (machine_learning -> frontend)"]
+            )
+
+    def test_update_tag_resume(self):
+        with self.app.app_context():
+            from server.db import db
+
+            # Interrupt a rename after its first chunk
+            old_tag = Tag.query.filter_by(name="frontend").first()
+            migration = start_tag_migration(old_tag, "Web Development", 83375816)
+            migrate_chunk(migration, "user_gen", 1)
+            self.assertEqual(migration.moved, 1)
+
+            # The same update resumes the interrupted rename
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+            response = self.webtest_app.patch_json(
+                "/api/tags",
+                {"oldName": "frontend", "newDisplayName": "Web Development"},
+            ).json
+            self.assertEqual(response["message"], "Successfully updated tag.")
+
+            db.session.refresh(migration)
+            self.assertEqual(migration.status, "done")
+            self.assertEqual(migration.moved, 2)
+            self.assertEqual(
+                len(RepoTag.query.filter_by(tag_name="web_development").all()), 2
+            )
+
+    def test_resume_tag_migrations_command(self):
+        with self.app.app_context():
+            old_tag = Tag.query.filter_by(name="resource").first()
+            migration = start_tag_migration(old_tag, "Reference", 3)
+
+        result = self.app.test_cli_runner().invoke(args=["tags", "resume"])
+        self.assertIn("Finished rename of 'resource' -> 'reference'.", result.output)
+
+        with self.app.app_context():
+            self.assertEqual(TagMigration.query.first().status, "done")
+            self.assertEqual(
+                len(Repository.query.filter_by(_primary_tag="reference").all()), 2
+            )
+
     def test_update_tag_bad_request(self):
         TestCase = collections.namedtuple(
             "TestCase",
@@ -253,6 +342,16 @@ class Tags_Route_Test(testBase.TestBase):
                 expected_error_code="400",
                 expected_error_message="New tag name already exists.",
             ),
+            TestCase(
+                test_name="Tag to merge into doesn't exist",
+                request_body={
+                    "oldName": "frontend",
+                    "newDisplayName": "Backend",
+                    "merge": True,
+                },
+                expected_error_code="400",
+                expected_error_message="Tag to merge into doesn\\'t exist.",
+            ),
         ]
 
         all_test_cases = [user_test_cases, admin_test_cases]
@@ -6,6 +6,7 @@ from datetime import datetime
 from tests import testBase
 from server.db import db
 from server.models.User import User, AccountStatusEnum
+from server.utils import encode_cursor
 
 
 class User_Route_Test(testBase.TestBase):
@@ -30,7 +31,7 @@ class User_Route_Test(testBase.TestBase):
                 expected_res={
                     "message": "User found.",
                     "user_exerpt": {"id": 0},
-                    "contributions": {"suggested_tags": 3, "suggested_repos": 3},
+                    "contributions": {"suggested_tags": 4, "suggested_repos": 3},
                 },
             ),
             TestCase(
@@ -60,17 +61,175 @@ class User_Route_Test(testBase.TestBase):
                     if usr != None:  # User found
                         # Assert the response only includes the expected User ids
                         self.assert_response([usr], [expected_usr])
-                        self.assertTrue(
-                            len(usr_contribs["suggested_tags"]),
-                            expected_contribs["suggested_tags"],
-                        )
-                        self.assertTrue(
-                            len(usr_contribs["suggested_repos"]),
-                            expected_contribs["suggested_repos"],
-                        )
+                        # Contributions are returned as counts
+                        self.assertEqual(usr_contribs, expected_contribs)
                     else:  # User not found
                         self.assertTrue(expected_usr == None)
 
+    def test_get_user_contributions(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "type", "limit", "expected_pages"]
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Paginate suggested repositories",
+                type="repositories",
+                limit=2,
+                expected_pages=[[0, 10270250], [394012075]],
+            ),
+            TestCase(
+                test_name="Paginate suggested tags",
+                type="tags",
+                limit=3,
+                expected_pages=[
+                    ["frontend", "machine_learning", "project_idea"],
+                    ["resource"],
+                ],
+            ),
+        ]
+
+        for test_case in test_cases:
+            with self.subTest(msg=test_case.test_name):
+                cursor = None
+                actual_pages = []
+                while True:
+                    request_url = f"/api/users/0/contributions?type={test_case.type}&limit={test_case.limit}"
+                    if cursor:
+                        request_url += f"&cursor={cursor}"
+                    response = self.webtest_app.get(request_url).json
+                    actual_pages.append(
+                        [
+                            item.get("id", item.get("name"))
+                            for item in response["contributions"]
+                        ]
+                    )
+                    cursor = response["next_cursor"]
+                    if cursor == None:
+                        break
+
+                self.assertEqual(actual_pages, test_case.expected_pages)
+
+    def test_get_user_contributions_bad_request(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "request_url", "expected_message"]
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Invalid type",
+                request_url="/api/users/0/contributions?type=reports",
+                expected_message="Invalid contribution type.",
+            ),
+            TestCase(
+                test_name="Invalid limit",
+                request_url="/api/users/0/contributions?limit=0",
+                expected_message="Limit must be between 1 and 100.",
+            ),
+            TestCase(
+                test_name="Invalid cursor",
+                request_url="/api/users/0/contributions?cursor=abc",
+                expected_message="Invalid cursor.",
+            ),
+            TestCase(
+                test_name="Repository cursor with a name",
+                request_url=f"/api/users/0/contributions?cursor={encode_cursor(['abc'])}",
+                expected_message="Invalid cursor.",
+            ),
+            TestCase(
+                test_name="Tag cursor with an id",
+                request_url=f"/api/users/0/contributions?type=tags&cursor={encode_cursor([1])}",
+                expected_message="Invalid cursor.",
+            ),
+            TestCase(
+                test_name="Empty cursor",
+                request_url=f"/api/users/0/contributions?cursor={encode_cursor([])}",
+                expected_message="Invalid cursor.",
+            ),
+        ]
+
+        for test_case in test_cases:
+            with self.subTest(msg=test_case.test_name):
+                response = self.webtest_app.get(test_case.request_url, status=400)
+                self.assertEqual(response.json["message"], test_case.expected_message)
+
+    def test_get_users_by_status(self):
+        with self.app.app_context():
+            for id in [10, 11, 12]:
+                db.session.add(
+                    User(
+                        id=id,
+                        username=f"bannedUser{id}",
+                        avatar_url="",
+                        github_created_at=datetime(2020, 1, 1),
+                        account_status=AccountStatusEnum["banned"],
+                    )
+                )
+            db.session.commit()
+
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "request_url", "expected_pages"]
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Paginate banned users",
+                request_url="/api/users/banned?limit=2",
+                expected_pages=[[10, 11], [12]],
+            ),
+            TestCase(
+                test_name="Filter users by status",
+                request_url="/api/users?status=admin",
+                expected_pages=[[83375816]],
+            ),
+        ]
+
+        self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+        for test_case in test_cases:
+            with self.subTest(msg=test_case.test_name):
+                actual_pages = []
+                cursor = None
+                while True:
+                    request_url = test_case.request_url
+                    if cursor:
+                        request_url += f"&cursor={cursor}"
+                    response = self.webtest_app.get(request_url).json
+                    actual_pages.append([usr["id"] for usr in response["users"]])
+                    cursor = response["next_cursor"]
+                    if cursor == None:
+                        break
+
+                self.assertEqual(actual_pages, test_case.expected_pages)
+
+    def test_get_users_by_status_bad_request(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "request_url", "expected_message"]
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Invalid cursor",
+                request_url="/api/users/banned?cursor=abc",
+                expected_message="Invalid cursor.",
+            ),
+            TestCase(
+                test_name="Cursor with a list",
+                request_url=f"/api/users/banned?cursor={encode_cursor([[1]])}",
+                expected_message="Invalid cursor.",
+            ),
+            TestCase(
+                test_name="Cursor with a boolean",
+                request_url=f"/api/users/banned?cursor={encode_cursor([True])}",
+                expected_message="Invalid cursor.",
+            ),
+        ]
+
+        self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+        for test_case in test_cases:
+            with self.subTest(msg=test_case.test_name):
+                response = self.webtest_app.get(test_case.request_url, status=400)
+                self.assertEqual(response.json["message"], test_case.expected_message)
+
     def test_refresh_user(self):
         TestCase = collections.namedtuple(
             "TestCase", ["test_name", "user_id", "expected_res"]
@@ -1,6 +1,7 @@
 import unittest
 import webtest
 from flask_jwt_extended import create_access_token
+from sqlalchemy import event
 
 from server import create_app
 import server.configuration as configuration
@@ -17,6 +18,7 @@ class TestBase(unittest.TestCase):
         # Set up dummy database values
         with api.app_context():
             from server.db import db
+            from server.counters import reconcile_counters
             from tests.gen_data import gen_dummyData
 
             # Get array of dummy data & commit to dummy database
@@ -24,6 +26,9 @@ class TestBase(unittest.TestCase):
             for entry in data:
                 db.session.add(entry)
             db.session.commit()
+            # Count the usage of the dummy tags & languages (this also bumps
+            # the cached catalogs)
+            reconcile_counters()
 
             # Generate fake user credentials for accessing protected
             # API routes (User Age >1 year id: 0, User Age <3 Months id: 1)
@@ -34,3 +39,28 @@ class TestBase(unittest.TestCase):
 
         self.app = api
         self.webtest_app = webtest.TestApp(api)
+
+    def get_query_plan(self, url, table):
+        """
+        Get the SQLite query plan of the first statement on "table" run by a
+        GET request to "url" (must be called in the app context)
+        """
+        from server.db import db
+
+        statements = []
+
+        def record_statement(conn, cursor, statement, parameters, *args):
+            if f"FROM {table}" in statement:
+                statements.append((statement, parameters))
+
+        event.listen(db.engine, "before_cursor_execute", record_statement)
+        try:
+            self.webtest_app.get(url)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record_statement)
+
+        statement, parameters = statements[0]
+        rows = db.session.connection().exec_driver_sql(
+            "EXPLAIN QUERY PLAN " + statement, parameters
+        )
+        return " ".join(row[-1] for row in rows)
@@ -0,0 +1,38 @@
+from sqlalchemy import update
+
+from tests import testBase
+from server.audit import log_action
+from server.db import db
+from server.models.Log import Log
+from server.models.User import User
+
+
+class AuditTest(testBase.TestBase):
+    def test_logs_saved_on_commit(self):
+        with self.app.app_context():
+            log_action(db.session, "ban", "user", 1, 83375816)
+            log_action(db.session, "delete", "repository", 0, "83375816")
+            # Logs aren't written until the transaction commits
+            self.assertEqual(Log.query.count(), 0)
+
+            db.session.commit()
+            logs = Log.query.order_by(Log.id).all()
+            self.assertEqual(
+                [(log.id, log.action, log.content_id) for log in logs],
+                [(1, "ban", "1"), (2, "delete", "0")],
+            )
+            self.assertEqual(logs[0].user.id, 83375816)
+            self.assertNotEqual(logs[0].created_at, None)
+
+    def test_logs_discarded_on_rollback(self):
+        with self.app.app_context():
+            db.session.execute(
+                update(User).where(User.id == 1).values(ban_reason="Spam")
+            )
+            log_action(db.session, "ban", "user", 1, 83375816)
+            db.session.rollback()
+
+            # The action & its log are rolled back together
+            db.session.commit()
+            self.assertEqual(Log.query.count(), 0)
+            self.assertEqual(db.session.get(User, 1).ban_reason, None)
@@ -0,0 +1,26 @@
+from tests import testBase
+from server.autocomplete import PrefixIndex
+
+
+class AutocompleteTest(testBase.TestBase):
+    def test_prefix_index_search(self):
+        items = [
+            {"name": "react", "display_name": "React", "count": 5},
+            {"name": "redux", "display_name": "Redux", "count": 9},
+            {"name": "ruby", "display_name": "Ruby", "count": 1},
+            {"name": "vue", "display_name": "Vue.js", "count": 20},
+        ]
+        index = PrefixIndex(
+            items,
+            lambda item: [item["name"], item["display_name"]],
+            lambda item: item["count"],
+        )
+
+        def search(prefix, limit=10):
+            return [item["name"] for item in index.search(prefix, limit)]
+
+        # Items matching on several keys are only returned once
+        self.assertEqual(search("re"), ["redux", "react"])
+        self.assertEqual(search("R", limit=2), ["redux", "react"])
+        self.assertEqual(search("vue.j"), ["vue"])
+        self.assertEqual(search("x"), [])
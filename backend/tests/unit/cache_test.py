@@ -0,0 +1,90 @@
+import collections
+import threading
+import time
+
+from tests import testBase
+from server.cache import TTLCache, get_cache
+
+
+class CacheTest(testBase.TestBase):
+    def test_expiry_and_eviction(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "cache", "entries", "wait", "expected_keys"]
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Least recently used entry is evicted",
+                cache=TTLCache(maxsize=2, ttl=60),
+                entries=["a", "b", "c"],
+                wait=0,
+                expected_keys=["b", "c"],
+            ),
+            TestCase(
+                test_name="Expired entries are not returned",
+                cache=TTLCache(maxsize=2, ttl=0.01),
+                entries=["a"],
+                wait=0.02,
+                expected_keys=[],
+            ),
+        ]
+
+        for test_case in test_cases:
+            with self.subTest(msg=test_case.test_name):
+                for key in test_case.entries:
+                    test_case.cache.set(key, key.upper())
+                time.sleep(test_case.wait)
+
+                actual_keys = [
+                    key for key in test_case.entries if test_case.cache.get(key)
+                ]
+                self.assertEqual(actual_keys, test_case.expected_keys)
+
+    def test_get_or_load_single_flight(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        threads = [
+            threading.Thread(target=cache.get_or_load, args=("key", loader))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Concurrent misses should only call the loader once
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.get("key"), "value")
+
+    def test_get_or_load_failure_is_not_cached(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+
+        def failing_loader():
+            raise ValueError("failed")
+
+        with self.assertRaises(ValueError):
+            cache.get_or_load("key", failing_loader)
+        self.assertEqual(cache.get_or_load("key", lambda: "value"), "value")
+
+    def test_refresh_ahead(self):
+        cache = TTLCache(maxsize=10, ttl=0.2, refresh_ahead=0.5)
+        cache.set("key", "old")
+        # Wait until the entry is in the last half of its lifetime
+        time.sleep(0.12)
+
+        # A hit still returns the current value & reloads it in the background
+        self.assertEqual(cache.get_or_load("key", lambda: "new"), "old")
+        time.sleep(0.05)
+        self.assertEqual(cache.get("key"), "new")
+
+    def test_get_cache(self):
+        with self.app.app_context():
+            cache = get_cache("test", maxsize=5, ttl=10)
+            self.assertIs(get_cache("test"), cache)
+            self.assertEqual(cache.maxsize, 5)
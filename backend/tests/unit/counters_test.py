@@ -0,0 +1,86 @@
+from sqlalchemy import text, update
+
+from tests import testBase
+from server.db import db
+from server.counters import adjust_tag_counts, reconcile_counters
+from server.migrations import add_counter_columns
+from server.models.Language import Language
+from server.models.Tag import Tag
+from server.models.User import User
+
+
+class CountersTest(testBase.TestBase):
+    def get_counts(self, model):
+        return {item.name: item.repo_count for item in model.query.all()}
+
+    def test_reconcile_counters(self):
+        with self.app.app_context():
+            expected_tag_counts = {
+                "project_idea": 1,
+                "resource": 2,
+                "frontend": 2,
+                "machine_learning": 0,
+            }
+            expected_lang_counts = {
+                "ruby_on_rails": 2,
+                "html": 0,
+                "java": 0,
+                "css": 1,
+            }
+            self.assertEqual(self.get_counts(Tag), expected_tag_counts)
+            self.assertEqual(self.get_counts(Language), expected_lang_counts)
+
+            # Make the counters drift & fix them
+            db.session.execute(update(Tag).values(repo_count=10))
+            db.session.commit()
+            self.assertEqual(reconcile_counters(), 4)
+            self.assertEqual(self.get_counts(Tag), expected_tag_counts)
+
+    def test_adjust_tag_counts(self):
+        with self.app.app_context():
+            adjust_tag_counts(["frontend", "frontend", "resource"], 1)
+            adjust_tag_counts(["machine_learning"], -1)
+            db.session.commit()
+
+            counts = self.get_counts(Tag)
+            self.assertEqual(counts["frontend"], 4)
+            self.assertEqual(counts["resource"], 3)
+            self.assertEqual(counts["machine_learning"], -1)
+
+    def test_add_counter_columns(self):
+        with self.app.app_context():
+            # A database created before the counters existed
+            db.session.execute(text("ALTER TABLE tags DROP COLUMN repo_count"))
+            db.session.execute(text("ALTER TABLE languages DROP COLUMN repo_count"))
+            db.session.execute(
+                text("ALTER TABLE users DROP COLUMN suggested_repo_count")
+            )
+            db.session.execute(
+                text("ALTER TABLE users DROP COLUMN suggested_tag_count")
+            )
+            db.session.commit()
+
+            add_counter_columns()
+            self.assertEqual(self.get_counts(Tag)["frontend"], 2)
+            self.assertEqual(self.get_counts(Language)["ruby_on_rails"], 2)
+            user = db.session.get(User, 0)
+            self.assertEqual(
+                (user.suggested_repo_count, user.suggested_tag_count), (3, 4)
+            )
+
+    def test_user_contribution_counts(self):
+        with self.app.app_context():
+            user = db.session.get(User, 0)
+            self.assertEqual(
+                (user.suggested_repo_count, user.suggested_tag_count), (3, 4)
+            )
+
+        self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+        self.webtest_app.delete("/api/repositories/394012075")
+        self.webtest_app.put_json("/api/tags", {"oldTagName": "machine_learning"})
+
+        with self.app.app_context():
+            user = db.session.get(User, 0)
+            self.assertEqual(
+                (user.suggested_repo_count, user.suggested_tag_count), (2, 3)
+            )
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from sqlalchemy import create_engine, exc, text
+
+from server.db_pool import (
+    get_engine_options,
+    get_pool_stats,
+    install_ping_after_idle,
+    InstrumentedQueuePool,
+)
+
+PROFILE = {
+    "pool_size": 1,
+    "max_overflow": 1,
+    "pool_timeout": 0.1,
+    "pool_recycle": 1800,
+    "ping_after_idle": 0,
+}
+
+
+class DbPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        uri = "sqlite:///" + os.path.join(self.tmp_dir.name, "test.db")
+        self.engine = create_engine(uri, **get_engine_options(uri, PROFILE))
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    def test_get_engine_options(self):
+        self.assertEqual(get_engine_options("sqlite:///", PROFILE), {})
+        self.assertEqual(get_engine_options("sqlite:///:memory:", PROFILE), {})
+        options = get_engine_options("postgresql://localhost/db", PROFILE)
+        self.assertEqual(options["poolclass"], InstrumentedQueuePool)
+        self.assertEqual(options["pool_size"], 1)
+
+    def test_pool_stats(self):
+        self.assertTrue(isinstance(self.engine.pool, InstrumentedQueuePool))
+
+        conn_1 = self.engine.connect()
+        conn_2 = self.engine.connect()
+        stats = get_pool_stats(self.engine)
+        self.assertEqual(stats["in_use"], 2)
+        self.assertEqual(stats["overflow"], 1)
+
+        # The pool is exhausted, so the next checkout times out
+        with self.assertRaises(exc.TimeoutError):
+            self.engine.connect()
+        conn_1.close()
+        conn_2.close()
+
+        stats = get_pool_stats(self.engine)
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["checkouts"], 3)
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertTrue(stats["wait_max_ms"] >= 100)
+
+    def test_ping_after_idle(self):
+        install_ping_after_idle(self.engine, 0)
+
+        # New connections aren't pinged, returned connections are
+        for _ in range(3):
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        self.assertEqual(get_pool_stats(self.engine)["pings"], 2)
+
+        # Connections that were idle for less than the threshold aren't pinged
+        uri = str(self.engine.url)
+        engine = create_engine(uri, **get_engine_options(uri, PROFILE))
+        install_ping_after_idle(engine, 3600)
+        for _ in range(3):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        self.assertEqual(get_pool_stats(engine)["pings"], 0)
+        engine.dispose()
@@ -0,0 +1,88 @@
+import collections
+import time
+from unittest.mock import patch
+
+from tests import testBase
+from server.github import RateLimitGovernor, RateLimited
+
+
+class GitHubTest(testBase.TestBase):
+    def gen_headers(self, limit, remaining, reset_in=60):
+        return {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(int(time.time()) + reset_in),
+        }
+
+    def test_governor_reserves(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "remaining", "route_class", "expected_allowed"]
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Low priority route is allowed with plenty of budget",
+                remaining=20,
+                route_class="random",
+                expected_allowed=True,
+            ),
+            TestCase(
+                test_name="Low priority route is rejected inside its reserve",
+                remaining=5,
+                route_class="random",
+                expected_allowed=False,
+            ),
+            TestCase(
+                test_name="High priority route can use the reserve",
+                remaining=5,
+                route_class="suggest",
+                expected_allowed=True,
+            ),
+            TestCase(
+                test_name="High priority route is rejected with no budget",
+                remaining=0,
+                route_class="suggest",
+                expected_allowed=False,
+            ),
+        ]
+
+        for test_case in test_cases:
+            with self.subTest(msg=test_case.test_name):
+                governor = RateLimitGovernor(
+                    {"suggest": 0, "refresh": 0.1, "random": 0.3}
+                )
+                governor.sync("search", self.gen_headers(30, test_case.remaining))
+
+                if test_case.expected_allowed:
+                    governor.acquire("search", test_case.route_class)
+                    self.assertEqual(
+                        governor.remaining("search"), test_case.remaining - 1
+                    )
+                else:
+                    with self.assertRaises(RateLimited) as exception:
+                        governor.acquire("search", test_case.route_class)
+                    self.assertTrue(0 < exception.exception.retry_after <= 60)
+
+    def test_governor_refills_after_reset(self):
+        governor = RateLimitGovernor({"random": 0})
+        governor.sync("search", self.gen_headers(30, 0, reset_in=-1))
+
+        governor.acquire("search", "random")
+        self.assertEqual(governor.remaining("search"), 29)
+
+    def test_rate_limited_route(self):
+        with self.app.app_context():
+            from server.github import get_governor
+
+            get_governor().sync("core", self.gen_headers(5000, 0))
+
+        with patch("requests.request") as github_request:
+            response = self.webtest_app.get("/api/users/0/refresh", status=503)
+
+        # Request is rejected before it's sent to GitHub
+        github_request.assert_not_called()
+        self.assertTrue(int(response.headers["Retry-After"]) > 0)
+        self.assertEqual(
+            response.json["message"],
+            "GitHub API limit has been reached, try again later.",
+        )
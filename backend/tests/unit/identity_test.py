@@ -0,0 +1,53 @@
+from unittest.mock import patch
+
+from tests import testBase
+from server import identity
+
+
+class IdentityTest(testBase.TestBase):
+    def test_user_loaded_lazily(self):
+        with patch("server.identity.load_user", wraps=identity.load_user) as load_user:
+            # Anonymous & authenticated reads that don't use "g.user"
+            self.webtest_app.get("/api/tags")
+            self.webtest_app.authorization = ("Bearer", self.user_exp_token)
+            self.webtest_app.get("/api/languages")
+            load_user.assert_not_called()
+
+            self.webtest_app.get("/api/users/1")
+            load_user.assert_called_once()
+
+    def test_jwt_decoded_once(self):
+        self.webtest_app.authorization = ("Bearer", self.user_exp_token)
+        with patch(
+            "server.identity.verify_jwt_in_request",
+            wraps=identity.verify_jwt_in_request,
+        ) as verify_jwt:
+            # "@jwt_required()" already decoded the access token
+            response = self.webtest_app.post_json(
+                "/api/tags", {"display_name": "Full Stack", "type": "user_gen"}
+            )
+            self.assertEqual(response.json["message"], "Successfully create tag.")
+            verify_jwt.assert_not_called()
+
+    def test_cached_user_invalidated_on_update(self):
+        with self.app.app_context():
+            from server.models.User import User
+
+            # Cache the user
+            self.webtest_app.authorization = ("Bearer", self.user_exp_token)
+            self.webtest_app.post_json(
+                "/api/tags", {"display_name": "Full Stack", "type": "user_gen"}
+            )
+            self.assertNotEqual(identity.get_user_cache().get(0), None)
+
+            self.webtest_app.authorization = ("Bearer", self.user_admin_token)
+            self.webtest_app.patch_json(
+                "/api/users/0", {"account_status": "banned", "ban_reason": "Spam"}
+            )
+
+            # The ban applies right away
+            self.webtest_app.authorization = ("Bearer", self.user_exp_token)
+            response = self.webtest_app.post_json(
+                "/api/tags", {"display_name": "Backend", "type": "user_gen"}, status=403
+            )
+            self.assertEqual(response.json["message"], "Banned user is not allowed.")
@@ -0,0 +1,26 @@
+import unittest
+
+from server.importtime import parse_importtime, slowest_packages
+
+
+class ImportTimeTest(unittest.TestCase):
+    def test_parse_importtime(self):
+        lines = [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |     sqlalchemy.util",
+            "import time:       300 |        420 |   sqlalchemy",
+            "import time:        50 |         50 |   flask.json",
+            "import time:       200 |        250 |   flask",
+            "import time:        80 |        750 | server",
+            "some other output",
+        ]
+        imports = parse_importtime(lines)
+        self.assertEqual(
+            imports[:2],
+            [("sqlalchemy.util", 120, 120, 2), ("sqlalchemy", 300, 420, 1)],
+        )
+        self.assertEqual(imports[-1], ("server", 80, 750, 0))
+
+        self.assertEqual(
+            slowest_packages(imports, limit=2), [("server", 750), ("sqlalchemy", 420)]
+        )
@@ -0,0 +1,77 @@
+import gzip
+import tempfile
+from datetime import datetime
+
+from tests import testBase
+from server.db import db
+from server.log_archive import (
+    append_to_archive,
+    archive_logs,
+    get_archive_path,
+    list_archive_months,
+    read_archive,
+)
+from server.models.Log import Log
+
+
+class LogArchiveTest(testBase.TestBase):
+    def setUp(self):
+        super().setUp()
+        self.archive_dir = tempfile.TemporaryDirectory()
+        self.app.config["LOG_ARCHIVE_DIR"] = self.archive_dir.name
+
+        with self.app.app_context():
+            logs = [
+                ("ban", "user", "2023-01-05T10:00:00"),
+                ("delete", "repository", "2023-01-20T10:00:00"),
+                ("update", "tag", "2023-02-01T10:00:00"),
+                ("delete", "tag", "2023-03-01T10:00:00"),
+            ]
+            for action, type, created_at in logs:
+                db.session.add(
+                    Log(
+                        action=action,
+                        type=type,
+                        content_id="1",
+                        enacted_by=83375816,
+                        created_at=datetime.fromisoformat(created_at),
+                    )
+                )
+            db.session.commit()
+
+    def tearDown(self):
+        self.archive_dir.cleanup()
+        super().tearDown()
+
+    def test_archive_logs(self):
+        with self.app.app_context():
+            num_archived = archive_logs(cutoff=datetime(2023, 2, 15), chunk_size=2)
+            self.assertEqual(num_archived, 3)
+            self.assertEqual([log.id for log in Log.query.all()], [4])
+
+            self.assertEqual(list_archive_months(), ["2023-02", "2023-01"])
+            self.assertEqual([log["id"] for log in read_archive("2023-01")], [1, 2])
+            self.assertEqual(
+                [log["action"] for log in read_archive("2023-01", type="user")],
+                ["ban"],
+            )
+            self.assertEqual(list(read_archive("2022-12")), [])
+
+    def test_archive_appends(self):
+        with self.app.app_context():
+            archive_logs(cutoff=datetime(2023, 1, 10))
+            archive_logs(cutoff=datetime(2023, 2, 15))
+
+            # The 2nd run was appended as a new gzip member
+            with gzip.open(get_archive_path("2023-01"), "rt") as f:
+                self.assertEqual(len(f.readlines()), 2)
+
+    def test_read_archive_skips_duplicates(self):
+        with self.app.app_context():
+            # Simulate a run stopping after archiving a chunk, but before
+            # deleting it from the table
+            logs = Log.query.filter(Log.created_at < datetime(2023, 2, 1)).all()
+            append_to_archive("2023-01", logs)
+            archive_logs(cutoff=datetime(2023, 2, 1))
+
+            self.assertEqual([log["id"] for log in read_archive("2023-01")], [1, 2])
@@ -0,0 +1,122 @@
+from datetime import date, datetime
+
+from tests import testBase
+from server.audit import log_action
+from server.db import db
+from server.log_stats import get_action_verb, rebuild_log_stats
+from server.models.Log import Log
+from server.models.LogDailyStat import LogDailyStat
+
+
+class LogStatsTest(testBase.TestBase):
+    def get_stats(self):
+        return {
+            (stat.day, stat.type, stat.action, stat.enacted_by): stat.count
+            for stat in LogDailyStat.query.all()
+        }
+
+    def test_get_action_verb(self):
+        self.assertEqual(get_action_verb("update (old -> new)"), "update")
+        self.assertEqual(get_action_verb("delete"), "delete")
+
+    def test_stats_counted_with_logs(self):
+        with self.app.app_context():
+            log_action(db.session, "update (a -> b)", "tag", "b", 83375816)
+            log_action(db.session, "update (c -> d)", "tag", "d", 83375816)
+            db.session.commit()
+            # Stats are counted on the day the database dated the logs
+            today = Log.query.first().created_at.date()
+            log_action(db.session, "update (e -> f)", "tag", "f", 83375816)
+            log_action(db.session, "ban", "user", "1", 3)
+            db.session.commit()
+
+            self.assertEqual(
+                self.get_stats(),
+                {
+                    (today, "tag", "update", 83375816): 3,
+                    (today, "user", "ban", 3): 1,
+                },
+            )
+
+            # Stats are rolled back along with their logs
+            log_action(db.session, "ban", "user", "0", 3)
+            db.session.rollback()
+            self.assertEqual(self.get_stats()[(today, "user", "ban", 3)], 1)
+
+    def test_rebuild_log_stats(self):
+        with self.app.app_context():
+            # Stats of days that were archived are kept
+            db.session.add(
+                LogDailyStat(
+                    day=date(2022, 12, 1),
+                    type="tag",
+                    action="delete",
+                    enacted_by=3,
+                    count=5,
+                )
+            )
+            for action, created_at in [
+                ("delete", "2023-01-01T10:00:00"),
+                ("delete (auto)", "2023-01-01T12:00:00"),
+                ("delete", "2023-01-02T10:00:00"),
+            ]:
+                db.session.add(
+                    Log(
+                        action=action,
+                        type="repository",
+                        content_id="1",
+                        enacted_by=3,
+                        created_at=datetime.fromisoformat(created_at),
+                    )
+                )
+            db.session.commit()
+
+            self.assertEqual(rebuild_log_stats(), 3)
+            self.assertEqual(
+                self.get_stats(),
+                {
+                    (date(2022, 12, 1), "tag", "delete", 3): 5,
+                    (date(2023, 1, 1), "repository", "delete", 3): 2,
+                    (date(2023, 1, 2), "repository", "delete", 3): 1,
+                },
+            )
+
+            # Rebuilding again gives the same stats
+            rebuild_log_stats()
+            self.assertEqual(
+                self.get_stats()[(date(2023, 1, 1), "repository", "delete", 3)], 2
+            )
+
+    def test_rebuild_log_stats_partly_archived_day(self):
+        with self.app.app_context():
+            # 3 logs were counted on the first day, 2 of them were archived
+            db.session.add(
+                LogDailyStat(
+                    day=date(2023, 1, 1),
+                    type="repository",
+                    action="delete",
+                    enacted_by=3,
+                    count=3,
+                )
+            )
+            for created_at in ["2023-01-01T23:00:00", "2023-01-02T10:00:00"]:
+                db.session.add(
+                    Log(
+                        action="delete",
+                        type="repository",
+                        content_id="1",
+                        enacted_by=3,
+                        created_at=datetime.fromisoformat(created_at),
+                    )
+                )
+            db.session.commit()
+
+            # Only the days whose logs weren't archived are recounted
+            self.assertEqual(rebuild_log_stats(), 1)
+            self.assertEqual(
+                self.get_stats(),
+                {
+                    (date(2023, 1, 1), "repository", "delete", 3): 3,
+                    (date(2023, 1, 2), "repository", "delete", 3): 1,
+                },
+            )
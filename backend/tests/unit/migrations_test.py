@@ -0,0 +1,120 @@
+import os
+import tempfile
+from sqlalchemy import inspect, text
+
+from tests import testBase
+from server import create_app, init_serving
+from server.configuration import ConfigurationName
+from server.db import db
+from server.migrations import (
+    check_schema,
+    get_schema_version,
+    upgrade_db,
+    LATEST_VERSION,
+)
+from server.models.Language import Language
+from server.models.Tag import Tag
+from server.models.User import User
+
+
+class MigrationsTest(testBase.TestBase):
+    def make_legacy_db(self):
+        # A database created before the migrations, counters & indexes existed
+        for ddl in [
+            "DROP TABLE schema_version",
+            "DROP TABLE log_daily_stats",
+            "DROP INDEX ix_reports_type_content_id",
+            "DROP INDEX ix_users_account_status",
+            "DROP INDEX ix_logs_type_created_at",
+            "CREATE INDEX ix_logs_type_created_at ON logs (type, created_at)",
+            "ALTER TABLE tags DROP COLUMN repo_count",
+            "ALTER TABLE languages DROP COLUMN repo_count",
+            "ALTER TABLE users DROP COLUMN suggested_repo_count",
+            "ALTER TABLE users DROP COLUMN suggested_tag_count",
+            "DELETE FROM users WHERE id = -1337",
+        ]:
+            db.session.execute(text(ddl))
+        db.session.commit()
+
+    def test_app_is_migrated_on_start(self):
+        with self.app.app_context():
+            self.assertEqual(get_schema_version(), LATEST_VERSION)
+            self.assertNotEqual(db.session.get(User, -1337), None)
+
+    def test_upgrade_legacy_db(self):
+        with self.app.app_context():
+            self.make_legacy_db()
+            self.assertEqual(get_schema_version(), 0)
+
+            self.assertEqual(
+                upgrade_db(),
+                [
+                    "Create the tables",
+                    "Add the usage counters",
+                    "Create the missing indexes",
+                    "Create the bot account",
+                    "Index the logs by their sort order",
+                    "Index the reports by their sort order",
+                ],
+            )
+            self.assertEqual(get_schema_version(), LATEST_VERSION)
+
+            inspector = inspect(db.engine)
+            self.assertTrue("log_daily_stats" in inspector.get_table_names())
+            # The logs & reports are indexed like they're sorted (SQLite
+            # doesn't reflect the indexes on expressions)
+            for name in ["ix_logs_type_created_at", "ix_reports_type_content_id"]:
+                self.assertTrue(
+                    "datetime(created_at)"
+                    in db.session.scalar(
+                        text("SELECT sql FROM sqlite_master WHERE name = :name"),
+                        {"name": name},
+                    )
+                )
+            # The counters were added & counted
+            self.assertEqual(db.session.get(Tag, "frontend").repo_count, 2)
+            self.assertEqual(db.session.get(Language, "ruby_on_rails").repo_count, 2)
+            user = db.session.get(User, 0)
+            self.assertEqual(
+                (user.suggested_repo_count, user.suggested_tag_count), (3, 4)
+            )
+            self.assertEqual(db.session.get(User, -1337).username, "GitInspire_Bot")
+
+            # Up to date databases aren't changed
+            self.assertEqual(upgrade_db(), [])
+
+    def test_check_schema_without_auto_migrate(self):
+        self.app.config["AUTO_MIGRATE"] = False
+        with self.app.app_context():
+            self.make_legacy_db()
+
+        with self.assertLogs(self.app.logger, level="WARNING"):
+            check_schema(self.app)
+        with self.app.app_context():
+            self.assertEqual(get_schema_version(), 0)
+
+    def test_server_refuses_out_of_date_db(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test_config = {
+                "SQLALCHEMY_DATABASE_URI": "sqlite:///"
+                + os.path.join(tmp_dir, "test.db"),
+                "AUTO_MIGRATE": False,
+            }
+            # CLI commands can still run (ie: "flask db upgrade")
+            with self.assertLogs(level="WARNING"):
+                app = create_app(ConfigurationName.TESTING, test_config)
+            client = app.test_client()
+
+            # But the server doesn't start & doesn't answer requests
+            with self.assertRaises(RuntimeError):
+                init_serving(app)
+            self.assertEqual(client.get("/api/languages").status_code, 503)
+
+            with app.app_context():
+                upgrade_db()
+                self.assertEqual(get_schema_version(), LATEST_VERSION)
+            # Requests are answered once the database is up to date
+            self.assertEqual(client.get("/api/languages").status_code, 200)
+            init_serving(app)
+            with app.app_context():
+                db.engine.dispose()
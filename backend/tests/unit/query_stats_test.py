@@ -0,0 +1,79 @@
+import collections
+import json
+from sqlalchemy import select
+
+from tests import testBase
+from server.db import db
+from server.models.User import User
+from server.query_stats import get_fingerprint
+
+
+class QueryStatsTest(testBase.TestBase):
+    def setUp(self):
+        super().setUp()
+
+        # Loads each user with its own query (an N+1)
+        def get_users_one_by_one():
+            for id in [0, 1, 3]:
+                db.session.scalar(select(User).where(User.id == id))
+            return {"message": "ok"}, 200
+
+        self.app.add_url_rule("/test/users", view_func=get_users_one_by_one)
+        self.app.config["N_PLUS_ONE_THRESHOLD"] = 2
+
+    def test_get_fingerprint(self):
+        TestCase = collections.namedtuple("TestCase", ["name", "input", "expected"])
+        tests = [
+            TestCase(
+                "Parameters",
+                "SELECT users.id FROM users\n WHERE users.id = ?",
+                "SELECT users.id FROM users WHERE users.id = ?",
+            ),
+            TestCase(
+                "IN list",
+                "SELECT tags.name FROM tags WHERE tags.name IN (?, ?, ?)",
+                "SELECT tags.name FROM tags WHERE tags.name IN (?)",
+            ),
+            TestCase(
+                "Postgres parameters & literals",
+                "SELECT logs.id FROM logs WHERE logs.id IN (%(id_1_1)s, %(id_1_2)s) LIMIT 10",
+                "SELECT logs.id FROM logs WHERE logs.id IN (?) LIMIT ?",
+            ),
+        ]
+
+        for test in tests:
+            with self.subTest(test.name):
+                self.assertEqual(get_fingerprint(test.input), test.expected)
+
+    def test_server_timing_header(self):
+        with self.app.app_context():
+            response = self.webtest_app.get("/test/users")
+            server_timing = response.headers["Server-Timing"]
+            self.assertTrue(server_timing.startswith("db;dur="))
+            self.assertTrue('desc="3 queries"' in server_timing)
+            self.assertTrue('desc="0 commits"' in server_timing)
+
+    def test_n_plus_one_warning(self):
+        with self.app.app_context():
+            with self.assertLogs(self.app.logger, "WARNING") as logs:
+                self.webtest_app.get("/test/users")
+
+            warning = json.loads(logs.records[0].getMessage())
+            self.assertEqual(warning["event"], "n_plus_one")
+            self.assertEqual(warning["path"], "/test/users")
+            self.assertEqual(warning["count"], 3)
+            self.assertTrue(warning["statement"].endswith("WHERE users.id = ?"))
+
+    def test_request_logs(self):
+        self.app.config["QUERY_STATS_LOG_REQUESTS"] = True
+        self.app.config["N_PLUS_ONE_THRESHOLD"] = 10
+
+        with self.app.app_context():
+            with self.assertLogs(self.app.logger, "INFO") as logs:
+                self.webtest_app.get("/test/users")
+
+            log = json.loads(logs.records[0].getMessage())
+            self.assertEqual(log["event"], "request")
+            self.assertEqual(log["status"], 200)
+            self.assertEqual(log["db_queries"], 3)
+            self.assertEqual(log["repeated_statements"][0]["count"], 3)
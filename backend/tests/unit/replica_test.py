@@ -0,0 +1,99 @@
+import collections
+import os
+import tempfile
+import unittest
+import webtest
+from datetime import datetime
+from sqlalchemy import insert, update
+
+from server import create_app
+from server.db import db, REPLICA_BIND
+from server.models.User import User, AccountStatusEnum
+import server.configuration as configuration
+
+
+class ReplicaTest(unittest.TestCase):
+    def setUp(self):
+        # 2 SQLite files standing in for the primary database & its replica
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.app = create_app(
+            configuration.ConfigurationName.TESTING,
+            test_config={
+                "SQLALCHEMY_DATABASE_URI": "sqlite:///"
+                + os.path.join(self.tmp_dir.name, "primary.db"),
+                "DATABASE_REPLICA_URL": "sqlite:///"
+                + os.path.join(self.tmp_dir.name, "replica.db"),
+            },
+        )
+
+        # The replica has a stale copy of the user
+        with self.app.app_context():
+            db.metadata.create_all(db.engines[REPLICA_BIND])
+            for engine, username in [
+                (db.engines[None], "primaryUser"),
+                (db.engines[REPLICA_BIND], "replicaUser"),
+            ]:
+                with engine.begin() as conn:
+                    conn.execute(
+                        insert(User).values(
+                            id=1,
+                            username=username,
+                            avatar_url="",
+                            github_created_at=datetime(2021, 1, 1),
+                            account_status=AccountStatusEnum["user"],
+                        )
+                    )
+
+    def tearDown(self):
+        with self.app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+        # The metadata of a bind is kept by "db" for the other apps
+        db.metadatas.pop(REPLICA_BIND, None)
+        self.tmp_dir.cleanup()
+
+    def get_username(self):
+        return db.session.get(User, 1).username
+
+    def test_get_requests_read_from_replica(self):
+        with self.app.test_request_context("/api/users/1", method="GET"):
+            self.assertEqual(self.get_username(), "replicaUser")
+
+    def test_other_requests_read_from_primary(self):
+        TestCase = collections.namedtuple("TestCase", ["test_name", "path", "method"])
+
+        test_cases = [
+            TestCase(test_name="Writes", path="/api/users/1", method="PATCH"),
+            TestCase(test_name="Admin pages", path="/api/logs", method="GET"),
+        ]
+
+        for test_case in test_cases:
+            with self.subTest(msg=test_case.test_name):
+                with self.app.test_request_context(
+                    test_case.path, method=test_case.method
+                ):
+                    self.assertEqual(self.get_username(), "primaryUser")
+
+        # Outside of requests (ie: CLI commands)
+        with self.app.app_context():
+            self.assertEqual(self.get_username(), "primaryUser")
+
+    def test_read_after_write_uses_primary(self):
+        with self.app.test_request_context("/api/users/1", method="GET"):
+            self.assertEqual(self.get_username(), "replicaUser")
+            db.session.execute(
+                update(User).where(User.id == 1).values(ban_reason="Spam")
+            )
+            db.session.commit()
+            db.session.expire_all()
+            self.assertEqual(self.get_username(), "primaryUser")
+            self.assertEqual(db.session.get(User, 1).ban_reason, "Spam")
+
+    def test_routing_resets_between_requests(self):
+        client = webtest.TestApp(self.app)
+        with self.app.app_context():
+            db.session.execute(
+                update(User).where(User.id == 1).values(ban_reason="Spam")
+            )
+            response = client.get("/api/users/1").json
+            self.assertEqual(response["user"]["username"], "replicaUser")
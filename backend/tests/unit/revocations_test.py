@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from flask_jwt_extended import create_access_token, decode_token
+from sqlalchemy import update
+
+from tests import testBase
+from server import identity
+from server.db import db
+from server.models.TokenRevocation import TokenRevocation
+from server.models.User import User, AccountStatusEnum
+from server.revocations import RevocationSet, revoke_user_tokens
+
+
+class RevocationsTest(testBase.TestBase):
+    def create_token(self, user_id, role):
+        with self.app.app_context():
+            return create_access_token(
+                identity=user_id, additional_claims={"role": role}
+            )
+
+    def test_role_claim_skips_user_load(self):
+        admin_token = self.create_token(83375816, "admin")
+        self.webtest_app.authorization = ("Bearer", admin_token)
+
+        with patch("server.identity.load_user", wraps=identity.load_user) as load_user:
+            response = self.webtest_app.get("/api/users/banned")
+            self.assertEqual(response.json["message"], "Obtained banned users.")
+            load_user.assert_not_called()
+
+    def test_tokens_revoked_on_status_change(self):
+        user_token = self.create_token(0, "user")
+        banned_token = self.create_token(0, "banned")
+        request_body = {"display_name": "Full Stack", "type": "user_gen"}
+
+        self.webtest_app.authorization = (
+            "Bearer",
+            self.create_token(83375816, "admin"),
+        )
+        self.webtest_app.patch_json(
+            "/api/users/0", {"account_status": "banned", "ban_reason": "Spam"}
+        )
+
+        # Token issued before the ban is rejected
+        self.webtest_app.authorization = ("Bearer", user_token)
+        response = self.webtest_app.post_json("/api/tags", request_body, status=401)
+        self.assertEqual(response.json["msg"], "Token has been revoked")
+
+        # Token carrying the new account status is accepted
+        self.webtest_app.authorization = ("Bearer", banned_token)
+        response = self.webtest_app.post_json("/api/tags", request_body, status=403)
+        self.assertEqual(response.json["message"], "Banned user is not allowed.")
+
+    def test_refreshed_token_gets_current_role(self):
+        with self.app.app_context():
+            # A token about to expire, issued before the user was banned (the
+            # revocation of the ban has already expired)
+            user_token = create_access_token(
+                identity=0,
+                additional_claims={"role": "user"},
+                expires_delta=timedelta(minutes=10),
+            )
+            db.session.execute(
+                update(User)
+                .where(User.id == 0)
+                .values(account_status=AccountStatusEnum["banned"])
+            )
+            db.session.commit()
+            identity.invalidate_cached_user(0)
+
+            self.webtest_app.authorization = ("Bearer", user_token)
+            response = self.webtest_app.post("/api/auth/logout")
+
+            # The new token carries the current account status
+            access_tokens = [
+                cookie.split(";")[0].split("=", 1)[1]
+                for cookie in response.headers.getall("Set-Cookie")
+                if cookie.startswith("access_token_cookie=")
+            ]
+            self.assertEqual(decode_token(access_tokens[-1])["role"], "banned")
+
+    def test_revocations_shared_between_processes(self):
+        with self.app.app_context():
+            revoke_user_tokens(0, "banned")
+            db.session.commit()
+
+            # Another process loads the revocations from the database
+            other = RevocationSet(sync_interval=0, max_age=timedelta(hours=3))
+            self.assertTrue(other.is_revoked(0, "user"))
+            self.assertFalse(other.is_revoked(0, "banned"))
+            self.assertFalse(other.is_revoked(1, "user"))
+
+    def test_expired_revocations_are_dropped(self):
+        with self.app.app_context():
+            db.session.add(
+                TokenRevocation(
+                    user_id=1,
+                    role="banned",
+                    revoked_at=datetime.utcnow() - timedelta(hours=4),
+                )
+            )
+            db.session.commit()
+
+            revocations = RevocationSet(sync_interval=0, max_age=timedelta(hours=3))
+            self.assertFalse(revocations.is_revoked(1, "user"))
+
+            # Older entries are deleted when a new one is added
+            revocations.revoke(0, "banned")
+            db.session.commit()
+            self.assertEqual([row.user_id for row in TokenRevocation.query.all()], [0])
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from sqlalchemy import create_engine, text
+
+from server.configuration import Configuration
+from server.db_pool import get_engine_options
+from server.sqlite_profile import install_sqlite_pragmas
+
+PROFILE = {
+    "pool_size": 2,
+    "max_overflow": 0,
+    "pool_timeout": 1,
+    "pool_recycle": 1800,
+    "ping_after_idle": None,
+}
+
+
+class SqliteProfileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        uri = "sqlite:///" + os.path.join(self.tmp_dir.name, "test.db")
+        self.engine = create_engine(uri, **get_engine_options(uri, PROFILE))
+        install_sqlite_pragmas(self.engine, Configuration.SQLITE_PRAGMAS)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    def test_pragmas(self):
+        with self.engine.connect() as conn:
+            pragma = lambda name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+            self.assertEqual(pragma("journal_mode"), "wal")
+            # NORMAL = 1, MEMORY = 2
+            self.assertEqual(pragma("synchronous"), 1)
+            self.assertEqual(pragma("temp_store"), 2)
+            self.assertEqual(pragma("cache_size"), -64000)
+            self.assertEqual(pragma("busy_timeout"), 5000)
+
+    def test_read_during_write(self):
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+            conn.execute(text("INSERT INTO items (id) VALUES (1)"))
+
+        writer = self.engine.connect()
+        reader = self.engine.connect()
+        try:
+            # Hold the write lock with an uncommitted insert
+            writer.execute(text("INSERT INTO items (id) VALUES (2)"))
+
+            # Readers aren't blocked & see the last committed data
+            count = reader.execute(text("SELECT COUNT(*) FROM items")).scalar()
+            self.assertEqual(count, 1)
+        finally:
+            writer.rollback()
+            writer.close()
+            reader.close()
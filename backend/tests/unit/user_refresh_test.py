@@ -0,0 +1,108 @@
+import json
+import threading
+from base64 import b64decode
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tests import testBase
+from server.db import db
+from server.github import get_governor
+from server.models.User import User
+from server.user_refresh import get_user_node_id, refresh_stale_users
+
+AVATAR_URL = "https://avatars.githubusercontent.com/u/83375816?v=4"
+
+# GitHub users returned by the fake GraphQL endpoint (user 3 was deleted)
+GITHUB_USERS = {
+    0: {"databaseId": 0, "login": "renamedUser", "avatarUrl": AVATAR_URL},
+    83375816: {"databaseId": 83375816, "login": "cyanChill", "avatarUrl": AVATAR_URL},
+}
+
+
+# A local stand-in for the GitHub GraphQL API that answers "nodes" lookups
+class FakeGraphQLHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.headers["Authorization"], body))
+
+        user_ids = [
+            int(b64decode(node_id).decode().removeprefix("04:User"))
+            for node_id in body["variables"]["ids"]
+        ]
+        payload = json.dumps(
+            {"data": {"nodes": [GITHUB_USERS.get(id) for id in user_ids]}}
+        ).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UserRefreshTest(testBase.TestBase):
+    def setUp(self):
+        super().setUp()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGraphQLHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.app.config.update(
+            GITHUB_GRAPHQL_URL=f"http://127.0.0.1:{self.server.server_port}/graphql",
+            GITHUB_API_TOKEN="test-token",
+        )
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def test_get_user_node_id(self):
+        self.assertEqual(get_user_node_id(83375816), "MDQ6VXNlcjgzMzc1ODE2")
+
+    def test_refresh_stale_users(self):
+        with self.app.app_context():
+            summary = refresh_stale_users(batch_size=2)
+            self.assertEqual(
+                summary,
+                {"checked": 3, "updated": 1, "missing": 1, "rate_limited": False},
+            )
+
+            # Stale users were looked up in batches with our token
+            self.assertEqual(len(self.server.requests), 2)
+            self.assertEqual(
+                [len(body["variables"]["ids"]) for _, body in self.server.requests],
+                [2, 1],
+            )
+            self.assertEqual(self.server.requests[0][0], "bearer test-token")
+
+            self.assertEqual(db.session.get(User, 0).username, "renamedUser")
+            self.assertEqual(db.session.get(User, 3).username, "owner-user")
+
+            # Refreshed users are no longer stale (user 3 is checked again)
+            summary = refresh_stale_users()
+            self.assertEqual(summary["checked"], 1)
+
+    def test_refresh_stale_users_rate_limited(self):
+        with self.app.app_context():
+            get_governor().sync(
+                "graphql",
+                {
+                    "X-RateLimit-Limit": "5000",
+                    "X-RateLimit-Remaining": "0",
+                    "X-RateLimit-Reset": "9999999999",
+                },
+            )
+
+            summary = refresh_stale_users()
+            self.assertTrue(summary["rate_limited"])
+            self.assertEqual(summary["checked"], 0)
+            self.assertEqual(self.server.requests, [])
+
+    def test_refresh_users_command(self):
+        result = self.app.test_cli_runner().invoke(args=["users", "refresh"])
+        self.assertIn(
+            "Checked 3 user(s): 1 updated, 1 not found on GitHub.", result.output
+        )
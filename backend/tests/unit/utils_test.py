@@ -99,3 +99,41 @@ class UtilTest(testBase.TestBase):
             with self.subTest(msg=test_case.test_name):
                 actual_val = utils.filterLangs(test_case.lang_obj)
                 self.assertEqual(actual_val, test_case.expected_result)
+
+    def test_get_keyset_page(self):
+        TestCase = collections.namedtuple(
+            "TestCase", ["test_name", "limit", "expected_names", "expected_cursor"]
+        )
+
+        test_cases = [
+            TestCase(
+                test_name="Page with a next page",
+                limit=2,
+                expected_names=["css", "html"],
+                expected_cursor=["html"],
+            ),
+            TestCase(
+                test_name="Last page",
+                limit=100,
+                expected_names=["css", "html", "java", "ruby_on_rails"],
+                expected_cursor=None,
+            ),
+        ]
+
+        with self.app.app_context():
+            query = Language.query.order_by(Language.name)
+            for test_case in test_cases:
+                with self.subTest(msg=test_case.test_name):
+                    languages, cursor = utils.get_keyset_page(
+                        query, test_case.limit, lambda lang: [lang.name]
+                    )
+                    self.assertEqual(
+                        [lang.name for lang in languages], test_case.expected_names
+                    )
+                    if test_case.expected_cursor == None:
+                        self.assertEqual(cursor, None)
+                    else:
+                        self.assertEqual(
+                            utils.decode_cursor(cursor, [str]),
+                            test_case.expected_cursor,
+                        )
@@ -4,45 +4,53 @@ import toast from "react-hot-toast";
 
 import useUserContext from "~hooks/useUserContext";
 import { LogObjType, ChildrenClass } from "~utils/types";
-import { replaceURLParam, cleanDate2 } from "~utils/helpers";
-import Pagnation from "~components/form/Pagnation";
+import { cleanDate2 } from "~utils/helpers";
 import Spinner from "~components/Loading";
 import SEO from "~components/layout/SEO";
 
-type LogResults = {
-  [x: number]: LogObjType[];
-};
-
 export default function AdminLogsPage() {
   const router = useRouter();
   const { isAdmin, redirectIfNotAdmin } = useUserContext();
 
   const [isLoading, setIsLoading] = useState(true);
-  const [results, setResults] = useState<LogResults>({});
-  const [currPg, setCurrPg] = useState(0);
-  const [maxPgs, setMaxPgs] = useState(0);
+  const [logs, setLogs] = useState<LogObjType[]>([]);
+  // Cursor of the next page of logs (null if there's none)
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
 
   const pullFiltersFromURL = () => {
-    const { page, limit } = router.query;
+    const { limit } = router.query;
     return {
-      page: page && !isNaN(+page) && +page >= 0 ? +page : 1,
-      limit: limit && !isNaN(+limit) && +limit > 0 ? +limit : 15,
+      limit:
+        limit && !isNaN(+limit) && +limit > 0 ? Math.min(+limit, 100) : 15,
     };
   };
 
-  const updateURLPage = (newPage: number) => {
-    router.push(replaceURLParam(router.asPath, "page", `${newPage}`));
+  const loadMoreLogs = async () => {
+    if (!nextCursor || isLoadingMore) return;
+
+    const { limit } = pullFiltersFromURL();
+    setIsLoadingMore(true);
+    const res = await fetch(`/api/logs?limit=${limit}&cursor=${nextCursor}`);
+    if (!res.ok) {
+      toast.error("Something went wrong with finding logs in our databse.");
+    } else {
+      const data = await res.json();
+      setLogs((prev) => [...prev, ...data.logs]);
+      setNextCursor(data.next_cursor);
+    }
+    setIsLoadingMore(false);
   };
 
   useEffect(() => {
     if (!isAdmin) return;
 
     // Fetch results from database based on selected filters
-    const { page, limit } = pullFiltersFromURL();
+    const { limit } = pullFiltersFromURL();
 
     const abortCtrl = new AbortController();
     setIsLoading(true);
-    fetch(`/api/logs?page=${page}&limit=${limit}`, { signal: abortCtrl.signal })
+    fetch(`/api/logs?limit=${limit}`, { signal: abortCtrl.signal })
       .then((res) => {
         if (!res.ok) {
           // There's no errors that'll stem from the inputs provided in the query string
@@ -51,11 +59,9 @@ export default function AdminLogsPage() {
           return res.json();
         }
       })
-      .then(({ currPage: currPageNum, numPages, logs }) => {
-        setResults((prev) => ({ ...prev, [currPageNum]: logs }));
-        // If undefined, set values to 0
-        setCurrPg(currPageNum ?? 0);
-        setMaxPgs(numPages ?? 0);
+      .then(({ logs, next_cursor }) => {
+        setLogs(logs ?? []);
+        setNextCursor(next_cursor ?? null);
         setIsLoading(false);
       })
       .catch((err) => {
@@ -113,7 +119,7 @@ export default function AdminLogsPage() {
               </thead>
 
               <tbody>
-                {results[currPg].map((log) => {
+                {logs.map((log) => {
                   let content_val: string | JSX.Element = log.content_id;
                   if (["repository", "user"].includes(log.type)) {
                     const link =
@@ -161,13 +167,18 @@ export default function AdminLogsPage() {
           </main>
         )}
 
-        {/* Pagnation */}
-        <Pagnation
-          currPg={currPg}
-          maxPg={maxPgs}
-          siblingCount={2}
-          onPgChange={updateURLPage}
-        />
+        {/* Logs are fetched a page at a time (newest first) */}
+        {!isLoading && nextCursor && (
+          <div className="flex justify-center py-2">
+            <button
+              className="text-sm text-slate-500 hocus:underline disabled:opacity-25 dark:text-slate-300"
+              onClick={loadMoreLogs}
+              disabled={isLoadingMore}
+            >
+              Load More Logs
+            </button>
+          </div>
+        )}
       </div>
     </>
   );
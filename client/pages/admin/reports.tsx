@@ -23,7 +23,10 @@ export default function AdminReportsPage() {
   const [selectedType, setSelectedType] = useState("");
   const [menuOpen, setMenuOpen] = useState(false);
   const [reportsDict, setReportsDict] = useState<ReportsDictType>({});
+  // Cursor of the next page of reports (null if there's none)
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
 
   const reportTypes = useMemo(() => {
     return Object.keys(reportsDict).sort();
@@ -65,6 +68,32 @@ export default function AdminReportsPage() {
     toast.success(data.message);
   };
 
+  // Add a page of reports to the reports seperated by their type
+  const addReports = (reports: ReportObjType[]) => {
+    setReportsDict((prev) => {
+      let dict: ReportsDictType = { ...prev };
+      reports.forEach((rpt: ReportObjType) => {
+        dict[rpt.type] = [...(dict[rpt.type] ?? []), rpt];
+      });
+      return dict;
+    });
+  };
+
+  const loadMoreReports = async () => {
+    if (!nextCursor || isLoadingMore) return;
+
+    setIsLoadingMore(true);
+    const res = await authFetch(`/api/report?cursor=${nextCursor}`);
+    if (!res.ok) {
+      toast.error("Something went wrong with fetching reports.");
+    } else {
+      const data = await res.json();
+      addReports(data.reports);
+      setNextCursor(data.next_cursor);
+    }
+    setIsLoadingMore(false);
+  };
+
   useEffect(() => {
     if (!isAdmin) return;
 
@@ -89,6 +118,7 @@ export default function AdminReportsPage() {
 
         const dictKeys = Object.keys(dict).sort();
         setReportsDict(dict);
+        setNextCursor(data.next_cursor);
         setSelectedType(dictKeys.length > 0 ? dictKeys[0] : "");
         setIsLoading(false);
       })
@@ -284,6 +314,19 @@ export default function AdminReportsPage() {
                 </div>
               </article>
             ))}
+
+          {/* Reports are fetched a page at a time (newest first) */}
+          {nextCursor && (
+            <div className="flex justify-center py-2">
+              <button
+                className="text-sm text-slate-500 hocus:underline disabled:opacity-25 dark:text-slate-300"
+                onClick={loadMoreReports}
+                disabled={isLoadingMore}
+              >
+                Load More Reports
+              </button>
+            </div>
+          )}
         </main>
       </div>
     </>
@@ -22,6 +22,8 @@ export default function AdminUsersPage() {
 
   const [selUser, setSelUser] = useState<UserObjType>();
   const [bannedUsers, setBannedUsers] = useState<UserObjType[]>([]);
+  // Cursor of the next page of banned users (null if there's none)
+  const [bannedCursor, setBannedCursor] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(false);
 
   const searchUser = (e: React.FormEvent) => {
@@ -80,6 +82,18 @@ export default function AdminUsersPage() {
     }
   };
 
+  const loadMoreBannedUsers = async () => {
+    if (!bannedCursor) return;
+    const res = await authFetch(`/api/users/banned?cursor=${bannedCursor}`);
+    if (!res.ok) {
+      toast.error("Failed to fetch banned users.");
+      return;
+    }
+    const data = await res.json();
+    setBannedUsers((prev) => [...prev, ...data.users]);
+    setBannedCursor(data.next_cursor);
+  };
+
   useEffect(() => {
     redirectIfNotAdmin();
   }, [redirectIfNotAdmin]);
@@ -93,7 +107,10 @@ export default function AdminUsersPage() {
         if (!res.ok) toast.error("Failed to fetch banned users.");
         else return res.json();
       })
-      .then((data) => setBannedUsers(data.users))
+      .then((data) => {
+        setBannedUsers(data.users);
+        setBannedCursor(data.next_cursor);
+      })
       .catch((err) => {
         console.log("[FETCH ERROR]", err);
         if (err.name !== "AbortError") {
@@ -286,6 +303,14 @@ export default function AdminUsersPage() {
                 ))}
               </ul>
             )}
+            {bannedCursor && (
+              <button
+                className="mt-2 text-slate-500 hocus:underline dark:text-gray-50"
+                onClick={loadMoreBannedUsers}
+              >
+                Load More
+              </button>
+            )}
           </main>
         )}
       </div>
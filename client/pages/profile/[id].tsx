@@ -15,8 +15,8 @@ import { LazyText } from "~components/Loading";
 import SEO from "~components/layout/SEO";
 
 type ContributionType = {
-  suggested_tags: TagObjType[];
-  suggested_repos: RepositoryObjType[];
+  suggested_tags: number;
+  suggested_repos: number;
 };
 
 export default function UserProfilePage() {
@@ -27,6 +27,9 @@ export default function UserProfilePage() {
   const [contributions, setContributions] = useState<ContributionType>();
   const [isLoading, setIsLoading] = useState(true);
   const [isRefreshing, setIsRefreshing] = useState(false);
+  // Contributions are fetched a page at a time when their accordion is opened
+  const ctbTags = useContributions<TagObjType>(user?.id, "tags");
+  const ctbRepos = useContributions<RepositoryObjType>(user?.id, "repositories");
 
   const handleReport = () => {
     // Redirect to the report route with some information in the URL params
@@ -105,8 +108,8 @@ export default function UserProfilePage() {
     );
   }
 
-  const numCtbTags = contributions?.suggested_tags.length ?? 0;
-  const numCtbRepos = contributions?.suggested_repos.length ?? 0;
+  const numCtbTags = contributions?.suggested_tags ?? 0;
+  const numCtbRepos = contributions?.suggested_repos ?? 0;
 
   return (
     <>
@@ -163,9 +166,13 @@ export default function UserProfilePage() {
               to <span className="font-semibold">GitInspire</span>.
             </p>
 
-            <ProfileAccordion amount={numCtbTags} variant="Tags">
+            <ProfileAccordion
+              amount={numCtbTags}
+              variant="Tags"
+              onOpen={ctbTags.loadFirstPage}
+            >
               <div className="flex min-w-0 flex-wrap gap-1">
-                {contributions?.suggested_tags.map((tg) => (
+                {ctbTags.items.map((tg) => (
                   <span
                     key={tg.name}
                     className="truncate rounded-xl bg-neutral-200 px-2 py-0.5 dark:bg-slate-700"
@@ -174,11 +181,16 @@ export default function UserProfilePage() {
                   </span>
                 ))}
               </div>
+              <LoadMoreButton contributions={ctbTags} />
             </ProfileAccordion>
 
-            <ProfileAccordion amount={numCtbRepos} variant="Repositories">
+            <ProfileAccordion
+              amount={numCtbRepos}
+              variant="Repositories"
+              onOpen={ctbRepos.loadFirstPage}
+            >
               <div className="flex min-w-0 flex-col gap-1">
-                {contributions?.suggested_repos.map((repo) => (
+                {ctbRepos.items.map((repo) => (
                   <Link
                     key={repo.id}
                     href={`/repository/${repo.id}`}
@@ -188,6 +200,7 @@ export default function UserProfilePage() {
                   </Link>
                 ))}
               </div>
+              <LoadMoreButton contributions={ctbRepos} />
             </ProfileAccordion>
           </>
         )}
@@ -228,20 +241,101 @@ export default function UserProfilePage() {
   );
 }
 
+type ContributionsType<T> = {
+  items: T[];
+  hasMore: boolean;
+  isLoading: boolean;
+  loadFirstPage: () => void;
+  loadMore: () => void;
+};
+
+// Fetches the contributions of a user with the cursor from the previous page
+function useContributions<T>(
+  userId: number | undefined,
+  type: "tags" | "repositories"
+): ContributionsType<T> {
+  const [items, setItems] = useState<T[]>([]);
+  const [cursor, setCursor] = useState<string | null>(null);
+  const [hasLoaded, setHasLoaded] = useState(false);
+  const [isLoading, setIsLoading] = useState(false);
+
+  // Reset the contributions when viewing another user
+  useEffect(() => {
+    setItems([]);
+    setCursor(null);
+    setHasLoaded(false);
+  }, [userId]);
+
+  const fetchPage = async (pageCursor: string | null) => {
+    if (userId === undefined || isLoading) return;
+
+    setIsLoading(true);
+    let url = `/api/users/${userId}/contributions?type=${type}`;
+    if (pageCursor) url += `&cursor=${pageCursor}`;
+    const res = await fetch(url);
+    if (!res.ok) {
+      toast.error("Something went wrong with fetching contributions.");
+    } else {
+      const data = await res.json();
+      setItems((prev) => [...prev, ...data.contributions]);
+      setCursor(data.next_cursor);
+      setHasLoaded(true);
+    }
+    setIsLoading(false);
+  };
+
+  return {
+    items,
+    hasMore: cursor !== null,
+    isLoading,
+    loadFirstPage: () => {
+      if (!hasLoaded) fetchPage(null);
+    },
+    loadMore: () => fetchPage(cursor),
+  };
+}
+
+function LoadMoreButton<T>({
+  contributions,
+}: {
+  contributions: ContributionsType<T>;
+}) {
+  if (!contributions.hasMore) return null;
+
+  return (
+    <button
+      className="mt-2 text-slate-500 hocus:underline disabled:opacity-25 dark:text-gray-50"
+      onClick={contributions.loadMore}
+      disabled={contributions.isLoading}
+    >
+      Load More
+    </button>
+  );
+}
+
 type ProfileAccordionType = {
   amount: number;
   variant: "Tags" | "Repositories";
+  onOpen?: () => void;
   children: React.ReactNode;
 };
 
-function ProfileAccordion({ amount, variant, children }: ProfileAccordionType) {
+function ProfileAccordion({
+  amount,
+  variant,
+  onOpen,
+  children,
+}: ProfileAccordionType) {
   const [isOpen, setIsOpen] = useState(false);
 
   return (
     <div className="my-4 rounded-md bg-white dark:bg-slate-800">
       <button
         className="block w-full p-2 text-sm text-start"
-        onClick={() => setIsOpen((prev) => !prev)}
+        onClick={() => {
+          if (!isOpen && onOpen) onOpen();
+          setIsOpen((prev) => !prev);
+        }}
       >
         <span className="rounded-md bg-neutral-100 p-1 font-semibold dark:bg-slate-900">
           {amount}